@@ -1,5 +1,5 @@
 # alembic/env.py
-from backend.models import user, transcription, content_generation  # Import the models
+from backend.models import user, transcription, content_generation, job, transcript_cache, transcript_segment  # Import the models
 from backend.database import Base  # Import the base class for models
 from logging.config import fileConfig
 
@@ -23,6 +23,13 @@ if config.config_file_name is not None:
 target_metadata = Base.metadata
 
 
+def include_object(object, name, type_, reflected, compare_to):
+    # Full-text search columns/indexes are managed by backend/utils/fts.py
+    if type_ in ("column", "index") and reflected and compare_to is None:
+        return "search_vector" not in name
+    return True
+
+
 def run_migrations_offline() -> None:
     """Run migrations in 'offline' mode.
 
@@ -60,7 +67,8 @@ def run_migrations_online() -> None:
 
     with connectable.connect() as connection:
         context.configure(
-            connection=connection, target_metadata=target_metadata
+            connection=connection, target_metadata=target_metadata,
+            include_object=include_object
         )
 
         with context.begin_transaction():
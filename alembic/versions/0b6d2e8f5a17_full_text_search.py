@@ -0,0 +1,29 @@
+"""Full-text search over transcripts and generated content
+
+Revision ID: 0b6d2e8f5a17
+Revises: f4c1a9d27b65
+Create Date: 2026-10-18 15:03:51.447210
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+from backend.utils.fts import ensure_search_index, drop_search_index
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0b6d2e8f5a17'
+down_revision: Union[str, None] = 'f4c1a9d27b65'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Adding a stored generated column rewrites both tables once; run it in
+    # a maintenance window on large installs
+    ensure_search_index(op.get_bind())
+
+
+def downgrade() -> None:
+    drop_search_index(op.get_bind())
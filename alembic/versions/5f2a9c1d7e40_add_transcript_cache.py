@@ -0,0 +1,34 @@
+"""Add transcript cache
+
+Revision ID: 5f2a9c1d7e40
+Revises: 13e96f0b7fed
+Create Date: 2026-10-18 09:12:04.118532
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5f2a9c1d7e40'
+down_revision: Union[str, None] = '13e96f0b7fed'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('transcript_cache',
+                    sa.Column('cache_key', sa.String(), nullable=False),
+                    sa.Column('title', sa.String(), nullable=True),
+                    sa.Column('transcript', sa.Text(), nullable=False),
+                    sa.Column('segments', sa.Text(), nullable=True),
+                    sa.Column('created_at', sa.TIMESTAMP(),
+                              server_default=sa.text('CURRENT_TIMESTAMP')),
+                    sa.PrimaryKeyConstraint('cache_key')
+                    )
+
+
+def downgrade() -> None:
+    op.drop_table('transcript_cache')
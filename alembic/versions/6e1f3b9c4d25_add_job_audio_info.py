@@ -0,0 +1,28 @@
+"""Add job audio duration and bitrate
+
+Revision ID: 6e1f3b9c4d25
+Revises: 9a3e5c7b1d42
+Create Date: 2026-10-18 16:32:51.204716
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6e1f3b9c4d25'
+down_revision: Union[str, None] = '9a3e5c7b1d42'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('jobs', sa.Column('duration_seconds', sa.Float(), nullable=True))
+    op.add_column('jobs', sa.Column('bitrate', sa.Integer(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('jobs', 'bitrate')
+    op.drop_column('jobs', 'duration_seconds')
@@ -0,0 +1,42 @@
+"""Generation cache keys and job dedupe key
+
+Revision ID: 9a3e5c7b1d42
+Revises: 0b6d2e8f5a17
+Create Date: 2026-10-18 15:48:09.612834
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9a3e5c7b1d42'
+down_revision: Union[str, None] = '0b6d2e8f5a17'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+ACTIVE_JOBS = sa.text("status IN ('pending', 'processing')")
+
+
+def upgrade() -> None:
+    op.add_column('content_generation',
+                  sa.Column('cache_key', sa.String(), nullable=True))
+    op.add_column('content_generation',
+                  sa.Column('cache_used_at', sa.DateTime(), nullable=True))
+    op.create_index('ix_content_generation_cache_key',
+                    'content_generation', ['cache_key'])
+
+    op.add_column('jobs', sa.Column('dedupe_key', sa.String(), nullable=True))
+    op.create_index('ix_jobs_dedupe_key_active', 'jobs', ['dedupe_key'],
+                    postgresql_where=ACTIVE_JOBS, sqlite_where=ACTIVE_JOBS)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_jobs_dedupe_key_active', table_name='jobs')
+    op.drop_column('jobs', 'dedupe_key')
+    op.drop_index('ix_content_generation_cache_key',
+                  table_name='content_generation')
+    op.drop_column('content_generation', 'cache_used_at')
+    op.drop_column('content_generation', 'cache_key')
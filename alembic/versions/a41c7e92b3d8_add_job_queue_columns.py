@@ -0,0 +1,45 @@
+"""Add job queue columns
+
+Revision ID: a41c7e92b3d8
+Revises: 5f2a9c1d7e40
+Create Date: 2026-10-18 10:02:51.407116
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a41c7e92b3d8'
+down_revision: Union[str, None] = '5f2a9c1d7e40'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('jobs', sa.Column('kind', sa.String(), nullable=True))
+    op.add_column('jobs', sa.Column('payload', sa.JSON(), nullable=True))
+    op.add_column('jobs', sa.Column('attempts', sa.Integer(),
+                                    nullable=False, server_default='0'))
+    op.add_column('jobs', sa.Column('lease_owner', sa.String(), nullable=True))
+    op.add_column('jobs', sa.Column(
+        'lease_expires_at', sa.TIMESTAMP(), nullable=True))
+    op.add_column('jobs', sa.Column(
+        'heartbeat_at', sa.TIMESTAMP(), nullable=True))
+    op.add_column('jobs', sa.Column('last_error', sa.Text(), nullable=True))
+    # Queue polling: oldest pending job first
+    op.create_index('ix_jobs_status_created_at', 'jobs',
+                    ['status', 'created_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_jobs_status_created_at', table_name='jobs')
+    op.drop_column('jobs', 'last_error')
+    op.drop_column('jobs', 'heartbeat_at')
+    op.drop_column('jobs', 'lease_expires_at')
+    op.drop_column('jobs', 'lease_owner')
+    op.drop_column('jobs', 'attempts')
+    op.drop_column('jobs', 'payload')
+    op.drop_column('jobs', 'kind')
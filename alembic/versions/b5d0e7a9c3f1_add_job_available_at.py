@@ -0,0 +1,26 @@
+"""Add job retry backoff
+
+Revision ID: b5d0e7a9c3f1
+Revises: 6e1f3b9c4d25
+Create Date: 2026-10-18 18:04:27.519310
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b5d0e7a9c3f1'
+down_revision: Union[str, None] = '6e1f3b9c4d25'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('jobs', sa.Column('available_at', sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('jobs', 'available_at')
@@ -0,0 +1,26 @@
+"""Add job progress
+
+Revision ID: c7d3e1f08a26
+Revises: a41c7e92b3d8
+Create Date: 2026-10-18 11:20:37.662910
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c7d3e1f08a26'
+down_revision: Union[str, None] = 'a41c7e92b3d8'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('jobs', sa.Column('progress', sa.Float(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('jobs', 'progress')
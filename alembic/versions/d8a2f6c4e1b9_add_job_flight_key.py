@@ -0,0 +1,31 @@
+"""Add job flight key
+
+Revision ID: d8a2f6c4e1b9
+Revises: b5d0e7a9c3f1
+Create Date: 2026-10-18 19:12:41.083517
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd8a2f6c4e1b9'
+down_revision: Union[str, None] = 'b5d0e7a9c3f1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+ACTIVE_JOBS = sa.text("status IN ('pending', 'processing')")
+
+
+def upgrade() -> None:
+    op.add_column('jobs', sa.Column('flight_key', sa.String(), nullable=True))
+    op.create_index('ix_jobs_flight_key_active', 'jobs', ['flight_key'], unique=True,
+                    postgresql_where=ACTIVE_JOBS, sqlite_where=ACTIVE_JOBS)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_jobs_flight_key_active', table_name='jobs')
+    op.drop_column('jobs', 'flight_key')
@@ -0,0 +1,55 @@
+"""Per-user hot query indexes
+
+Revision ID: e2b8f4a61c93
+Revises: c7d3e1f08a26
+Create Date: 2026-10-18 13:05:12.284470
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e2b8f4a61c93'
+down_revision: Union[str, None] = 'c7d3e1f08a26'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+ACTIVE_JOBS = sa.text("status IN ('pending', 'processing')")
+
+# Plain indexes on primary keys; the PK constraint already indexes them
+REDUNDANT_ID_INDEXES = {
+    'ix_users_id': 'users',
+    'ix_transcription_history_id': 'transcription_history',
+    'ix_content_generation_id': 'content_generation',
+    'ix_jobs_id': 'jobs',
+}
+
+
+def upgrade() -> None:
+    # History listings: WHERE user_id = ? ORDER BY created_at DESC, id DESC
+    op.create_index('ix_transcription_history_user_id_created_at',
+                    'transcription_history',
+                    ['user_id', sa.text('created_at DESC'), sa.text('id DESC')])
+    op.create_index('ix_content_generation_user_id_created_at',
+                    'content_generation',
+                    ['user_id', sa.text('created_at DESC'), sa.text('id DESC')])
+    # /jobs/ongoing/ and the job stream snapshot only ever look at active jobs
+    op.create_index('ix_jobs_user_id_active', 'jobs', ['user_id'],
+                    postgresql_where=ACTIVE_JOBS, sqlite_where=ACTIVE_JOBS)
+
+    for index_name in REDUNDANT_ID_INDEXES:
+        op.execute(f"DROP INDEX IF EXISTS {index_name}")
+
+
+def downgrade() -> None:
+    for index_name, table_name in REDUNDANT_ID_INDEXES.items():
+        op.create_index(index_name, table_name, ['id'], unique=False)
+
+    op.drop_index('ix_jobs_user_id_active', table_name='jobs')
+    op.drop_index('ix_content_generation_user_id_created_at',
+                  table_name='content_generation')
+    op.drop_index('ix_transcription_history_user_id_created_at',
+                  table_name='transcription_history')
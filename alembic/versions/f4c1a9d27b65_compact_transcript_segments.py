@@ -0,0 +1,180 @@
+"""Compact transcript segments
+
+Revision ID: f4c1a9d27b65
+Revises: e2b8f4a61c93
+Create Date: 2026-10-18 14:22:37.903114
+
+"""
+import json
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f4c1a9d27b65'
+down_revision: Union[str, None] = 'e2b8f4a61c93'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 500
+
+history = sa.table('transcription_history',
+                   sa.column('id', sa.Integer),
+                   sa.column('transcript', sa.Text),
+                   sa.column('segments', sa.Text))
+segments_table = sa.table('transcript_segments',
+                          sa.column('transcription_id', sa.Integer),
+                          sa.column('idx', sa.Integer),
+                          sa.column('start_ms', sa.Integer),
+                          sa.column('end_ms', sa.Integer),
+                          sa.column('text', sa.Text))
+cache = sa.table('transcript_cache',
+                 sa.column('cache_key', sa.String),
+                 sa.column('segments', sa.Text))
+
+
+# Segment conversion as of this revision, copied here so that later
+# changes to backend.utils.segments can't change what this migration does
+
+
+def to_ms(seconds):
+    return int(round(float(seconds or 0.0) * 1000))
+
+
+def _compact(segments):
+    """Whisper segments (or already compact ones) down to start/end/text in seconds."""
+    return [{'start': to_ms(segment.get('start')) / 1000,
+             'end': to_ms(segment.get('end')) / 1000,
+             'text': (segment.get('text') or '').strip()}
+            for segment in segments or ()]
+
+
+def loads_segments(raw):
+    """Column-wise {"start": [...], ...} or a legacy verbose_json list."""
+    if not raw:
+        return []
+    data = json.loads(raw)
+    if isinstance(data, dict):
+        return [{'start': start, 'end': end, 'text': text}
+                for start, end, text in zip(data['start'], data['end'], data['text'])]
+    return _compact(data)
+
+
+def dumps_segments(segments):
+    """Column-wise JSON, as the transcript cache stores it."""
+    if not segments:
+        return None
+    columns = {'start': [], 'end': [], 'text': []}
+    for segment in segments:
+        for key in columns:
+            columns[key].append(segment[key])
+    return json.dumps(columns, separators=(',', ':'), ensure_ascii=False)
+
+
+def _decode_transcript(transcript):
+    """Transcripts used to be stored json.dumps'ed; unwrap those."""
+    if transcript and transcript.startswith('"') and transcript.endswith('"'):
+        try:
+            decoded = json.loads(transcript)
+        except ValueError:
+            return transcript
+        if isinstance(decoded, str):
+            return decoded
+    return transcript
+
+
+def _parse_segments(raw):
+    try:
+        return loads_segments(raw)
+    except (ValueError, TypeError, KeyError, AttributeError):
+        return []
+
+
+def _history_batches(conn, *columns):
+    last_id = 0
+    while True:
+        rows = conn.execute(
+            sa.select(history.c.id, *columns)
+            .where(history.c.id > last_id)
+            .order_by(history.c.id)
+            .limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            return
+        yield rows
+        last_id = rows[-1].id
+
+
+def upgrade() -> None:
+    op.create_table('transcript_segments',
+                    sa.Column('transcription_id', sa.Integer(), nullable=False),
+                    sa.Column('idx', sa.Integer(), autoincrement=False, nullable=False),
+                    sa.Column('start_ms', sa.Integer(), nullable=False),
+                    sa.Column('end_ms', sa.Integer(), nullable=False),
+                    sa.Column('text', sa.Text(), nullable=False),
+                    sa.ForeignKeyConstraint(['transcription_id'], ['transcription_history.id'],
+                                            ondelete='CASCADE'),
+                    sa.PrimaryKeyConstraint('transcription_id', 'idx')
+                    )
+
+    conn = op.get_bind()
+    for rows in _history_batches(conn, history.c.transcript, history.c.segments):
+        segment_rows = []
+        for row in rows:
+            for idx, segment in enumerate(_parse_segments(row.segments)):
+                segment_rows.append({
+                    'transcription_id': row.id,
+                    'idx': idx,
+                    'start_ms': to_ms(segment['start']),
+                    'end_ms': to_ms(segment['end']),
+                    'text': segment['text'],
+                })
+            transcript = _decode_transcript(row.transcript)
+            if transcript != row.transcript:
+                conn.execute(history.update().where(history.c.id == row.id)
+                             .values(transcript=transcript))
+        if segment_rows:
+            conn.execute(segments_table.insert(), segment_rows)
+
+    # Cached segments keep their text column, rewritten column-wise
+    for row in conn.execute(sa.select(cache.c.cache_key, cache.c.segments)
+                            .where(cache.c.segments.isnot(None))).all():
+        conn.execute(cache.update().where(cache.c.cache_key == row.cache_key)
+                     .values(segments=dumps_segments(_parse_segments(row.segments))))
+
+    op.drop_column('transcription_history', 'segments')
+
+
+def downgrade() -> None:
+    op.add_column('transcription_history',
+                  sa.Column('segments', sa.TEXT(), autoincrement=False, nullable=True))
+
+    # Only start/end/text survive the round trip; transcripts stay decoded
+    conn = op.get_bind()
+    for rows in _history_batches(conn):
+        ids = [row.id for row in rows]
+        stored = conn.execute(
+            sa.select(segments_table)
+            .where(segments_table.c.transcription_id.in_(ids))
+            .order_by(segments_table.c.transcription_id, segments_table.c.idx)
+        ).all()
+        by_transcription = {}
+        for segment in stored:
+            by_transcription.setdefault(segment.transcription_id, []).append({
+                'id': segment.idx,
+                'start': segment.start_ms / 1000,
+                'end': segment.end_ms / 1000,
+                'text': segment.text,
+            })
+        for transcription_id, segments in by_transcription.items():
+            conn.execute(history.update().where(history.c.id == transcription_id)
+                         .values(segments=json.dumps(segments)))
+
+    for row in conn.execute(sa.select(cache.c.cache_key, cache.c.segments)
+                            .where(cache.c.segments.isnot(None))).all():
+        conn.execute(cache.update().where(cache.c.cache_key == row.cache_key)
+                     .values(segments=json.dumps(_parse_segments(row.segments))))
+
+    op.drop_table('transcript_segments')
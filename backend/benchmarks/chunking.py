@@ -0,0 +1,94 @@
+# backend/benchmarks/chunking.py
+"""
+Fixed 300 s chunks vs silence-aware chunks, on the fake backend:
+
+    python -m backend.benchmarks.chunking [audio file] --minutes 60 --realtime-factor 0.02
+
+Without a file, a synthetic recording (pink-noise "speech" with irregular
+pauses) is generated. For each strategy it reports how many chunk
+boundaries land inside speech (the boundary error rate, judged by
+silencedetect on the same file), how balanced the chunks are, and the
+end-to-end time including planning. Needs ffmpeg/ffprobe.
+"""
+import argparse
+import shutil
+import subprocess
+import time
+from backend.config import settings
+from backend.utils.audio_utils import detect_silences, in_silence, probe_audio
+from backend.utils.transcribe_utils import (fixed_chunks, silence_aware_chunks,
+                                            transcribe_chunks)
+from backend.utils.workspace import job_workspace
+
+# Sum of three slow sines: below the threshold (~15% of the time) is a pause
+_SPEECH_GATE = "gt(sin(0.9*t)+sin(2.3*t+1)+sin(0.37*t+2),-1.2)"
+
+
+def synthesize(path: str, minutes: float):
+    subprocess.run([
+        "ffmpeg", "-y", "-hide_banner", "-loglevel", "error",
+        "-f", "lavfi", "-i", f"anoisesrc=d={minutes * 60}:c=pink:r=16000:a=0.3:seed=42",
+        "-af", f"volume='{_SPEECH_GATE}':eval=frame",
+        "-ac", "1", "-c:a", "libopus", "-b:a", f"{settings.PRECONDITION_BITRATE_KBPS}k",
+        path
+    ], check=True)
+
+
+def run(name: str, path: str, plan, silences, workspace) -> dict:
+    started = time.monotonic()
+    spans = plan()
+    result = transcribe_chunks(path, spans, workspace)
+    elapsed = time.monotonic() - started
+    boundaries = [span.boundary for span in spans[1:]]
+    cut_in_speech = sum(1 for t in boundaries if not in_silence(t, silences))
+    lengths = [span.end - span.boundary for span in spans]
+    return {
+        "strategy": name,
+        "chunks": len(spans),
+        "boundary_error_rate": cut_in_speech / len(boundaries) if boundaries else 0.0,
+        "shortest_chunk_s": min(lengths),
+        "longest_chunk_s": max(lengths),
+        "seconds": elapsed,
+        "segments": len(result["segments"]),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare chunking strategies.")
+    parser.add_argument("audio", nargs="?", help="audio file (default: synthetic)")
+    parser.add_argument("--minutes", type=float, default=60, help="length of the synthetic audio")
+    parser.add_argument("--realtime-factor", type=float, default=0.02,
+                        help="fake transcription seconds per second of audio")
+    args = parser.parse_args()
+    missing = [tool for tool in ("ffmpeg", "ffprobe") if shutil.which(tool) is None]
+    if missing:
+        parser.error(f"needs {' and '.join(missing)} on the PATH")
+
+    settings.TRANSCRIPTION_BACKEND = "fake"
+    settings.FAKE_TRANSCRIBE_REALTIME_FACTOR = args.realtime_factor
+    with job_workspace("benchmark") as workspace:
+        path = args.audio
+        if not path:
+            path = workspace.file("synthetic.ogg")
+            synthesize(path, args.minutes)
+        duration = probe_audio(path).duration
+        # Reference pauses; the silence-aware plan runs its own detection
+        # so that its cost is part of its time
+        silences = detect_silences(path)
+        print(f"🎧 {path}: {duration:.0f}s, {len(silences)} pauses, "
+              f"{settings.TRANSCRIBE_MAX_WORKERS} workers")
+        rows = [
+            run("fixed", path, lambda: fixed_chunks(duration, 300), silences, workspace),
+            run("silence-aware", path,
+                lambda: silence_aware_chunks(path, duration, settings.CHUNK_TARGET_SECONDS),
+                silences, workspace),
+        ]
+        for row in rows:
+            print(f"{row['strategy']:>14}: {row['chunks']} chunks, "
+                  f"boundary errors {row['boundary_error_rate']:.0%}, "
+                  f"chunk length {row['shortest_chunk_s']:.0f}-{row['longest_chunk_s']:.0f}s, "
+                  f"{row['seconds']:.1f}s end to end, {row['segments']} segments")
+
+
+if __name__ == "__main__":
+    main()
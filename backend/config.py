@@ -1,5 +1,6 @@
 # backend/config.py
 from pathlib import Path
+from pydantic import PositiveInt
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 # Adjusts to your project root
@@ -13,6 +14,116 @@ class Settings(BaseSettings):
     DATABASE_URL: str
     SECRET_KEY: str
     CLIENT_HOST: str
+    # Database pool (async engine); the timeout is applied per statement on Postgres
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_PRE_PING: bool = True
+    DB_POOL_RECYCLE_SECONDS: int = 1800
+    DB_STATEMENT_TIMEOUT_MS: int = 30000
+    # OpenAI API (Whisper and chat): point OPENAI_BASE_URL at a fake server in tests
+    OPENAI_BASE_URL: str = "https://api.openai.com/v1"
+    # Process-wide request budget; size it to the account's rate limit
+    OPENAI_REQUESTS_PER_MINUTE: PositiveInt = 500
+    OPENAI_BURST: PositiveInt = 20
+    HTTP_CONNECT_TIMEOUT_SECONDS: float = 10.0
+    HTTP_READ_TIMEOUT_SECONDS: float = 300.0
+    # Retries on 429/5xx/connection errors, with jittered exponential backoff
+    HTTP_MAX_ATTEMPTS: int = 5
+    HTTP_BACKOFF_BASE_SECONDS: float = 1.0
+    HTTP_BACKOFF_MAX_SECONDS: float = 60.0
+    # Overall time allowed per call, retries included
+    WHISPER_DEADLINE_SECONDS: float = 900.0
+    GENERATION_DEADLINE_SECONDS: float = 600.0
+    # Speech-to-text engine: "openai" (Whisper API), "local" (faster-whisper,
+    # int8 on CPU, needs LOCAL_WHISPER_MODEL_PATH) or "fake" (load tests)
+    TRANSCRIPTION_BACKEND: str = "openai"
+    LOCAL_WHISPER_MODEL_PATH: str = ""
+    LOCAL_WHISPER_CPU_THREADS: int = 4
+    LOCAL_WHISPER_WORKERS: int = 1
+    FAKE_TRANSCRIBE_LATENCY_SECONDS: float = 0.0
+    # Extra fake processing time per second of audio (0.05 = 20x real time)
+    FAKE_TRANSCRIBE_REALTIME_FACTOR: float = 0.0
+    # Audio is re-encoded to mono 16 kHz Opus at this bitrate before
+    # transcription (~10 MB per hour at 24 kbit/s); optionally with leading
+    # and trailing silence trimmed
+    AUDIO_PRECONDITION: bool = True
+    PRECONDITION_BITRATE_KBPS: int = 24
+    PRECONDITION_TRIM_SILENCE: bool = False
+    # Opus/AAC/Vorbis at or below this bitrate that fits in one request is
+    # sent as is (e.g. YouTube audio), skipping the re-encode
+    PASSTHROUGH_MAX_KBPS: int = 64
+    # Silence detection: quieter than SILENCE_NOISE_DB for at least SILENCE_MIN_SECONDS
+    SILENCE_NOISE_DB: float = -35.0
+    SILENCE_MIN_SECONDS: float = 0.5
+    # Files over the backend's size limit are split into equal chunks of at
+    # most ~CHUNK_TARGET_SECONDS, cut at the nearest pause within the
+    # tolerance, each overlapping the previous one by CHUNK_OVERLAP_SECONDS
+    CHUNK_TARGET_SECONDS: float = 300.0
+    CHUNK_SPLIT_TOLERANCE_SECONDS: float = 20.0
+    CHUNK_OVERLAP_SECONDS: float = 2.0
+    # YouTube: lowest audio bitrate accepted when picking the smallest format
+    YOUTUBE_MIN_AUDIO_KBPS: int = 32
+    # YouTube subtitles instead of Whisper when an acceptable track exists:
+    # creator subtitles in the video's language (CAPTION_LANGUAGES when it is
+    # unknown), else auto captions in the video's language, with cues on
+    # screen for CAPTION_MIN_COVERAGE of its duration
+    YOUTUBE_CAPTIONS: bool = True
+    CAPTION_LANGUAGES: str = "id,en"
+    CAPTION_MIN_COVERAGE: float = 0.5
+    # Per-job scratch space for downloads, conditioned audio and chunks;
+    # empty means /dev/shm/stt-scratch (tmpfs) when available, else the
+    # system temp dir, which is also where a job goes when its input won't
+    # fit in the space left. Quotas are per job and for all jobs together.
+    SCRATCH_DIR: str = ""
+    WORKSPACE_MAX_BYTES: int = 1024 * 1024 * 1024
+    SCRATCH_MAX_BYTES: int = 4 * 1024 * 1024 * 1024
+    # Chunked transcription: threads per job and process-wide in-flight cap
+    TRANSCRIBE_MAX_WORKERS: int = 4
+    TRANSCRIBE_MAX_CONCURRENCY: int = 8
+    # Verified logins kept in memory so most requests skip the users query;
+    # password changes and deleted users take up to the TTL to apply
+    AUTH_CACHE_SIZE: int = 10000
+    AUTH_CACHE_TTL_SECONDS: int = 60
+    # Comma-separated emails of users allowed to see host-level stats
+    # (e.g. GET /jobs/workspaces); empty means nobody
+    ADMIN_EMAILS: str = ""
+    # Largest upload a user may send, checked while the bytes stream in
+    MAX_UPLOAD_BYTES: int = 2 * 1024 * 1024 * 1024
+    # Per user: bytes in unfinished resumable uploads plus the upload being
+    # sent; sessions untouched for UPLOAD_SESSION_TTL_HOURS stop counting
+    USER_UPLOAD_QUOTA_BYTES: int = 4 * 1024 * 1024 * 1024
+    UPLOAD_SESSION_TTL_HOURS: float = 24.0
+    # Job queue / worker (python -m backend.worker)
+    WORKER_CONCURRENCY: int = 2
+    WORKER_POLL_SECONDS: float = 2.0
+    JOB_LEASE_SECONDS: int = 120
+    JOB_HEARTBEAT_SECONDS: int = 30
+    JOB_MAX_ATTEMPTS: int = 3
+    # A job whose task raised is retried after this, doubling per attempt
+    JOB_RETRY_BACKOFF_SECONDS: float = 30.0
+    # A job waiting on another job's shared work copies its progress this often
+    JOB_FOLLOW_POLL_SECONDS: float = 2.0
+    # Responses smaller than this are sent uncompressed
+    COMPRESSION_MIN_BYTES: int = 1024
+    # Streaming article generation: how often new text is pushed to clients
+    # (at least GENERATION_NOTIFY_FLUSH_SECONDS apart when it goes through
+    # Postgres NOTIFY) and how often the partial article is saved on the job row
+    GENERATION_FLUSH_SECONDS: float = 0.1
+    GENERATION_NOTIFY_FLUSH_SECONDS: float = 0.5
+    GENERATION_CHECKPOINT_SECONDS: float = 2.0
+    # Model for article generation (part of the generation cache key)
+    GENERATION_MODEL: str = "gpt-4o"
+    # Generation cache: least recently used entries beyond the cap, and
+    # entries unused for the TTL, are evicted
+    GENERATION_CACHE_MAX_ENTRIES: int = 10000
+    GENERATION_CACHE_TTL_DAYS: int = 30
+    # Transcripts longer than this (counted locally) are condensed in
+    # GENERATION_SECTION_TOKENS sections, in parallel, before the article pass
+    LONG_TRANSCRIPT_TOKENS: int = 30000
+    GENERATION_SECTION_TOKENS: int = 8000
+    GENERATION_MAP_CONCURRENCY: int = 4
+    # Job status events: "auto" (Postgres LISTEN/NOTIFY when available), "memory" or "postgres"
+    JOB_EVENTS_BACKEND: str = "auto"
     model_config = SettingsConfigDict(
         env_file=str(BASE_DIR / ".env"),
         env_file_encoding="utf-8"
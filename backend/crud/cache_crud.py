@@ -0,0 +1,99 @@
+# backend/crud/cache_crud.py
+from datetime import datetime, timedelta
+from sqlalchemy import func, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from backend.config import settings
+from backend.models.transcript_cache import TranscriptCache
+from backend.models.content_generation import ContentGeneration
+
+
+def audio_cache_key(audio_hash: str) -> str:
+    return f"sha256:{audio_hash}"
+
+
+def youtube_cache_key(video_id: str) -> str:
+    return f"youtube:{video_id}"
+
+
+def youtube_captions_cache_key(video_id: str) -> str:
+    # Kept apart from the Whisper entry, which a user may still ask for
+    return f"youtube-captions:{video_id}"
+
+
+async def get_cached_transcript(db: AsyncSession, cache_key: str):
+    return await db.scalar(select(TranscriptCache).where(
+        TranscriptCache.cache_key == cache_key
+    ))
+
+
+async def store_cached_transcript(
+    db: AsyncSession,
+    cache_key: str,
+    transcript: str,
+    segments: str = None,
+    title: str = None
+):
+    """Insert a cache entry; if another job stored the same key first, keep theirs."""
+    entry = TranscriptCache(
+        cache_key=cache_key,
+        transcript=transcript,
+        segments=segments,
+        title=title
+    )
+    db.add(entry)
+    try:
+        await db.commit()
+    except IntegrityError:
+        await db.rollback()
+        return await get_cached_transcript(db, cache_key)
+    await db.refresh(entry)
+    return entry
+
+
+# --- Generation cache --------------------------------------------------------
+# Entries are ContentGeneration rows with a cache_key; evicting an entry only
+# clears its key, the user's article stays.
+
+def _cache_cutoff() -> datetime:
+    return datetime.utcnow() - timedelta(days=settings.GENERATION_CACHE_TTL_DAYS)
+
+
+async def get_cached_generation(db: AsyncSession, cache_key: str):
+    """Newest live entry for the key, marked as just used; None on a miss."""
+    entry = await db.scalar(
+        select(ContentGeneration)
+        .where(ContentGeneration.cache_key == cache_key,
+               ContentGeneration.cache_used_at >= _cache_cutoff())
+        .order_by(ContentGeneration.cache_used_at.desc())
+        .limit(1))
+    if entry:
+        entry.cache_used_at = datetime.utcnow()
+        await db.commit()
+    return entry
+
+
+async def count_cached_generations(db: AsyncSession) -> int:
+    return await db.scalar(select(func.count()).select_from(ContentGeneration).where(
+        ContentGeneration.cache_key.isnot(None)))
+
+
+async def evict_generation_cache(db: AsyncSession) -> int:
+    """Drop entries past GENERATION_CACHE_TTL_DAYS, then the least recently used over the cap."""
+    expired = await db.execute(update(ContentGeneration).where(
+        ContentGeneration.cache_key.isnot(None),
+        ContentGeneration.cache_used_at < _cache_cutoff()
+    ).values(cache_key=None))
+    evicted = expired.rowcount or 0
+
+    excess = await count_cached_generations(db) - settings.GENERATION_CACHE_MAX_ENTRIES
+    if excess > 0:
+        oldest = select(ContentGeneration.id).where(
+            ContentGeneration.cache_key.isnot(None)
+        ).order_by(ContentGeneration.cache_used_at).limit(excess).scalar_subquery()
+        result = await db.execute(update(ContentGeneration).where(
+            ContentGeneration.id.in_(oldest)
+        ).values(cache_key=None))
+        evicted += result.rowcount or 0
+    await db.commit()
+    return evicted
@@ -0,0 +1,63 @@
+# backend/crud/content_crud.py
+from typing import Optional
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from backend.models.content_generation import ContentGeneration
+from backend.models.transcription import TranscriptionHistory
+from backend.utils.pagination import keyset_page
+
+
+async def list_content_generations(
+    db: AsyncSession,
+    user_id: int,
+    limit: int,
+    cursor: Optional[str] = None,
+    include_content: bool = True
+):
+    """
+    One newest-first page of the user's generated content. The source
+    transcription title comes from a join, so the page costs one query.
+    """
+    columns = [
+        ContentGeneration.id,
+        ContentGeneration.title,
+        ContentGeneration.transcription_history_id,
+        ContentGeneration.created_at,
+        ContentGeneration.config,
+        TranscriptionHistory.title.label("transcription_title"),
+    ]
+    if include_content:
+        columns.append(ContentGeneration.generated_content)
+    stmt = (
+        select(*columns)
+        .outerjoin(TranscriptionHistory,
+                   TranscriptionHistory.id == ContentGeneration.transcription_history_id)
+        .where(ContentGeneration.user_id == user_id)
+    )
+    return await keyset_page(db, stmt, ContentGeneration.created_at,
+                             ContentGeneration.id, cursor, limit)
+
+
+async def get_content_generation(db: AsyncSession, user_id: int, content_id: int):
+    result = await db.execute(
+        select(ContentGeneration, TranscriptionHistory.title.label("transcription_title"))
+        .outerjoin(TranscriptionHistory,
+                   TranscriptionHistory.id == ContentGeneration.transcription_history_id)
+        .where(ContentGeneration.id == content_id,
+               ContentGeneration.user_id == user_id)
+    )
+    return result.first()
+
+
+def content_summary(row) -> dict:
+    item = {
+        "id": row.id,
+        "title": row.title,
+        "transcription_history_id": row.transcription_history_id,
+        "transcription_title": row.transcription_title,
+        "created_at": row.created_at,
+        "config": row.config,
+    }
+    if "generated_content" in row._fields:
+        item["generated_content"] = row.generated_content
+    return item
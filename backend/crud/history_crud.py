@@ -1,27 +1,97 @@
 # backend/crud/history_crud.py
-import json
-from sqlalchemy.orm import Session
+from typing import List, Optional
+from sqlalchemy import and_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import load_only
 from backend.models.transcription import TranscriptionHistory
+from backend.models.transcript_segment import TranscriptSegment
+from backend.utils.segments import to_ms
+from backend.utils.pagination import keyset_page
 
+# Listing columns; the transcript is only loaded by get_history_record
+SUMMARY_COLUMNS = (
+    TranscriptionHistory.id,
+    TranscriptionHistory.title,
+    TranscriptionHistory.source,
+    TranscriptionHistory.video_url,
+    TranscriptionHistory.created_at,
+)
 
-def create_history_record(
-    db: Session,
+
+async def create_history_record(
+    db: AsyncSession,
     user_id: int,
     source: str,
     video_url: str,
     transcript: str,
     title: str = None,
-    segments: str = None    # NEW parameter for segmentation data
+    segments: List[dict] = None    # compact segments, see utils/segments.py
 ):
     history = TranscriptionHistory(
         user_id=user_id,
         source=source,
         video_url=video_url,
-        transcript=json.dumps(transcript),
+        transcript=transcript,
         title=title,
-        segments=segments      # Store segments (as a JSON string)
+        segments=[
+            TranscriptSegment(idx=idx, start_ms=to_ms(segment["start"]),
+                              end_ms=to_ms(segment["end"]), text=segment["text"])
+            for idx, segment in enumerate(segments or ())
+        ]
     )
     db.add(history)
-    db.commit()
-    db.refresh(history)
+    await db.commit()
+    await db.refresh(history)
     return history
+
+
+async def list_history_summaries(db: AsyncSession, user_id: int, limit: int, cursor: Optional[str] = None):
+    """One newest-first page of the user's transcriptions, without the large columns."""
+    stmt = (
+        select(TranscriptionHistory)
+        .options(load_only(*SUMMARY_COLUMNS))
+        .where(TranscriptionHistory.user_id == user_id)
+    )
+    return await keyset_page(db, stmt, TranscriptionHistory.created_at,
+                             TranscriptionHistory.id, cursor, limit, scalars=True)
+
+
+async def get_history_record(db: AsyncSession, user_id: int, history_id: int):
+    return await db.scalar(select(TranscriptionHistory).where(
+        TranscriptionHistory.id == history_id,
+        TranscriptionHistory.user_id == user_id
+    ))
+
+
+async def get_segments(
+    db: AsyncSession,
+    user_id: int,
+    history_id: int,
+    t0: float = 0.0,
+    t1: Optional[float] = None
+) -> Optional[List[dict]]:
+    """
+    Segments of one of the user's transcriptions that overlap [t0, t1)
+    seconds (t1=None means to the end), in playback order. Returns None when
+    the transcription doesn't exist or belongs to someone else.
+    """
+    overlaps = [TranscriptSegment.transcription_id == TranscriptionHistory.id,
+                TranscriptSegment.end_ms > to_ms(t0)]
+    if t1 is not None:
+        overlaps.append(TranscriptSegment.start_ms < to_ms(t1))
+    # Outer join: the ownership check and the range scan are one query
+    result = await db.execute(
+        select(TranscriptSegment.start_ms, TranscriptSegment.end_ms, TranscriptSegment.text)
+        .select_from(TranscriptionHistory)
+        .outerjoin(TranscriptSegment, and_(*overlaps))
+        .where(TranscriptionHistory.id == history_id,
+               TranscriptionHistory.user_id == user_id)
+        .order_by(TranscriptSegment.idx)
+    )
+    rows = result.all()
+    if not rows:
+        return None
+    return [
+        {"start": row.start_ms / 1000, "end": row.end_ms / 1000, "text": row.text}
+        for row in rows if row.start_ms is not None
+    ]
@@ -0,0 +1,182 @@
+# backend/crud/search_crud.py
+"""
+Ranked full-text search over a user's transcriptions and generated content.
+Postgres matches against the stored search_vector columns (GIN-indexed);
+SQLite uses the FTS5 tables. See backend/utils/fts.py for both indexes.
+"""
+import html
+import re
+from typing import List, Optional, Tuple
+from sqlalchemy import func, literal, literal_column, or_, select, text, union_all
+from sqlalchemy.ext.asyncio import AsyncSession
+from backend.models.transcription import TranscriptionHistory
+from backend.models.content_generation import ContentGeneration
+from backend.models.transcript_segment import TranscriptSegment
+from backend.utils.fts import FTS_CONFIG
+
+SCOPES = ("all", "transcriptions", "content")
+# Segment timestamps returned per transcription hit
+MAX_SEGMENT_MATCHES = 10
+
+# Private-use characters mark highlights until the snippet has been escaped
+_MARK_START, _MARK_END = "\ue000", "\ue001"
+_HEADLINE_OPTIONS = (f"StartSel={_MARK_START}, StopSel={_MARK_END}, "
+                     "MaxFragments=2, MaxWords=20, MinWords=8, FragmentDelimiter=\" … \"")
+_TAG = re.compile(r"<[^>]*>|^[^<>]*>|<[^<>]*$")
+_TERM = re.compile(r"\w+", re.UNICODE)
+
+
+def _snippet_html(snippet: Optional[str]) -> str:
+    """Escape a raw snippet and turn the highlight marks into <mark> tags."""
+    plain = _TAG.sub(" ", snippet or "")
+    escaped = html.escape(" ".join(plain.split()))
+    return escaped.replace(_MARK_START, "<mark>").replace(_MARK_END, "</mark>")
+
+
+def query_terms(q: str) -> List[str]:
+    return [term.lower() for term in _TERM.findall(q)]
+
+
+def _config():
+    return literal_column(f"'{FTS_CONFIG}'::regconfig")
+
+
+def _tsquery(q: str):
+    # websearch syntax: "exact phrase", OR, -excluded
+    return func.websearch_to_tsquery(_config(), q)
+
+
+async def _postgres_page(db: AsyncSession, user_id: int, q: str, scope: str, limit: int, offset: int):
+    query = _tsquery(q)
+    parts = []
+    if scope in ("all", "transcriptions"):
+        vector = literal_column("transcription_history.search_vector")
+        parts.append(
+            select(literal("transcription").label("kind"), TranscriptionHistory.id,
+                   TranscriptionHistory.title, TranscriptionHistory.created_at,
+                   func.ts_rank(vector, query).label("rank"))
+            .where(TranscriptionHistory.user_id == user_id, vector.op("@@")(query)))
+    if scope in ("all", "content"):
+        vector = literal_column("content_generation.search_vector")
+        parts.append(
+            select(literal("content").label("kind"), ContentGeneration.id,
+                   ContentGeneration.title, ContentGeneration.created_at,
+                   func.ts_rank(vector, query).label("rank"))
+            .where(ContentGeneration.user_id == user_id, vector.op("@@")(query)))
+    hits = union_all(*parts).subquery() if len(parts) > 1 else parts[0].subquery()
+    result = await db.execute(
+        select(hits)
+        .order_by(hits.c.rank.desc(), hits.c.created_at.desc(), hits.c.id.desc())
+        .offset(offset).limit(limit + 1))
+    rows = result.all()
+
+    # Headlines are the expensive part, so only the page's rows get one
+    snippets = {}
+    for kind, model, body in (
+        ("transcription", TranscriptionHistory, TranscriptionHistory.transcript),
+        ("content", ContentGeneration, ContentGeneration.generated_content),
+    ):
+        ids = [row.id for row in rows[:limit] if row.kind == kind]
+        if ids:
+            headlines = await db.execute(
+                select(model.id, func.ts_headline(_config(), body, query, _HEADLINE_OPTIONS))
+                .where(model.id.in_(ids)))
+            snippets.update({(kind, id_): snippet for id_, snippet in headlines.all()})
+    return rows, snippets
+
+
+_SQLITE_PARTS = {
+    "transcriptions": """
+        SELECT 'transcription' AS kind, t.id, t.title, t.created_at,
+               -bm25(transcription_history_fts, 10.0, 1.0) AS rank,
+               snippet(transcription_history_fts, 1, :mark_start, :mark_end, ' … ', 16) AS snippet
+        FROM transcription_history_fts
+        JOIN transcription_history t ON t.id = transcription_history_fts.rowid
+        WHERE transcription_history_fts MATCH :match AND t.user_id = :user_id""",
+    "content": """
+        SELECT 'content' AS kind, c.id, c.title, c.created_at,
+               -bm25(content_generation_fts, 10.0, 1.0) AS rank,
+               snippet(content_generation_fts, 1, :mark_start, :mark_end, ' … ', 16) AS snippet
+        FROM content_generation_fts
+        JOIN content_generation c ON c.id = content_generation_fts.rowid
+        WHERE content_generation_fts MATCH :match AND c.user_id = :user_id""",
+}
+
+
+async def _sqlite_page(db: AsyncSession, user_id: int, q: str, scope: str, limit: int, offset: int):
+    terms = query_terms(q)
+    if not terms:
+        return [], {}
+    # Quote every term so user input can't inject FTS5 syntax; terms are ANDed
+    match = " ".join(f'"{term}"' for term in terms)
+    parts = [sql for key, sql in _SQLITE_PARTS.items() if scope in ("all", key)]
+    result = await db.execute(
+        text(" UNION ALL ".join(parts) +
+             " ORDER BY rank DESC, created_at DESC, id DESC LIMIT :limit OFFSET :offset"),
+        {"match": match, "user_id": user_id, "mark_start": _MARK_START,
+         "mark_end": _MARK_END, "limit": limit + 1, "offset": offset})
+    rows = result.all()
+    return rows, {(row.kind, row.id): row.snippet for row in rows}
+
+
+async def _segment_matches(db: AsyncSession, transcription_ids: List[int], q: str) -> dict:
+    """
+    Timestamps of the segments that mention any query term, for the
+    transcriptions on the page. A phrase often straddles two segments, so
+    segments are matched per term rather than against the whole query.
+    """
+    terms = query_terms(q)
+    if not transcription_ids or not terms:
+        return {}
+    if db.get_bind().dialect.name == "postgresql":
+        # \w+ terms can't carry tsquery operators, so joining them is safe
+        matches = func.to_tsvector(_config(), TranscriptSegment.text).op("@@")(
+            func.to_tsquery(_config(), " | ".join(terms)))
+    else:
+        matches = or_(*[func.lower(TranscriptSegment.text).contains(term, autoescape=True)
+                        for term in terms])
+    result = await db.execute(
+        select(TranscriptSegment.transcription_id, TranscriptSegment.start_ms,
+               TranscriptSegment.end_ms, TranscriptSegment.text)
+        .where(TranscriptSegment.transcription_id.in_(transcription_ids), matches)
+        .order_by(TranscriptSegment.transcription_id, TranscriptSegment.idx))
+    by_transcription = {}
+    for row in result.all():
+        found = by_transcription.setdefault(row.transcription_id, [])
+        if len(found) < MAX_SEGMENT_MATCHES:
+            found.append({"start": row.start_ms / 1000,
+                          "end": row.end_ms / 1000, "text": row.text})
+    return by_transcription
+
+
+async def search(
+    db: AsyncSession,
+    user_id: int,
+    q: str,
+    scope: str = "all",
+    limit: int = 20,
+    offset: int = 0
+) -> Tuple[List[dict], Optional[int]]:
+    """One ranked page of search hits and the offset of the next page (or None)."""
+    if db.get_bind().dialect.name == "postgresql":
+        rows, snippets = await _postgres_page(db, user_id, q, scope, limit, offset)
+    else:
+        rows, snippets = await _sqlite_page(db, user_id, q, scope, limit, offset)
+    next_offset = offset + limit if len(rows) > limit else None
+    rows = rows[:limit]
+
+    segments = await _segment_matches(
+        db, [row.id for row in rows if row.kind == "transcription"], q)
+    items = [
+        {
+            "kind": row.kind,
+            "id": row.id,
+            "title": row.title,
+            "created_at": row.created_at,
+            "rank": float(row.rank),
+            "snippet": _snippet_html(snippets.get((row.kind, row.id))),
+            "segments": segments.get(row.id, []) if row.kind == "transcription" else None,
+        }
+        for row in rows
+    ]
+    return items, next_offset
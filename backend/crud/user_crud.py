@@ -1,20 +1,23 @@
 # backend/crud/user_crud.py
 
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
 from passlib.context import CryptContext
 from backend.models.user import User
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 
-def create_user(db: Session, email: str, password: str) -> User:
-    password_hash = pwd_context.hash(password)
+async def create_user(db: AsyncSession, email: str, password: str) -> User:
+    # bcrypt is deliberately slow; keep it off the event loop
+    password_hash = await run_in_threadpool(pwd_context.hash, password)
     new_user = User(email=email, password_hash=password_hash)
     db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
+    await db.commit()
+    await db.refresh(new_user)
     return new_user
 
 
-def get_user_by_email(db: Session, email: str) -> User:
-    return db.query(User).filter(User.email == email).first()
+async def get_user_by_email(db: AsyncSession, email: str) -> User:
+    return await db.scalar(select(User).where(User.email == email))
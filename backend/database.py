@@ -1,17 +1,51 @@
 # backend/database.py
 
-from sqlalchemy import create_engine
-from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import declarative_base
 from backend.config import settings
 
 DATABASE_URL = settings.DATABASE_URL
 
-engine = create_engine(DATABASE_URL)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+def async_database_url(url: str) -> str:
+    """Point a plain DATABASE_URL at the async drivers (asyncpg / aiosqlite)."""
+    for prefix in ("postgresql+psycopg2://", "postgresql://", "postgres://"):
+        if url.startswith(prefix):
+            return "postgresql+asyncpg://" + url[len(prefix):]
+    if url.startswith("sqlite://"):
+        return "sqlite+aiosqlite://" + url[len("sqlite://"):]
+    return url
+
+
+def _engine_options() -> dict:
+    if not DATABASE_URL.startswith(("postgres", "postgresql")):
+        # SQLite (tests): aiosqlite runs each connection on its own thread
+        return {}
+    return {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+        "pool_recycle": settings.DB_POOL_RECYCLE_SECONDS,
+        "connect_args": {
+            "server_settings": {
+                "statement_timeout": str(settings.DB_STATEMENT_TIMEOUT_MS),
+            },
+        },
+    }
+
+
+engine = create_async_engine(async_database_url(DATABASE_URL), **_engine_options())
+# expire_on_commit=False: objects stay readable after commit without
+# triggering implicit (and, under asyncio, illegal) lazy loads
+SessionLocal = async_sessionmaker(
+    engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
 Base = declarative_base()
 
 
-def init_db():
-    from backend.models import user, transcription, content_generation, job  # Append job
-    Base.metadata.create_all(bind=engine)
+async def init_db():
+    from backend.models import (user, transcription, content_generation, job,
+                                transcript_cache, transcript_segment)
+    from backend.utils.fts import ensure_search_index
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(ensure_search_index)
@@ -1,17 +1,15 @@
 # backend/main.py
-from fastapi import Depends, FastAPI, HTTPException
+from fastapi import FastAPI
+import asyncio
 from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
 import uvicorn
 from backend.config import settings
-from backend.routers import youtube, generate, auth, history, upload, content_history
+from backend.routers import youtube, generate, auth, history, upload, content_history, jobs
 from backend.database import init_db
-from backend.utils.dependencies import get_db, get_current_user
-from backend.utils.job_status import get_job
-from backend.models.user import User
-from backend.models.job import Job
-from sqlalchemy.orm import Session
-from typing import List
+from backend.utils.job_events import start_job_event_listener
+from backend.utils.compression import CompressionMiddleware
+from backend.utils.workspace import cleanup_orphan_workspaces
 
 print("DEBUG: DATABASE_URL is:", settings.DATABASE_URL)
 
@@ -24,8 +22,11 @@ def create_app() -> FastAPI:
     )
 
     @app.on_event("startup")
-    def on_startup():
-        init_db()
+    async def on_startup():
+        await init_db()
+        start_job_event_listener()
+        # Walks the scratch dirs; keep it off the event loop
+        await asyncio.to_thread(cleanup_orphan_workspaces)
 
     app.add_middleware(
         CORSMiddleware,
@@ -35,6 +36,13 @@ def create_app() -> FastAPI:
         allow_headers=["*"],
     )
 
+    # Large JSON listings and job status; event streams pass through untouched
+    app.add_middleware(
+        CompressionMiddleware,
+        paths=("/history", "/content-history", "/jobs"),
+        minimum_size=settings.COMPRESSION_MIN_BYTES,
+    )
+
     app.include_router(auth.router, prefix="/auth", tags=["Auth"])
     app.include_router(youtube.router, prefix="/youtube", tags=["YouTube"])
     app.include_router(generate.router, prefix="/generate", tags=["Generate"])
@@ -42,33 +50,9 @@ def create_app() -> FastAPI:
     app.include_router(upload.router, prefix="/upload", tags=["Upload"])
     app.include_router(content_history.router,
                        prefix="/content-history", tags=["Content History"])
+    app.include_router(jobs.router, prefix="/jobs", tags=["Jobs"])
     app.mount("/uploads", StaticFiles(directory="uploads"), name="uploads")
 
-    @app.get("/jobs/{job_id}/status")
-    async def get_global_job_status(job_id: str, db: Session = Depends(get_db)):
-        job = get_job(job_id, db)
-        if not job:
-            raise HTTPException(status_code=404, detail="Job ID not found")
-        return job
-
-    @app.get("/jobs/ongoing/", response_model=List[dict])
-    async def get_ongoing_jobs(db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
-        """Retrieve all ongoing jobs (pending or processing) for the authenticated user."""
-        jobs = db.query(Job).filter(
-            Job.user_id == current_user.id,
-            Job.status.in_(["pending", "processing"])
-        ).all()
-        return [
-            {
-                "job_id": job.id,
-                "status": job.status,
-                "created_at": job.created_at.isoformat() if job.created_at else None,
-                "completed_at": job.completed_at.isoformat() if job.completed_at else None,
-                "title": job.title,  # Include title
-            }
-            for job in jobs
-        ]
-
     return app
 
 
@@ -1,5 +1,5 @@
 # backend/models/content_generation.py
-from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime, func
+from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime, Index, func
 from sqlalchemy.orm import relationship
 from sqlalchemy.dialects.postgresql import JSON
 from backend.database import Base
@@ -8,7 +8,7 @@ from backend.database import Base
 class ContentGeneration(Base):
     __tablename__ = 'content_generation'
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     user_id = Column(Integer, ForeignKey('users.id'), nullable=False)
     transcription_history_id = Column(Integer, ForeignKey(
         'transcription_history.id'), nullable=False)
@@ -18,7 +18,18 @@ class ContentGeneration(Base):
 
     # New column to store user config
     config = Column(JSON, nullable=True)
+    # Generation cache: hash of transcript + style + model (see
+    # utils/generation_cache.py); cleared again when the entry is evicted
+    cache_key = Column(String, nullable=True)
+    cache_used_at = Column(DateTime, nullable=True)
 
     user = relationship("User", back_populates="content_generations")
     transcription_history = relationship(
         "TranscriptionHistory", back_populates="content_generations")
+
+    __table_args__ = (
+        # Content history listing: WHERE user_id = ? ORDER BY created_at DESC, id DESC
+        Index("ix_content_generation_user_id_created_at",
+              user_id, created_at.desc(), id.desc()),
+        Index("ix_content_generation_cache_key", cache_key),
+    )
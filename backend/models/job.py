@@ -1,12 +1,12 @@
 # backend/models/job.py
 # Ensure Integer is imported
-from sqlalchemy import Column, String, Text, DateTime, func, ForeignKey, Integer
+from sqlalchemy import Column, String, Text, DateTime, func, ForeignKey, Integer, Float, JSON, Index
 from backend.database import Base
 
 
 class Job(Base):
     __tablename__ = "jobs"
-    id = Column(String, primary_key=True, index=True)
+    id = Column(String, primary_key=True)
     user_id = Column(Integer, ForeignKey("users.id"),
                      nullable=False)
     status = Column(String, nullable=False, default="pending")
@@ -14,3 +14,39 @@ class Job(Base):
     transcript = Column(Text, nullable=True)
     created_at = Column(DateTime, default=func.now())
     completed_at = Column(DateTime, nullable=True)
+    progress = Column(Float, nullable=True)  # 0..1 while processing
+    # From ffprobe of the input audio, for ETA estimates
+    duration_seconds = Column(Float, nullable=True)
+    bitrate = Column(Integer, nullable=True)  # bits per second
+
+    # Queue fields: which task runs the job and with what arguments
+    kind = Column(String, nullable=True)
+    payload = Column(JSON, nullable=True)
+    attempts = Column(Integer, nullable=False, default=0)
+    # Lease held by the worker currently running the job
+    lease_owner = Column(String, nullable=True)
+    lease_expires_at = Column(DateTime, nullable=True)
+    heartbeat_at = Column(DateTime, nullable=True)
+    last_error = Column(Text, nullable=True)
+    # A failed attempt is retried no earlier than this (backoff)
+    available_at = Column(DateTime, nullable=True)
+    # Identical requests attach to the active job with the same key
+    dedupe_key = Column(String, nullable=True)
+    # Work shared across users (e.g. one video's Whisper run): at most one
+    # active job holds a given key, the others follow it
+    flight_key = Column(String, nullable=True)
+
+    __table_args__ = (
+        # Queue polling: oldest pending job first
+        Index("ix_jobs_status_created_at", "status", "created_at"),
+        # Ongoing jobs per user; only active rows are indexed
+        Index("ix_jobs_user_id_active", user_id,
+              postgresql_where=status.in_(["pending", "processing"]),
+              sqlite_where=status.in_(["pending", "processing"])),
+        Index("ix_jobs_dedupe_key_active", dedupe_key,
+              postgresql_where=status.in_(["pending", "processing"]),
+              sqlite_where=status.in_(["pending", "processing"])),
+        Index("ix_jobs_flight_key_active", flight_key, unique=True,
+              postgresql_where=status.in_(["pending", "processing"]),
+              sqlite_where=status.in_(["pending", "processing"])),
+    )
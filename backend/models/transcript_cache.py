@@ -0,0 +1,15 @@
+# backend/models/transcript_cache.py
+from sqlalchemy import Column, String, Text, DateTime, func
+from backend.database import Base
+
+
+class TranscriptCache(Base):
+    """Finished transcripts shared across users, keyed by their source."""
+    __tablename__ = "transcript_cache"
+
+    # "sha256:<hex digest>" for uploaded audio, "youtube:<video id>" for YouTube
+    cache_key = Column(String, primary_key=True)
+    title = Column(String, nullable=True)
+    transcript = Column(Text, nullable=False)
+    segments = Column(Text, nullable=True)  # column-wise JSON, see utils/segments.py
+    created_at = Column(DateTime, default=func.now())
@@ -0,0 +1,22 @@
+# backend/models/transcript_segment.py
+from sqlalchemy import Column, Integer, Text, ForeignKey
+from backend.database import Base
+
+
+class TranscriptSegment(Base):
+    """
+    One timed segment of a transcription. Only what the UI uses is kept;
+    times are whole milliseconds so a segment costs two 4-byte ints plus
+    its text instead of Whisper's full verbose_json entry.
+    """
+    __tablename__ = "transcript_segments"
+
+    transcription_id = Column(
+        Integer, ForeignKey("transcription_history.id", ondelete="CASCADE"),
+        primary_key=True)
+    # Position within the transcript; segments are in playback order, so the
+    # primary key also orders them by start time
+    idx = Column(Integer, primary_key=True, autoincrement=False)
+    start_ms = Column(Integer, nullable=False)
+    end_ms = Column(Integer, nullable=False)
+    text = Column(Text, nullable=False)
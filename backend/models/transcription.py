@@ -1,5 +1,5 @@
 # backend/models/transcription.py
-from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime, func
+from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime, Index, func
 from sqlalchemy.orm import relationship
 from backend.database import Base
 
@@ -7,17 +7,25 @@ from backend.database import Base
 class TranscriptionHistory(Base):
     __tablename__ = 'transcription_history'
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     source = Column(String, nullable=False, default="YouTube")
     video_url = Column(Text)
     title = Column(String, nullable=True)
     transcript = Column(Text, nullable=False)
-    # NEW: Stores segmentation JSON data
-    segments = Column(Text, nullable=True)
     created_at = Column(DateTime, default=func.now())
 
     # Relationships
     user = relationship("User", back_populates="transcriptions")
     content_generations = relationship(
         "ContentGeneration", back_populates="transcription_history")
+    # Never lazy-loaded; read through history_crud.get_segments instead
+    segments = relationship(
+        "TranscriptSegment", order_by="TranscriptSegment.idx", lazy="raise",
+        cascade="all, delete-orphan", passive_deletes=True)
+
+    __table_args__ = (
+        # History listing: WHERE user_id = ? ORDER BY created_at DESC, id DESC
+        Index("ix_transcription_history_user_id_created_at",
+              user_id, created_at.desc(), id.desc()),
+    )
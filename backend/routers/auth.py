@@ -3,14 +3,15 @@
 from fastapi import APIRouter, HTTPException, Depends, status, Request
 from fastapi.responses import JSONResponse  # Added for cookie response
 from pydantic import BaseModel, EmailStr
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
 from backend.database import SessionLocal
 from backend.crud.user_crud import create_user, get_user_by_email
 from passlib.context import CryptContext
 from jose import jwt
 from datetime import datetime, timedelta
 from backend.utils.dependencies import get_current_user
-from backend.models.user import User
+from backend.utils.auth_cache import Principal, password_version
 from backend.config import settings  # Added to use settings.SECRET_KEY
 
 router = APIRouter()
@@ -32,18 +33,15 @@ class LoginRequest(BaseModel):
     password: str
 
 
-def get_db():
-    db = SessionLocal()
-    try:
+async def get_db():
+    async with SessionLocal() as db:
         yield db
-    finally:
-        db.close()
 
 
 @router.post("/register", status_code=status.HTTP_201_CREATED)
-def register_user(
+async def register_user(
     req: RegisterRequest,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     request: Request = None
 ):
     allowed_hosts = {"127.0.0.1", "::1"}
@@ -53,28 +51,33 @@ def register_user(
             detail="Registration is only allowed via localhost"
         )
 
-    existing = get_user_by_email(db, req.email)
+    existing = await get_user_by_email(db, req.email)
     if existing:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST, detail="Email already registered"
         )
 
-    user = create_user(db, req.email, req.password)
+    user = await create_user(db, req.email, req.password)
     return {"message": "User registered successfully", "user_id": user.id}
 
 
 @router.post("/login", status_code=status.HTTP_200_OK)
-def login_user(req: LoginRequest, db: Session = Depends(get_db)):
+async def login_user(req: LoginRequest, db: AsyncSession = Depends(get_db)):
     try:
         print(f"Received login request: {req}")
-        user = get_user_by_email(db, req.email)
+        user = await get_user_by_email(db, req.email)
 
-        if not user or not pwd_context.verify(req.password, user.password_hash):
+        # bcrypt verification is CPU-bound; run it off the event loop
+        if not user or not await run_in_threadpool(pwd_context.verify, req.password, user.password_hash):
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials"
             )
 
-        access_token = create_access_token({"sub": str(user.id)})
+        # pwv ties the token to the current password; changing it revokes the token
+        access_token = create_access_token({
+            "sub": str(user.id),
+            "pwv": password_version(user.password_hash),
+        })
         # Use JSONResponse to set the HTTP-only cookie
         response = JSONResponse(
             content={"access_token": access_token, "token_type": "bearer"})
@@ -97,7 +100,7 @@ def login_user(req: LoginRequest, db: Session = Depends(get_db)):
 
 
 @router.get("/me", response_model=dict, status_code=status.HTTP_200_OK)
-def get_current_user_info(current_user: User = Depends(get_current_user)):
+def get_current_user_info(current_user: Principal = Depends(get_current_user)):
     """Returns the logged-in user's details"""
     return {"id": current_user.id, "email": current_user.email}
 
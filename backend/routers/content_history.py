@@ -1,53 +1,68 @@
 # backend/routers/content_history.py
 
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query
+from backend.utils.json_response import FastJSONResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
 from backend.database import SessionLocal
 from backend.models.user import User
-from backend.models.content_generation import ContentGeneration
-from backend.models.transcription import TranscriptionHistory
 from backend.utils.dependencies import get_current_user
+from backend.utils.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from backend.crud.content_crud import list_content_generations, get_content_generation, content_summary
 
 router = APIRouter()
 
 
-def get_db():
-    db = SessionLocal()
-    try:
+async def get_db():
+    async with SessionLocal() as db:
         yield db
-    finally:
-        db.close()
 
 
-@router.get("/", response_model=List[dict])
-def get_content_generation_history(
-    db: Session = Depends(get_db),
+async def content_page_response(db: AsyncSession, user_id: int, cursor: Optional[str], limit: int, include_content: bool):
+    """Shared by /content-history/ and /history/content."""
+    try:
+        rows, next_cursor = await list_content_generations(
+            db, user_id, limit, cursor, include_content)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return FastJSONResponse({
+        "items": [content_summary(row) for row in rows],
+        "next_cursor": next_cursor,
+    })
+
+
+@router.get("/", response_class=FastJSONResponse)
+async def get_content_generation_history(
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    include_content: bool = True,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Generated content history for the logged-in user, latest first, one page
+    at a time. Pass include_content=false to leave out the article bodies and
+    fetch them with GET /content-history/{id}.
+    """
+    return await content_page_response(db, current_user.id, cursor, limit, include_content)
+
+
+@router.get("/{content_id:int}", response_class=FastJSONResponse)
+async def get_content_generation_detail(
+    content_id: int,
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    """Retrieve generated content history for the logged-in user, sorted latest to oldest."""
-    content_records = (
-        db.query(ContentGeneration)
-        .filter(ContentGeneration.user_id == current_user.id)
-        .order_by(ContentGeneration.created_at.desc())  # Sort by latest
-        .all()
-    )
-
-    # Instead of raising an error if no records are found, return an empty list
-    if not content_records:
-        return []
-
-    return [
-        {
-            "id": record.id,
-            "title": record.title,
-            "transcription_history_id": record.transcription_history_id,
-            "transcription_title": db.query(TranscriptionHistory.title)
-            .filter(TranscriptionHistory.id == record.transcription_history_id)
-            .scalar(),
-            "generated_content": record.generated_content,
-            "created_at": record.created_at,
-            "config": record.config,
-        }
-        for record in content_records
-    ]
+    row = await get_content_generation(db, current_user.id, content_id)
+    if not row:
+        raise HTTPException(status_code=404, detail="Content not found")
+    record, transcription_title = row
+    return FastJSONResponse({
+        "id": record.id,
+        "title": record.title,
+        "transcription_history_id": record.transcription_history_id,
+        "transcription_title": transcription_title,
+        "generated_content": record.generated_content,
+        "created_at": record.created_at,
+        "config": record.config,
+    })
@@ -1,29 +1,45 @@
 # backend/routers/generate.py
-from openai import OpenAI, OpenAIError
+from openai import OpenAIError
 from backend.config import settings
-from backend.utils.job_status import create_job, update_job
-# Add BackgroundTasks
-from fastapi import APIRouter, HTTPException, Depends, BackgroundTasks
+from backend.utils.job_status import (
+    create_job, update_job, checkpoint_job_output, set_job_progress, find_active_job)
+from backend.utils.generation_cache import STYLE_FIELDS, generation_cache_key, generation_cache_stats
+from backend.crud.cache_crud import get_cached_generation, count_cached_generations, evict_generation_cache
+from backend.utils.sections import split_transcript
+from backend.utils.tokens import count_tokens
+from backend.utils.http_client import async_openai_client, call_with_retries
+from backend.crud.history_crud import get_segments, get_history_record
+from backend.utils.job_events import bus, delta_flush_seconds, publish_delta
+from fastapi import APIRouter, HTTPException, Depends, Request
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from backend.database import SessionLocal
 from backend.models.user import User
+from backend.models.job import Job
 from backend.models.content_generation import ContentGeneration
-from backend.models.transcription import TranscriptionHistory
 from backend.utils.dependencies import get_current_user
+import asyncio
+import json
+import time
+from datetime import datetime
+from typing import Optional
 import logging
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-client = OpenAI(api_key=settings.OPENAI_API_KEY)
+client = async_openai_client()
 router = APIRouter()
 
 
 class ArticleRequest(BaseModel):
     job_id: str
     transcription_id: int
-    transcription: str
+    # Ignored: the transcript is loaded server-side from transcription_id.
+    # Kept optional so older clients that still send it keep working.
+    transcription: Optional[str] = None
     gaya_bahasa: str
     kepadatan_informasi: str
     sentimen: str
@@ -34,20 +50,113 @@ class ArticleRequest(BaseModel):
     penyuntingan: str
     catatan_tambahan: str = ""
     config: dict = {}
+    # Relay the article through /generate/{job_id}/stream while it is written
+    stream: bool = True
+    # Skip the generation cache and always call the model
+    force_regenerate: bool = False
 
 
-def get_db():
-    db = SessionLocal()
-    try:
+async def get_db():
+    async with SessionLocal() as db:
         yield db
-    finally:
-        db.close()
 
 
-def generate_article_background(
+async def _stream_completion(job_id: str, user_id: int, prompt: str, db: AsyncSession) -> str:
+    """
+    Run the completion with stream=True. New text is published as delta
+    events every delta_flush_seconds() and the partial article is saved
+    on the job every GENERATION_CHECKPOINT_SECONDS.
+    """
+    stream = await call_with_retries(
+        client.chat.completions.create,
+        deadline_seconds=settings.GENERATION_DEADLINE_SECONDS,
+        model=settings.GENERATION_MODEL,
+        messages=[{"role": "user", "content": prompt}],
+        stream=True
+    )
+    parts = []
+    sent = 0  # characters already published
+    flush_seconds = delta_flush_seconds()
+    last_flush = last_checkpoint = time.monotonic()
+    async for chunk in stream:
+        delta = chunk.choices[0].delta.content if chunk.choices else None
+        if not delta:
+            continue
+        parts.append(delta)
+        now = time.monotonic()
+        if now - last_flush >= flush_seconds:
+            text = "".join(parts)
+            await publish_delta(job_id, user_id, sent, text[sent:])
+            sent = len(text)
+            last_flush = now
+        if now - last_checkpoint >= settings.GENERATION_CHECKPOINT_SECONDS:
+            await checkpoint_job_output(job_id, "".join(parts), db)
+            last_checkpoint = now
+    text = "".join(parts)
+    if len(text) > sent:
+        await publish_delta(job_id, user_id, sent, text[sent:])
+    return text
+
+
+MAP_PROMPT = """
+Berikut adalah bagian {index} dari {total} sebuah transkripsi panjang. Buatlah catatan yang ringkas namun lengkap dalam bahasa aslinya: semua fakta, angka, nama, kutipan penting (kata per kata) dan urutan peristiwa, beserta penanda waktu [hh:mm:ss] yang relevan. Jangan menulis artikel, cukup catatan.
+
+Bagian transkripsi:
+{section}
+"""
+# Rounds of condensing before giving up on fitting the final prompt
+MAX_CONDENSE_ROUNDS = 3
+
+
+async def _condense_sections(job_id: str, sections: list) -> str:
+    """Map step: condense every section concurrently, keeping their order."""
+    slots = asyncio.Semaphore(settings.GENERATION_MAP_CONCURRENCY)
+    done = 0
+
+    async def condense(index: int, section: str) -> str:
+        nonlocal done
+        async with slots:
+            response = await call_with_retries(
+                client.chat.completions.create,
+                deadline_seconds=settings.GENERATION_DEADLINE_SECONDS,
+                model=settings.GENERATION_MODEL,
+                messages=[{"role": "user", "content": MAP_PROMPT.format(
+                    index=index + 1, total=len(sections), section=section)}]
+            )
+        done += 1
+        # The final (reduce) pass is the last share of the work
+        await set_job_progress(job_id, done / (len(sections) + 1))
+        return response.choices[0].message.content.strip()
+
+    notes = await asyncio.gather(*(condense(i, section) for i, section in enumerate(sections)))
+    return "\n\n".join(f"Bagian {i + 1}:\n{note}" for i, note in enumerate(notes))
+
+
+async def _long_transcript_notes(
+    job_id: str, transcription: str, transcription_id: int, user_id: int, db: AsyncSession
+) -> str:
+    """
+    Condense a transcript that is too long for one prompt. Sections are cut
+    on Whisper segment boundaries (when the transcript has segments) and
+    condensed in parallel; the notes are condensed again if still too long.
+    """
+    segments = await get_segments(db, user_id, transcription_id)
+    source = transcription
+    for round_number in range(MAX_CONDENSE_ROUNDS):
+        sections = split_transcript(
+            source, segments if round_number == 0 else None,
+            settings.GENERATION_SECTION_TOKENS, settings.GENERATION_MODEL)
+        logger.info(
+            f"Job {job_id}: condensing {len(sections)} sections (round {round_number + 1})")
+        source = await _condense_sections(job_id, sections)
+        if count_tokens(source, settings.GENERATION_MODEL) <= settings.LONG_TRANSCRIPT_TOKENS:
+            break
+    return source
+
+
+async def generate_article_background(
     job_id: str,
     transcription_id: int,
-    transcription: str,
     gaya_bahasa: str,
     kepadatan_informasi: str,
     sentimen: str,
@@ -59,14 +168,34 @@ def generate_article_background(
     catatan_tambahan: str,
     config: dict,
     user_id: int,
-    db: Session
+    db: AsyncSession,
+    stream: bool = True,
+    cache_key: str = None,
+    transcription: str = None
 ):
-    """Background task to generate article content."""
-    update_job(job_id, "processing", db=db)
+    """
+    Worker task to generate article content. The transcript is read from
+    the user's transcription (`transcription` is only set by jobs queued
+    before that). Transcripts over LONG_TRANSCRIPT_TOKENS are condensed
+    section by section first.
+    """
+    await update_job(job_id, "processing", db=db)
     try:
+        record = await get_history_record(db, user_id, transcription_id)
+        if record is None:
+            raise ValueError(f"Transcription {transcription_id} not found")
+        transcription = transcription or record.transcript
+        title = record.title
+        source_label, source = "Transkripsi", transcription
+        if count_tokens(transcription, settings.GENERATION_MODEL) > settings.LONG_TRANSCRIPT_TOKENS:
+            # Too long for one prompt: map (condense sections), then reduce below
+            source_label = "Catatan berurutan dari transkripsi"
+            source = await _long_transcript_notes(
+                job_id, transcription, transcription_id, user_id, db)
+
         prompt = f"""
         Anda adalah seorang jurnalis yang ahli dalam membuat artikel/berita/blog berdasarkan transkripsi. Berikut adalah detailnya:
-        Transkripsi: {transcription}
+        {source_label}: {source}
         Gaya bahasa: {gaya_bahasa}
         Kepadatan informasi: {kepadatan_informasi}
         Sentimen: {sentimen}
@@ -81,72 +210,231 @@ def generate_article_background(
             prompt += f"\nCatatan tambahan: {catatan_tambahan}\n"
 
         logger.info(f"Generating article for job {job_id}")
-        response = client.chat.completions.create(
-            model="gpt-4o",
-            messages=[{"role": "user", "content": prompt}]
-        )
-        article_content = response.choices[0].message.content.strip()
+        if stream:
+            article_content = (await _stream_completion(job_id, user_id, prompt, db)).strip()
+        else:
+            response = await call_with_retries(
+                client.chat.completions.create,
+                deadline_seconds=settings.GENERATION_DEADLINE_SECONDS,
+                model=settings.GENERATION_MODEL,
+                messages=[{"role": "user", "content": prompt}]
+            )
+            article_content = response.choices[0].message.content.strip()
 
-        transcription = db.query(TranscriptionHistory).filter(
-            TranscriptionHistory.id == transcription_id
-        ).first()
         content_generation_record = ContentGeneration(
             user_id=user_id,
             transcription_history_id=transcription_id,
             generated_content=article_content,
-            title=transcription.title if transcription else None,
-            config=config
+            title=title,
+            config=config,
+            cache_key=cache_key,
+            cache_used_at=datetime.utcnow() if cache_key else None
         )
         db.add(content_generation_record)
-        db.commit()
-        db.refresh(content_generation_record)
+        await db.commit()
+        if cache_key:
+            await evict_generation_cache(db)
 
-        update_job(job_id, "completed", article_content, db=db)
+        await update_job(job_id, "completed", article_content, db=db)
         logger.info(f"Completed job {job_id}")
 
     except OpenAIError as e:
+        # The worker retries or fails the job
         logger.error(f"OpenAI API error for job {job_id}: {str(e)}")
-        update_job(job_id, "failed", db=db)
+        await db.rollback()
+        raise
     except Exception as e:
         logger.error(f"Unexpected error for job {job_id}: {str(e)}")
-        update_job(job_id, "failed", db=db)
+        await db.rollback()
+        raise
+
+
+async def _serve_cached(
+    request: ArticleRequest, cached: ContentGeneration, user_id: int, title: str, db: AsyncSession
+) -> dict:
+    """
+    Answer from a cache entry without calling the model. Another user's (or
+    another transcription's) entry is copied, so each user keeps their own row.
+    """
+    if cached.user_id == user_id and cached.transcription_history_id == request.transcription_id:
+        content = cached
+    else:
+        content = ContentGeneration(
+            user_id=user_id,
+            transcription_history_id=request.transcription_id,
+            generated_content=cached.generated_content,
+            title=title,
+            config=request.config
+        )
+        db.add(content)
+        await db.commit()
+    # A completed job keeps the client flow (job list, stream) unchanged
+    await create_job(request.job_id, user_id, f"Content: {title}", db)
+    await update_job(request.job_id, "completed", content.generated_content, db=db)
+    return {
+        "message": "Content served from cache",
+        "job_id": request.job_id,
+        "cached": True,
+        "content_id": content.id,
+        "content": content.generated_content,
+    }
 
 
 @router.post("/")
 async def generate_article(
-    background_tasks: BackgroundTasks,  # Add BackgroundTasks
     request: ArticleRequest,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    transcription = db.query(TranscriptionHistory).filter(
-        TranscriptionHistory.id == request.transcription_id
-    ).first()
-    title = transcription.title if transcription else "Untitled Content"
-    create_job(request.job_id, current_user.id, f"Content: {title}", db)
-    logger.info(f"Created job {request.job_id} for user {current_user.id}")
-
-    # Offload generation to background task
-    background_tasks.add_task(
-        generate_article_background,
-        request.job_id,
-        request.transcription_id,
-        request.transcription,
-        request.gaya_bahasa,
-        request.kepadatan_informasi,
-        request.sentimen,
-        request.gaya_penyampaian,
-        request.format_output,
-        request.gaya_kutipan,
-        request.bahasa,
-        request.penyuntingan,
-        request.catatan_tambahan,
-        request.config,
-        current_user.id,
-        db
+    # Ownership check; the transcript itself never has to come from the client
+    record = await get_history_record(db, current_user.id, request.transcription_id)
+    if not record:
+        raise HTTPException(status_code=404, detail="Transcription not found")
+    title = record.title or "Untitled Content"
+    style = {field: getattr(request, field) for field in STYLE_FIELDS}
+    cache_key = generation_cache_key(
+        record.transcript, style, request.catatan_tambahan, settings.GENERATION_MODEL)
+
+    if request.force_regenerate:
+        generation_cache_stats.record("forced")
+    else:
+        cached = await get_cached_generation(db, cache_key)
+        if cached:
+            generation_cache_stats.record("hits")
+            return await _serve_cached(request, cached, current_user.id, title, db)
+        active_job_id = await find_active_job(db, current_user.id, cache_key)
+        if active_job_id:
+            generation_cache_stats.record("attached")
+            return {
+                "message": "Identical generation already running",
+                "job_id": active_job_id,
+                "attached": True,
+            }
+        generation_cache_stats.record("misses")
+
+    # Queued for python -m backend.worker
+    await create_job(
+        request.job_id, current_user.id, f"Content: {title}", db,
+        kind="generate_article",
+        dedupe_key=cache_key,
+        payload={
+            "transcription_id": request.transcription_id,
+            **style,
+            "catatan_tambahan": request.catatan_tambahan,
+            "config": request.config,
+            "stream": request.stream,
+            "cache_key": cache_key,
+        }
     )
+    logger.info(f"Queued job {request.job_id} for user {current_user.id}")
 
     return {
         "message": "Content generation started!",
         "job_id": request.job_id
     }
+
+
+@router.get("/cache/stats")
+async def generation_cache_statistics(
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Hit/miss counters of this process plus the current size and eviction limits."""
+    return {
+        **generation_cache_stats.snapshot(),
+        "entries": await count_cached_generations(db),
+        "max_entries": settings.GENERATION_CACHE_MAX_ENTRIES,
+        "ttl_days": settings.GENERATION_CACHE_TTL_DAYS,
+    }
+
+
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+async def _job_output(job_id: str) -> str:
+    """Text saved on the job so far, read in a session closed right away."""
+    async with SessionLocal() as session:
+        return await session.scalar(select(Job.transcript).where(Job.id == job_id)) or ""
+
+
+@router.get("/{job_id}/stream")
+async def stream_article(
+    job_id: str,
+    request: Request,
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Server-sent events for one generation job:
+    `snapshot` (text checkpointed so far), then `delta` events with newly
+    generated text, then `done` with the final status and article.
+    Reconnecting is safe: the snapshot covers what was missed, and a new
+    snapshot is sent if deltas turn out to start past it.
+    """
+    user_id = current_user.id
+    # Subscribe before reading the checkpoint so no delta falls in between
+    queue = bus.subscribe(user_id)
+    try:
+        # Short session: a Depends(get_db) one would stay checked out
+        # until the stream ends
+        async with SessionLocal() as db:
+            job = await db.scalar(select(Job).where(
+                Job.id == job_id, Job.user_id == user_id))
+    except BaseException:
+        bus.unsubscribe(user_id, queue)
+        raise
+    if not job:
+        bus.unsubscribe(user_id, queue)
+        raise HTTPException(status_code=404, detail="Job ID not found")
+    snapshot = job.transcript or ""
+    finished = job.status in ("completed", "failed")
+
+    async def events():
+        sent = len(snapshot)
+        # Deltas past `sent`: text published after the last checkpoint but
+        # before we subscribed is missing, so they wait for a checkpoint
+        # that covers the gap
+        held = []
+        try:
+            yield _sse("snapshot", {"status": job.status, "text": snapshot})
+            if finished:
+                yield _sse("done", {"status": job.status, "text": snapshot})
+                return
+            while not await request.is_disconnected():
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=15)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                if event.get("job_id") != job_id:
+                    continue
+                if event.get("type") == "delta":
+                    held.append(event)
+                    if held[0]["offset"] > sent:
+                        checkpoint = await _job_output(job_id)
+                        if len(checkpoint) < held[0]["offset"]:
+                            continue
+                        yield _sse("snapshot", {"status": "processing", "text": checkpoint})
+                        sent = len(checkpoint)
+                    deltas, held = held, []
+                    for i, delta in enumerate(deltas):
+                        if delta["offset"] > sent:
+                            # Another gap (e.g. a dropped event): wait again
+                            held = deltas[i:]
+                            break
+                        # Drop text the snapshot (or an earlier delta) already covered
+                        end = delta["offset"] + len(delta["text"])
+                        if end > sent:
+                            yield _sse("delta", {"text": delta["text"][sent - delta["offset"]:]})
+                            sent = end
+                elif event["status"] in ("completed", "failed"):
+                    final = await _job_output(job_id) if event["status"] == "completed" else ""
+                    yield _sse("done", {"status": event["status"], "text": final})
+                    return
+        finally:
+            bus.unsubscribe(user_id, queue)
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers={
+        "Cache-Control": "no-cache",
+        "X-Accel-Buffering": "no",  # don't let nginx buffer the stream
+    })
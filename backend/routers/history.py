@@ -1,76 +1,132 @@
 # backend/routers/history.py
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query
+from backend.utils.json_response import FastJSONResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
 from backend.database import SessionLocal
-from backend.models.transcription import TranscriptionHistory
-from backend.models.content_generation import ContentGeneration
 from backend.models.user import User
 from backend.utils.dependencies import get_current_user
+from backend.utils.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from backend.utils.segments import to_columns
+from backend.crud.history_crud import list_history_summaries, get_history_record, get_segments
+from backend.crud.search_crud import SCOPES, search
+from backend.routers.content_history import content_page_response
 
 router = APIRouter()
 
 
-def get_db():
-    db = SessionLocal()
-    try:
+async def get_db():
+    async with SessionLocal() as db:
         yield db
-    finally:
-        db.close()
 
 
-@router.get("/", response_model=List[dict])
-def get_my_history(
-    db: Session = Depends(get_db),
+@router.get("/", response_class=FastJSONResponse)
+async def get_my_history(
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    """Retrieve transcription history for the logged-in user, sorted latest to oldest."""
-    history_records = (
-        db.query(TranscriptionHistory)
-        .filter(TranscriptionHistory.user_id == current_user.id)
-        .order_by(TranscriptionHistory.created_at.desc())
-        .all()
-    )
+    """
+    Transcription history for the logged-in user, latest first, one page at a
+    time. Pass `next_cursor` back as `cursor` for the next page. Only summary
+    fields are returned; use GET /history/{id} for transcript and segments.
+    """
+    try:
+        records, next_cursor = await list_history_summaries(
+            db, current_user.id, limit, cursor)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    return FastJSONResponse({
+        "items": [
+            {
+                "id": record.id,
+                "title": record.title if record.title else "Untitled Transcription",
+                "source": record.source,
+                "video_url": record.video_url,
+                "created_at": record.created_at
+            }
+            for record in records
+        ],
+        "next_cursor": next_cursor,
+    })
 
-    if not history_records:
-        return []
 
-    return [
-        {
-            "id": record.id,
-            "title": record.title if record.title else "Untitled Transcription",
-            "source": record.source,
-            "video_url": record.video_url,
-            "transcript": record.transcript,
-            "segments": record.segments,  # <-- Add this line
-            "created_at": record.created_at
-        }
-        for record in history_records
-    ]
+@router.get("/content", response_class=FastJSONResponse)
+async def get_content_generation_history(
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    include_content: bool = True,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Retrieve content generation history for the logged-in user (same as /content-history/)."""
+    return await content_page_response(db, current_user.id, cursor, limit, include_content)
 
 
-@router.get("/content", response_model=List[dict])
-def get_content_generation_history(
-    db: Session = Depends(get_db),
+@router.get("/search", response_class=FastJSONResponse)
+async def search_history(
+    q: str = Query(..., min_length=1, max_length=200),
+    scope: str = Query("all", pattern="^(" + "|".join(SCOPES) + ")$"),
+    limit: int = Query(20, ge=1, le=50),
+    offset: int = Query(0, ge=0, le=1000),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    """Retrieve content generation history for the logged-in user."""
-    content_records = db.query(ContentGeneration).filter(
-        ContentGeneration.user_id == current_user.id
-    ).all()
+    """
+    Ranked full-text search over the user's transcripts and generated
+    content. Each hit has an HTML-escaped `snippet` with matches wrapped in
+    <mark>, and transcription hits list the matching segments' timestamps.
+    Pass `next_offset` back as `offset` for the next page.
+    """
+    items, next_offset = await search(
+        db, current_user.id, q, scope, limit, offset)
+    return FastJSONResponse({"items": items, "next_offset": next_offset})
 
-    # Return an empty list if no content records are found instead of raising an error
-    if not content_records:
-        return []
 
-    return [
-        {
-            "id": record.id,
-            "title": record.title,
-            "transcription_history_id": record.transcription_history_id,
-            "generated_content": record.generated_content,
-            "created_at": record.created_at,
-            "config": record.config  # Include the user configuration
-        }
-        for record in content_records
-    ]
+@router.get("/{history_id:int}", response_class=FastJSONResponse)
+async def get_history_detail(
+    history_id: int,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Full transcript and segments of one of the user's transcriptions."""
+    record = await get_history_record(db, current_user.id, history_id)
+    if not record:
+        raise HTTPException(status_code=404, detail="Transcription not found")
+    segments = await get_segments(db, current_user.id, history_id)
+    return FastJSONResponse({
+        "id": record.id,
+        "title": record.title if record.title else "Untitled Transcription",
+        "source": record.source,
+        "video_url": record.video_url,
+        "transcript": record.transcript,
+        "segments": to_columns(segments or []),
+        "created_at": record.created_at
+    })
+
+
+@router.get("/{history_id:int}/segments", response_class=FastJSONResponse)
+async def get_history_segments(
+    history_id: int,
+    t0: float = Query(0.0, ge=0),
+    t1: Optional[float] = Query(None, gt=0),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Segments overlapping the [t0, t1) window, in seconds; omit t1 to read to
+    the end. Returned column-wise: {"start": [...], "end": [...], "text": [...]}.
+    """
+    if t1 is not None and t1 <= t0:
+        raise HTTPException(status_code=400, detail="t1 must be greater than t0")
+    segments = await get_segments(db, current_user.id, history_id, t0, t1)
+    if segments is None:
+        raise HTTPException(status_code=404, detail="Transcription not found")
+    return FastJSONResponse({
+        "id": history_id,
+        "t0": t0,
+        "t1": t1,
+        "segments": to_columns(segments),
+    })
@@ -0,0 +1,118 @@
+# backend/routers/jobs.py
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List
+import asyncio
+import json
+from backend.models.user import User
+from backend.database import SessionLocal
+from backend.utils.dependencies import get_db, get_current_user, get_admin_user
+from backend.utils.job_status import get_job, get_job_statuses, get_ongoing_job_statuses
+from backend.utils.job_events import bus
+from backend.utils.workspace import workspace_stats
+
+router = APIRouter()
+
+MAX_BATCH_SIZE = 200
+
+
+class JobStatusBatchRequest(BaseModel):
+    job_ids: List[str]
+
+
+def _checked_ids(job_ids: List[str]) -> List[str]:
+    job_ids = list(dict.fromkeys(i for i in job_ids if i))
+    if len(job_ids) > MAX_BATCH_SIZE:
+        raise HTTPException(
+            status_code=400, detail=f"At most {MAX_BATCH_SIZE} job IDs per request")
+    return job_ids
+
+
+@router.post("/status:batch")
+async def get_job_status_batch(
+    request: JobStatusBatchRequest,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Status of many jobs in one query, without transcripts. Unknown IDs are omitted."""
+    return {"jobs": await get_job_statuses(_checked_ids(request.job_ids), current_user.id, db)}
+
+
+@router.get("/status")
+async def get_job_status_many(
+    ids: str = Query(..., description="Comma-separated job IDs"),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """GET flavour of /jobs/status:batch for clients that can't POST."""
+    return {"jobs": await get_job_statuses(_checked_ids(ids.split(",")), current_user.id, db)}
+
+
+@router.get("/ongoing/", response_model=List[dict])
+async def get_ongoing_jobs(db: AsyncSession = Depends(get_db), current_user: User = Depends(get_current_user)):
+    """Retrieve all ongoing jobs (pending or processing) for the authenticated user."""
+    return await get_ongoing_job_statuses(current_user.id, db)
+
+
+@router.get("/workspaces")
+async def get_workspace_usage(current_user: User = Depends(get_admin_user)):
+    """Scratch space used by running jobs on this host, with quotas and free space. Admins only."""
+    return await asyncio.to_thread(workspace_stats)
+
+
+@router.get("/stream")
+async def stream_job_events(
+    request: Request,
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Server-sent events with the status transitions of the user's jobs.
+    Starts with the currently ongoing jobs, then pushes each change.
+    """
+    user_id = current_user.id
+    # Subscribe first so nothing falls between the snapshot and the stream
+    queue = bus.subscribe(user_id)
+    try:
+        # Short session: a Depends(get_db) one would stay checked out
+        # (idle in transaction) until the stream ends
+        async with SessionLocal() as db:
+            ongoing = await get_ongoing_job_statuses(user_id, db)
+    except BaseException:
+        bus.unsubscribe(user_id, queue)
+        raise
+
+    async def events():
+        try:
+            for event in ongoing:
+                yield f"data: {json.dumps(event)}\n\n"
+            while not await request.is_disconnected():
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=15)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                if event.get("type") == "delta":
+                    continue  # generated text goes to /generate/{job_id}/stream
+                yield f"data: {json.dumps(event)}\n\n"
+        finally:
+            bus.unsubscribe(user_id, queue)
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers={
+        "Cache-Control": "no-cache",
+        "X-Accel-Buffering": "no",  # don't let nginx buffer the stream
+    })
+
+
+@router.get("/{job_id}/status")
+async def get_job_status(
+    job_id: str,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """Full status of one of the user's jobs, including its transcript/generated content."""
+    job = await get_job(job_id, current_user.id, db)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job ID not found")
+    return job
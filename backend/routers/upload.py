@@ -1,16 +1,25 @@
 # backend/routers/upload.py
 from backend.config import settings
-from backend.utils.job_status import create_job, update_job, get_job
-from fastapi import APIRouter, UploadFile, File, BackgroundTasks, HTTPException, Depends
-from sqlalchemy.orm import Session
+from backend.utils.job_status import create_job, update_job, job_progress_reporter, job_audio_reporter
+from fastapi import APIRouter, HTTPException, Depends, Request, Response, Header
+from pydantic import BaseModel
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import UploadFile
+import asyncio
 import os
-import shutil
 import uuid
-import json
 from backend.utils.transcribe_utils import transcribe_audio_with_whisper
+from backend.utils.workspace import job_workspace
 from backend.utils.dependencies import get_current_user
 from backend.utils.youtube_utils import sanitize_filename
+from backend.utils.upload_utils import (
+    UploadConflict, UploadTooLarge, store_upload, create_upload_session, load_upload_session,
+    reserved_upload_bytes, locked_upload_session, append_to_upload_session,
+    finish_upload_session, discard_upload_session)
 from backend.crud.history_crud import create_history_record
+from backend.utils.segments import compact_segments, dumps_segments, loads_segments
+from backend.crud.cache_crud import audio_cache_key, get_cached_transcript, store_cached_transcript
 from backend.database import SessionLocal
 from backend.models.user import User
 
@@ -18,89 +27,256 @@ router = APIRouter()
 
 UPLOAD_DIR = "uploads"
 os.makedirs(UPLOAD_DIR, exist_ok=True)
+# Unfinished resumable uploads; kept out of UPLOAD_DIR, which is served publicly
+UPLOAD_SESSIONS_DIR = "upload_sessions"
+ALLOWED_EXTENSIONS = {".mp3", ".mp4", ".wav", ".webm"}
+# Slack for the multipart boundaries and part headers around the file
+MULTIPART_OVERHEAD_BYTES = 64 * 1024
+# The form is parsed by hand (see upload_audio), so describe it for /docs
+UPLOAD_FORM_SCHEMA = {"requestBody": {"required": True, "content": {"multipart/form-data": {"schema": {
+    "type": "object", "required": ["file"],
+    "properties": {"file": {"type": "string", "format": "binary"}}}}}}}
 
 
-def get_db():
-    db = SessionLocal()
-    try:
+async def get_db():
+    async with SessionLocal() as db:
         yield db
-    finally:
-        db.close()
 
 
-def process_transcription(file_path: str, user_id: int, db_session: Session, job_id: str):
-    update_job(job_id, "processing", db=db_session)
+async def process_transcription(
+    file_path: str,
+    user_id: int,
+    db_session: AsyncSession,
+    job_id: str,
+    audio_hash: str = None,
+    title: str = None
+):
+    await update_job(job_id, "processing", db=db_session)
     try:
-        transcription_result = transcribe_audio_with_whisper(
-            file_path)  # Returns dict
-        transcription_text = transcription_result.get(
-            "text", "")  # Extract text
-        # Extract segments with time codes
-        segments = transcription_result.get("segments", None)
-        file_title = os.path.basename(file_path)
-        public_url = f"/uploads/{file_title}"
-
-        # Pass segments as JSON string to create_history_record
-        create_history_record(
+        file_title = title or os.path.basename(file_path)
+        relative_path = os.path.relpath(file_path, UPLOAD_DIR)
+        public_url = f"/uploads/{relative_path.replace(os.sep, '/')}"
+        cache_key = audio_cache_key(audio_hash) if audio_hash else None
+
+        cached = await get_cached_transcript(
+            db_session, cache_key) if cache_key else None
+        if cached:
+            # Same audio was transcribed before: reuse it, skip Whisper
+            transcription_text = cached.transcript
+            segments = loads_segments(cached.segments)
+            print(f"♻️ Transcript cache hit for {file_path}")
+        else:
+            # Blocking HTTP/ffmpeg work runs in a thread, off the worker's loop
+            with job_workspace(job_id, os.path.getsize(file_path)) as workspace:
+                transcription_result = await asyncio.to_thread(
+                    transcribe_audio_with_whisper,
+                    file_path, job_progress_reporter(job_id),
+                    job_audio_reporter(job_id), workspace)  # Returns dict
+            transcription_text = transcription_result.get(
+                "text", "")  # Extract text
+            # Keep only start/end/text of each timed segment
+            segments = compact_segments(
+                transcription_result.get("segments"))
+            if cache_key:
+                await store_cached_transcript(
+                    db_session, cache_key, transcription_text, dumps_segments(segments))
+
+        await create_history_record(
             db_session,
             user_id,
             "Upload",
             public_url,
             transcription_text,
             title=file_title,
-            segments=json.dumps(
-                segments) if segments else None  # Store segments
+            segments=segments
         )
-        update_job(job_id, "completed", transcription_text,
-                   db=db_session)  # Pass string to jobs table
+        await update_job(job_id, "completed", transcription_text,
+                         db=db_session)  # Pass string to jobs table
         print(f"✅ Transcription completed for {file_path}")
     except Exception as e:
-        db_session.rollback()  # Roll back on error
-        update_job(job_id, "failed", db=db_session)
+        await db_session.rollback()  # Roll back on error; the worker retries or fails the job
         print(f"❌ Error during transcription: {e}")
         raise
 
 
-@router.post("/upload-audio/")
-async def upload_audio(
-    background_tasks: BackgroundTasks,
-    file: UploadFile = File(...),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
-):
-    try:
-        allowed_extensions = {".mp3", ".mp4", ".wav", ".webm"}
-        ext = os.path.splitext(file.filename)[1]
-        if ext.lower() not in allowed_extensions:
-            raise HTTPException(
-                status_code=400, detail="Unsupported file type")
+def _check_extension(filename: str) -> str:
+    ext = os.path.splitext(filename)[1]
+    if ext.lower() not in ALLOWED_EXTENSIONS:
+        raise HTTPException(status_code=400, detail="Unsupported file type")
+    return ext
+
 
-        base_name = os.path.splitext(file.filename)[0]
-        sanitized_base = sanitize_filename(base_name)
-        new_filename = f"{sanitized_base}{ext}"
-        file_path = os.path.join(UPLOAD_DIR, new_filename)
+async def _upload_allowance(user_id: int) -> int:
+    """Largest upload the user may start now: the global cap, or what their quota has left."""
+    # Scans the sessions directory, so it stays off the event loop
+    reserved = await run_in_threadpool(
+        reserved_upload_bytes, UPLOAD_SESSIONS_DIR, user_id, settings.UPLOAD_SESSION_TTL_HOURS * 3600)
+    return max(0, min(settings.MAX_UPLOAD_BYTES, settings.USER_UPLOAD_QUOTA_BYTES - reserved))
 
-        with open(file_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
 
-        job_id = str(uuid.uuid4())
-        create_job(job_id, current_user.id,
-                   file.filename, db)  # Corrected title
+async def _queue_transcription(db: AsyncSession, user_id: int, filename: str, file_path: str, audio_hash: str) -> str:
+    base_name, ext = os.path.splitext(filename)
+    display_name = f"{sanitize_filename(base_name)}{ext}"
+    # Queued for python -m backend.worker
+    job_id = str(uuid.uuid4())
+    await create_job(job_id, user_id, filename, db,
+                     kind="transcribe_upload",
+                     payload={"file_path": file_path,
+                              "audio_hash": audio_hash,
+                              "title": display_name})
+    return job_id
 
-        background_tasks.add_task(
-            process_transcription, file_path, current_user.id, db, job_id)
+
+def _check_content_length(request: Request, allowance: int):
+    """Refuse an oversized multipart body from its headers, before any of it is read."""
+    declared = request.headers.get("content-length")
+    if declared is None:
+        raise HTTPException(status_code=411, detail="Content-Length required")
+    try:
+        declared = int(declared)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid Content-Length")
+    if declared > allowance + MULTIPART_OVERHEAD_BYTES:
+        raise HTTPException(
+            status_code=413, detail=f"Upload exceeds the {allowance} byte limit")
+
+
+@router.post("/upload-audio/", openapi_extra=UPLOAD_FORM_SCHEMA)
+async def upload_audio(
+    request: Request,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    try:
+        # Not a File(...) parameter: FastAPI would spool the whole body to
+        # disk before this runs, so the size is checked first
+        allowance = await _upload_allowance(current_user.id)
+        _check_content_length(request, allowance)
+        async with request.form() as form:
+            file = form.get("file")
+            if not isinstance(file, UploadFile):
+                raise HTTPException(status_code=400, detail="No file uploaded")
+            ext = _check_extension(file.filename)
+            file_path, audio_hash = await store_upload(
+                file.read, ext, UPLOAD_DIR, allowance)
+        job_id = await _queue_transcription(
+            db, current_user.id, file.filename, file_path, audio_hash)
 
         return {
             "message": "File uploaded successfully, transcription is processing in the background!",
             "job_id": job_id
         }
+    except UploadTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@router.get("/jobs/{job_id}/status")
-async def get_job_status(job_id: str, db: Session = Depends(get_db)):
-    job = get_job(job_id, db)
-    if not job:
-        raise HTTPException(status_code=404, detail="Job ID not found")
-    return job
+# --- Resumable uploads (offset-based, similar to tus) ---
+# POST /sessions            -> {upload_id, offset: 0}
+# HEAD /sessions/{id}       -> Upload-Offset / Upload-Length headers
+# PATCH /sessions/{id}      -> append body at Upload-Offset; queues the job
+#                              once the declared length is reached
+# DELETE /sessions/{id}     -> abandon the upload
+
+class UploadSessionRequest(BaseModel):
+    filename: str
+    length: int
+
+
+def _get_session(upload_id: str, user: User) -> dict:
+    session = load_upload_session(UPLOAD_SESSIONS_DIR, upload_id)
+    if not session or session["user_id"] != user.id:
+        raise HTTPException(status_code=404, detail="Upload not found")
+    return session
+
+
+@router.post("/sessions", status_code=201)
+async def create_resumable_upload(
+    request: UploadSessionRequest,
+    response: Response,
+    current_user: User = Depends(get_current_user)
+):
+    _check_extension(request.filename)
+    if request.length <= 0:
+        raise HTTPException(status_code=400, detail="Upload length must be positive")
+    allowance = await _upload_allowance(current_user.id)
+    if request.length > allowance:
+        raise HTTPException(
+            status_code=413, detail=f"Upload exceeds the {allowance} byte limit")
+    upload_id = await run_in_threadpool(
+        create_upload_session, UPLOAD_SESSIONS_DIR, current_user.id, request.filename, request.length)
+    response.headers["Location"] = f"/upload/sessions/{upload_id}"
+    return {"upload_id": upload_id, "offset": 0, "length": request.length}
+
+
+@router.head("/sessions/{upload_id}")
+def get_resumable_upload_offset(
+    upload_id: str,
+    current_user: User = Depends(get_current_user)
+):
+    session = _get_session(upload_id, current_user)
+    return Response(headers={
+        "Upload-Offset": str(session["offset"]),
+        "Upload-Length": str(session["length"]),
+        "Cache-Control": "no-store",
+    })
+
+
+@router.patch("/sessions/{upload_id}")
+async def append_resumable_upload(
+    upload_id: str,
+    request: Request,
+    upload_offset: int = Header(...),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    session = _get_session(upload_id, current_user)
+    try:
+        # Held until the job is queued, so a session is appended and
+        # finished by one request at a time
+        with locked_upload_session(UPLOAD_SESSIONS_DIR, upload_id, upload_offset) as buffer:
+            offset = await append_to_upload_session(
+                buffer, upload_offset, session["length"], request.stream())
+            if offset < session["length"]:
+                return Response(status_code=204, headers={"Upload-Offset": str(offset)})
+
+            ext = _check_extension(session["filename"])
+            file_path, audio_hash = await finish_upload_session(
+                UPLOAD_SESSIONS_DIR, upload_id, ext, UPLOAD_DIR)
+            job_id = await _queue_transcription(
+                db, current_user.id, session["filename"], file_path, audio_hash)
+    except UploadConflict as e:
+        # Client is out of sync; it should HEAD for the real offset and retry
+        raise HTTPException(status_code=409, detail=str(e),
+                            headers={"Upload-Offset": str(e.offset)})
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="Upload not found")
+    except UploadTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+
+    return {
+        "message": "File uploaded successfully, transcription is processing in the background!",
+        "job_id": job_id,
+        "offset": offset,
+    }
+
+
+@router.delete("/sessions/{upload_id}", status_code=204)
+def abort_resumable_upload(
+    upload_id: str,
+    current_user: User = Depends(get_current_user)
+):
+    _get_session(upload_id, current_user)
+    try:
+        # Not while a PATCH is appending to (or finishing) the session
+        with locked_upload_session(UPLOAD_SESSIONS_DIR, upload_id):
+            discard_upload_session(UPLOAD_SESSIONS_DIR, upload_id)
+    except UploadConflict as e:
+        raise HTTPException(status_code=409, detail=str(e),
+                            headers={"Upload-Offset": str(e.offset)})
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="Upload not found")
+    return Response(status_code=204)
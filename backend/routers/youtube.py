@@ -1,100 +1,236 @@
 # backend/routers/youtube.py
 
-from fastapi import APIRouter, HTTPException, BackgroundTasks, Depends
+from fastapi import APIRouter, HTTPException, Depends
 from pydantic import BaseModel
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
+import asyncio
 import uuid
-import yt_dlp
-import json
-from backend.utils.youtube_utils import download_youtube_audio
-from backend.utils.job_status import create_job, update_job, get_job
+from backend.config import settings
+from backend.utils.youtube_utils import (download_youtube_audio, download_caption_track, extract_youtube_id,
+                                         canonical_youtube_url, fetch_youtube_info)
+from backend.utils.captions import is_acceptable, parse_captions, pick_caption_track
+from backend.utils.job_status import (create_job, update_job, job_progress_reporter, job_audio_reporter,
+                                      claim_flight, follow_job)
 from backend.utils.transcribe_utils import transcribe_audio_with_whisper
+from backend.utils.workspace import job_workspace
 from backend.utils.dependencies import get_current_user
 from backend.crud.history_crud import create_history_record
+from backend.utils.segments import compact_segments, dumps_segments, loads_segments
+from backend.crud.cache_crud import (youtube_cache_key, youtube_captions_cache_key,
+                                     get_cached_transcript, store_cached_transcript)
 from backend.database import SessionLocal
 from backend.models.user import User
 
 router = APIRouter()
 
 
-def get_db():
-    db = SessionLocal()
-    try:
+async def get_db():
+    async with SessionLocal() as db:
         yield db
-    finally:
-        db.close()
 
 
-def process_youtube_transcription(youtube_url: str, user_id: int, db: Session, job_id: str):
-    update_job(job_id, "processing", db=db)
+def load_captions(youtube_url: str, track: Optional[dict] = None, title: str = None) -> Optional[dict]:
+    """
+    Blocking: the video's subtitles as {"title", "text", "segments"}, or None
+    when there is no acceptable track. `track` comes from the job payload;
+    its URL is signed and may have expired, so on failure it is looked up again.
+    """
+    info = None
+    if track is None:
+        info = fetch_youtube_info(youtube_url)
+        title = info.get("title") or title
+        track = pick_caption_track(info)
+        if track is None:
+            return None
     try:
-        with yt_dlp.YoutubeDL({"quiet": True}) as ydl:
-            info = ydl.extract_info(youtube_url, download=False)
-            youtube_title = info.get("title") or youtube_url
-
-        file_path = download_youtube_audio(youtube_url)
-        result = transcribe_audio_with_whisper(file_path)
-        transcription_text = result.get("text", "")
-        segments = result.get("segments", None)
-
-        create_history_record(
+        raw = download_caption_track(track)
+    except Exception as e:
+        if info is not None:
+            raise
+        print(f"⚠️ Caption track from the payload failed ({e}), looking it up again")
+        return load_captions(youtube_url, None, title)
+    result = parse_captions(raw, track["ext"])
+    if not is_acceptable(result, track.get("duration")):
+        return None
+    return {"title": title or youtube_url, **result}
+
+
+async def caption_transcript(
+    youtube_url: str,
+    video_id: str,
+    db: AsyncSession,
+    track: Optional[dict] = None,
+    title: str = None
+) -> Optional[dict]:
+    """Subtitles for the video from the cache or YouTube, or None to fall back to Whisper."""
+    cache_key = youtube_captions_cache_key(video_id)
+    cached = await get_cached_transcript(db, cache_key)
+    if cached:
+        return {"title": cached.title or youtube_url,
+                "text": cached.transcript,
+                "segments": loads_segments(cached.segments)}
+    try:
+        result = await asyncio.to_thread(load_captions, youtube_url, track, title)
+    except Exception as e:
+        print(f"⚠️ Could not load captions for {video_id}: {e}")
+        return None
+    if result is None:
+        return None
+    segments = compact_segments(result["segments"])
+    await store_cached_transcript(
+        db, cache_key, result["text"], dumps_segments(segments), title=result["title"])
+    return {"title": result["title"], "text": result["text"], "segments": segments}
+
+
+async def transcribe_youtube_video(youtube_url: str, cache_key: str, db: AsyncSession, job_id: str = None) -> dict:
+    """Download + Whisper for one video, storing the result in the transcript cache."""
+    # yt-dlp and Whisper block, so they run in threads off the event loop.
+    # The download and everything derived from it live only as long as the job
+    with job_workspace(job_id) as workspace:
+        file_path, youtube_title = await asyncio.to_thread(
+            download_youtube_audio, youtube_url, workspace.path, workspace.remaining())
+        workspace.check()
+        result = await asyncio.to_thread(
+            transcribe_audio_with_whisper,
+            file_path,
+            job_progress_reporter(job_id) if job_id else None,
+            job_audio_reporter(job_id) if job_id else None,
+            workspace)
+    transcription_text = result.get("text", "")
+    segments = compact_segments(result.get("segments"))
+    if cache_key:
+        await store_cached_transcript(
+            db, cache_key, transcription_text, dumps_segments(segments), title=youtube_title)
+    return {"title": youtube_title, "text": transcription_text, "segments": segments}
+
+
+async def transcribe_youtube_once(video_id: str, cache_key: str, db: AsyncSession, job_id: str) -> dict:
+    """
+    Whisper for a video, run by one job at a time across all workers: the job
+    that claims the video's flight key downloads and transcribes it, the
+    others follow its progress and then read the result from the cache.
+    """
+    flight_key = f"youtube:{video_id}"
+    while True:
+        leader_id = await claim_flight(db, job_id, flight_key)
+        if leader_id == job_id:
+            return await transcribe_youtube_video(canonical_youtube_url(video_id), cache_key, db, job_id)
+        if leader_id:
+            print(f"🔗 Following job {leader_id}'s transcription of {video_id}")
+            await follow_job(leader_id, job_id, settings.JOB_FOLLOW_POLL_SECONDS)
+        cached = await get_cached_transcript(db, cache_key)
+        if cached:
+            return {"title": cached.title or canonical_youtube_url(video_id),
+                    "text": cached.transcript,
+                    "segments": loads_segments(cached.segments)}
+        # The leader gave up (it keeps the key while it retries); take over
+
+
+async def process_youtube_transcription(
+    youtube_url: str,
+    user_id: int,
+    db: AsyncSession,
+    job_id: str,
+    prefer_whisper: bool = False,
+    caption_track: dict = None,
+    captions_checked: bool = False,
+    youtube_title: str = None
+):
+    await update_job(job_id, "processing", db=db)
+    try:
+        video_id = extract_youtube_id(youtube_url)
+        cache_key = youtube_cache_key(video_id) if video_id else None
+
+        cached = await get_cached_transcript(
+            db, cache_key) if cache_key else None
+        # Subtitles take seconds instead of minutes; Whisper only runs
+        # without an acceptable track (captions_checked with no track means
+        # the API already looked) or when the user asked for it
+        captions = None
+        if (not cached and video_id and settings.YOUTUBE_CAPTIONS and not prefer_whisper
+                and (caption_track or not captions_checked)):
+            captions = await caption_transcript(
+                youtube_url, video_id, db, caption_track, youtube_title)
+
+        if cached:
+            result = {"title": cached.title or youtube_url,
+                      "text": cached.transcript,
+                      "segments": loads_segments(cached.segments)}
+            print(f"♻️ YouTube transcript cache hit for {video_id}")
+        elif captions:
+            result = captions
+            print(f"💬 Used YouTube captions for {video_id}")
+        elif video_id:
+            result = await transcribe_youtube_once(video_id, cache_key, db, job_id)
+        else:
+            result = await transcribe_youtube_video(youtube_url, None, db, job_id)
+
+        # Every submitter gets their own history record
+        await create_history_record(
             db,
             user_id,
             "YouTube",
             youtube_url,
-            transcription_text,
-            title=youtube_title,
-            segments=json.dumps(segments) if segments else None
+            result["text"],
+            title=result["title"],
+            segments=result["segments"]
         )
 
-        update_job(job_id, "completed", transcript=transcription_text, db=db)
-        print(f"✅ YouTube transcription completed for '{youtube_title}'")
+        await update_job(job_id, "completed", transcript=result["text"], db=db)
+        print(f"✅ YouTube transcription completed for '{result['title']}'")
 
     except Exception as e:
-        update_job(job_id, "failed", db=db)
+        # The worker retries or fails the job
+        await db.rollback()
         print(f"❌ Error during YouTube transcription: {e}")
+        raise
 
 
 class YouTubeRequest(BaseModel):
     youtube_url: str
+    # Run Whisper even when the video has subtitles (slower, usually more accurate)
+    prefer_whisper: bool = False
 
 
 @router.post("/process-youtube/")
 async def process_youtube(
-    background_tasks: BackgroundTasks,
     request: YouTubeRequest,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
+    video_id = extract_youtube_id(request.youtube_url)
+    cached = await get_cached_transcript(
+        db, youtube_cache_key(video_id)) if video_id else None
+    caption_track = None
+    captions_checked = False
     try:
-        with yt_dlp.YoutubeDL({"quiet": True}) as ydl:
-            info = ydl.extract_info(request.youtube_url, download=False)
+        if cached and cached.title:
+            # A cached video already knows its title; skip the metadata round-trip
+            youtube_title = cached.title
+        else:
+            info = await asyncio.to_thread(fetch_youtube_info, request.youtube_url)
             youtube_title = info.get("title") or request.youtube_url
+            if settings.YOUTUBE_CAPTIONS and not request.prefer_whisper:
+                # Handed to the job so it can fetch the subtitles directly
+                caption_track = pick_caption_track(info)
+                captions_checked = True
     except Exception:
         youtube_title = request.youtube_url
 
     job_id = str(uuid.uuid4())
-    create_job(job_id, current_user.id, f"YouTube: {youtube_title}", db)
-
-    background_tasks.add_task(
-        process_youtube_transcription,
-        request.youtube_url,
-        current_user.id,
-        db,
-        job_id
-    )
+    # Queued for python -m backend.worker
+    await create_job(job_id, current_user.id, f"YouTube: {youtube_title}", db,
+                     kind="transcribe_youtube",
+                     payload={"youtube_url": request.youtube_url,
+                              "prefer_whisper": request.prefer_whisper,
+                              "caption_track": caption_track,
+                              "captions_checked": captions_checked,
+                              "youtube_title": youtube_title})
 
     return {
         "message": "YouTube transcription started!",
         "job_id": job_id,
         "youtube_title": youtube_title,
+        "captions": caption_track is not None,
     }
-
-
-@router.get("/jobs/{job_id}/status")
-# Add db dependency
-async def get_youtube_job_status(job_id: str, db: Session = Depends(get_db)):
-    job = get_job(job_id, db)  # Pass db
-    if not job:
-        raise HTTPException(status_code=404, detail="Job ID not found")
-    return job
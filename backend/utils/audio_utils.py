@@ -0,0 +1,207 @@
+# backend/utils/audio_utils.py
+"""
+ffprobe/ffmpeg helpers for getting audio into the smallest shape Whisper
+still transcribes well: mono, 16 kHz, low-bitrate Opus. Whisper resamples
+everything to 16 kHz mono internally, so nothing it uses is lost.
+"""
+import bisect
+import json
+import math
+import os
+import re
+import subprocess
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+from backend.config import settings
+import logging
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+SPEECH_SAMPLE_RATE = 16000
+SPEECH_EXTENSION = ".ogg"
+
+
+@dataclass
+class AudioInfo:
+    duration: Optional[float]     # seconds
+    codec: Optional[str]
+    channels: Optional[int]
+    sample_rate: Optional[int]
+    bitrate: Optional[int]        # bits per second, whole file
+    size: int                     # bytes
+
+
+def _run(command: List[str], what: str) -> subprocess.CompletedProcess:
+    try:
+        return subprocess.run(command, check=True, capture_output=True, text=True)
+    except subprocess.CalledProcessError as e:
+        logger.error(f"{what} failed: {e.stderr}")
+        raise RuntimeError(f"{what} failed: {e.stderr[-500:]}")
+
+
+def _number(value, kind=float):
+    try:
+        return kind(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def probe_audio(path: str) -> AudioInfo:
+    """Duration, codec, channels, sample rate and bitrate of the first audio stream."""
+    result = _run([
+        "ffprobe", "-v", "error",
+        "-select_streams", "a:0",
+        "-show_entries", "format=duration,bit_rate:stream=codec_name,channels,sample_rate",
+        "-print_format", "json",
+        path
+    ], f"ffprobe of {path}")
+    data = json.loads(result.stdout or "{}")
+    stream = (data.get("streams") or [{}])[0]
+    fmt = data.get("format") or {}
+    return AudioInfo(
+        duration=_number(fmt.get("duration")),
+        codec=stream.get("codec_name"),
+        channels=_number(stream.get("channels"), int),
+        sample_rate=_number(stream.get("sample_rate"), int),
+        bitrate=_number(fmt.get("bit_rate"), int),
+        size=os.path.getsize(path),
+    )
+
+
+_SILENCE_START = re.compile(r"silence_start: (-?[\d.]+)")
+_SILENCE_END = re.compile(r"silence_end: (-?[\d.]+)")
+
+
+def detect_silences(
+    path: str,
+    noise_db: float = None,
+    min_silence: float = None
+) -> List[Tuple[float, Optional[float]]]:
+    """
+    (start, end) of every silence of at least `min_silence` seconds below
+    `noise_db`, from one decode with ffmpeg's silencedetect. A silence that
+    runs to the end of the file has end=None.
+    """
+    noise_db = settings.SILENCE_NOISE_DB if noise_db is None else noise_db
+    min_silence = settings.SILENCE_MIN_SECONDS if min_silence is None else min_silence
+    result = _run([
+        "ffmpeg", "-hide_banner", "-nostats",
+        "-i", path,
+        "-vn", "-ac", "1",
+        "-af", f"silencedetect=noise={noise_db}dB:d={min_silence}",
+        "-f", "null", "-"
+    ], f"silencedetect on {path}")
+    silences = []
+    for line in result.stderr.splitlines():
+        start = _SILENCE_START.search(line)
+        if start:
+            silences.append((max(0.0, float(start.group(1))), None))
+            continue
+        end = _SILENCE_END.search(line)
+        if end and silences and silences[-1][1] is None:
+            silences[-1] = (silences[-1][0], float(end.group(1)))
+    return silences
+
+
+def _speech_bounds(path: str, duration: Optional[float]) -> Tuple[float, Optional[float]]:
+    """Where speech starts and ends, ignoring leading/trailing silence."""
+    silences = detect_silences(path)
+    start, end = 0.0, None
+    if silences and silences[0][0] <= 0.05 and silences[0][1] is not None:
+        start = silences[0][1]
+    if silences and (silences[-1][1] is None or (duration and silences[-1][1] >= duration - 0.05)):
+        if silences[-1][0] > start:
+            end = silences[-1][0]
+    return start, end
+
+
+def pause_midpoints(silences: List[Tuple[float, Optional[float]]]) -> List[float]:
+    return sorted((start + end) / 2 for start, end in silences if end is not None)
+
+
+def choose_split_points(
+    duration: float,
+    silences: List[Tuple[float, Optional[float]]],
+    target_seconds: float,
+    tolerance_seconds: float
+) -> List[float]:
+    """
+    Cut points for equal-length chunks of at most about `target_seconds`.
+    Each ideal cut moves to the middle of the nearest pause within
+    `tolerance_seconds`, so words aren't sliced in half; without a pause
+    in reach it stays where it is.
+    """
+    count = max(1, math.ceil(duration / target_seconds))
+    size = duration / count
+    # Keeps neighbouring cuts apart and chunks roughly balanced
+    tolerance = min(tolerance_seconds, size / 3)
+    pauses = pause_midpoints(silences)
+    points = []
+    for k in range(1, count):
+        ideal = k * size
+        i = bisect.bisect_left(pauses, ideal)
+        near = [p for p in pauses[max(0, i - 1):i + 1] if abs(p - ideal) <= tolerance]
+        points.append(min(near, key=lambda p: abs(p - ideal)) if near else ideal)
+    return points
+
+
+def in_silence(t: float, silences: List[Tuple[float, Optional[float]]]) -> bool:
+    return any(start <= t <= (end if end is not None else math.inf) for start, end in silences)
+
+
+# Codecs Whisper reads straight from their native container (webm, ogg, m4a)
+PASSTHROUGH_CODECS = {"opus", "aac", "vorbis"}
+
+
+def needs_conditioning(info: AudioInfo, max_file_bytes: Optional[int] = None) -> bool:
+    """
+    False when re-encoding would gain little: the input is already mono,
+    <= 16 kHz and near our target bitrate, or it is a compact native
+    format (e.g. YouTube Opus/AAC) that fits in one `max_file_bytes` request.
+    """
+    target_bps = settings.PRECONDITION_BITRATE_KBPS * 1000
+    if (info.channels == 1
+            and info.sample_rate is not None and info.sample_rate <= SPEECH_SAMPLE_RATE
+            and info.bitrate is not None and info.bitrate <= target_bps * 1.5):
+        return False
+    if (info.codec in PASSTHROUGH_CODECS
+            and not settings.PRECONDITION_TRIM_SILENCE
+            and info.bitrate is not None
+            and info.bitrate <= settings.PASSTHROUGH_MAX_KBPS * 1000
+            and (max_file_bytes is None or info.size <= max_file_bytes)):
+        return False
+    return True
+
+
+def precondition_audio(path: str, output_dir: str, info: AudioInfo) -> Tuple[str, float]:
+    """
+    Downmix to mono, resample to 16 kHz and encode as Opus (VoIP tuning) at
+    PRECONDITION_BITRATE_KBPS; with PRECONDITION_TRIM_SILENCE, leading and
+    trailing silence is cut. Returns (output_path, offset) where offset is
+    the seconds trimmed from the start; add it to transcript timestamps so
+    they still match the original file.
+    """
+    start, end = 0.0, None
+    if settings.PRECONDITION_TRIM_SILENCE:
+        start, end = _speech_bounds(path, info.duration)
+
+    base_name = os.path.splitext(os.path.basename(path))[0]
+    output_path = os.path.join(output_dir, f"{base_name}.speech{SPEECH_EXTENSION}")
+    command = ["ffmpeg", "-y", "-hide_banner", "-i", path]
+    if start > 0:
+        command += ["-ss", f"{start:.3f}"]
+    if end is not None:
+        command += ["-to", f"{end:.3f}"]
+    command += [
+        "-vn", "-map_metadata", "-1",
+        "-ac", "1", "-ar", str(SPEECH_SAMPLE_RATE),
+        "-c:a", "libopus", "-b:a", f"{settings.PRECONDITION_BITRATE_KBPS}k",
+        "-application", "voip",
+        output_path
+    ]
+    _run(command, f"Conditioning {path}")
+    logger.info(
+        f"Conditioned {path}: {info.size} -> {os.path.getsize(output_path)} bytes"
+        + (f", trimmed {start:.1f}s of leading silence" if start else ""))
+    return output_path, start
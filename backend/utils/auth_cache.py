@@ -0,0 +1,65 @@
+# backend/utils/auth_cache.py
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional
+from backend.config import settings
+
+
+@dataclass(frozen=True)
+class Principal:
+    """The authenticated user as routes see it: just what they read."""
+    id: int
+    email: str
+
+
+def password_version(password_hash: str) -> str:
+    """Short fingerprint of the password hash; changes whenever the password does."""
+    return hashlib.sha256(password_hash.encode()).hexdigest()[:16]
+
+
+class PrincipalCache:
+    """
+    Bounded LRU of verified principals keyed by token signature. Entries
+    live for at most `ttl` seconds and never past the token's own expiry.
+
+    The cache is per process and nothing evicts it early: a password
+    change (which bumps the token's pwv) or a deleted user takes effect
+    once the entry expires, i.e. within AUTH_CACHE_TTL_SECONDS. Keep that
+    TTL short.
+    """
+
+    def __init__(self, max_size: int, ttl: float):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+
+    def get(self, key: str) -> Optional[Principal]:
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            principal, expires_at = entry
+            if expires_at <= now:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return principal
+
+    def set(self, key: str, principal: Principal, token_exp: Optional[float] = None):
+        expires_at = time.time() + self.ttl
+        if token_exp is not None:
+            expires_at = min(expires_at, token_exp)
+        with self._lock:
+            self._entries[key] = (principal, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+
+principal_cache = PrincipalCache(
+    settings.AUTH_CACHE_SIZE, settings.AUTH_CACHE_TTL_SECONDS)
@@ -0,0 +1,153 @@
+# backend/utils/captions.py
+"""
+YouTube subtitles as a transcript. Creator-uploaded tracks are preferred;
+only tracks in the spoken language are used when yt-dlp reports it, and
+auto-generated captions only in that original language (YouTube also
+offers machine translations of them, which we skip).
+Tracks are parsed from json3 or WebVTT into the pipeline's
+{"text", "segments"} shape, with segment times in seconds.
+"""
+import html
+import json
+import re
+from typing import List, Optional
+from backend.config import settings
+
+# Formats we can parse, best first
+CAPTION_FORMATS = ("json3", "vtt")
+
+
+def _preferred_languages(info: dict) -> List[str]:
+    """The spoken language when yt-dlp knows it, else CAPTION_LANGUAGES."""
+    if info.get("language"):
+        return [info["language"]]
+    return [lang.strip() for lang in settings.CAPTION_LANGUAGES.split(",") if lang.strip()]
+
+
+def _matches(track_lang: str, lang: str) -> bool:
+    return track_lang == lang or track_lang.startswith(f"{lang}-")
+
+
+def _with_format(formats: List[dict]) -> Optional[dict]:
+    for ext in CAPTION_FORMATS:
+        for fmt in formats or []:
+            if fmt.get("ext") == ext and fmt.get("url"):
+                return fmt
+    return None
+
+
+def pick_caption_track(info: dict) -> Optional[dict]:
+    """
+    Best acceptable track from yt-dlp metadata as {"lang", "ext", "url",
+    "automatic", "duration"}, or None.
+    """
+    languages = _preferred_languages(info)
+    subtitles = {lang: formats for lang, formats in (info.get("subtitles") or {}).items()
+                 if lang != "live_chat"}
+    for lang in languages:
+        for track_lang, formats in subtitles.items():
+            fmt = _with_format(formats) if _matches(track_lang, lang) else None
+            if fmt:
+                return {"lang": track_lang, "ext": fmt["ext"], "url": fmt["url"],
+                        "automatic": False, "duration": info.get("duration")}
+
+    # ASR of the spoken language is listed as "<lang>-orig" (or just "<lang>")
+    automatic = info.get("automatic_captions") or {}
+    original = info.get("language")
+    candidates = [lang for lang in automatic if lang.endswith("-orig")]
+    if original:
+        candidates = [lang for lang in (f"{original}-orig", original) if lang in automatic]
+    for lang in candidates:
+        fmt = _with_format(automatic[lang])
+        if fmt:
+            return {"lang": lang, "ext": fmt["ext"], "url": fmt["url"],
+                    "automatic": True, "duration": info.get("duration")}
+    return None
+
+
+def _segment(index: int, start: float, end: float, text: str) -> dict:
+    return {"id": index, "start": start, "end": end, "text": text}
+
+
+def parse_json3(raw: str) -> dict:
+    """YouTube's json3 timed text: events with tStartMs/dDurationMs and text runs in segs."""
+    cues = []
+    for event in json.loads(raw).get("events") or []:
+        text = " ".join("".join(seg.get("utf8", "") for seg in event.get("segs") or []).split())
+        # Skips styling events and the bare line breaks appended to auto captions
+        if text and "tStartMs" in event:
+            start = event["tStartMs"] / 1000
+            cues.append((start, start + event.get("dDurationMs", 0) / 1000, text))
+    segments = []
+    for i, (start, end, text) in enumerate(cues):
+        # Auto captions keep a line on screen until the next one replaces it
+        if i + 1 < len(cues):
+            end = min(end, cues[i + 1][0])
+        segments.append(_segment(len(segments), start, max(end, start), text))
+    return {"text": " ".join(s["text"] for s in segments), "segments": segments}
+
+
+_CUE_TIME = re.compile(
+    r"((?:\d+:)?\d{2}:\d{2}\.\d{3})\s+-->\s+((?:\d+:)?\d{2}:\d{2}\.\d{3})")
+_TAG = re.compile(r"<[^>]+>")
+
+
+def _vtt_seconds(stamp: str) -> float:
+    seconds = 0.0
+    for part in stamp.split(":"):
+        seconds = seconds * 60 + float(part)
+    return seconds
+
+
+def parse_vtt(raw: str) -> dict:
+    """
+    WebVTT cues. Auto-generated tracks roll: each cue repeats the line
+    shown before it, so lines already in the previous cue are skipped.
+    """
+    segments = []
+    previous_lines = set()
+    # Only truly empty lines end a cue; YouTube puts " " lines inside cues
+    for block in re.split(r"\n{2,}", raw.replace("\r\n", "\n")):
+        lines = block.strip().split("\n")
+        timing = next((i for i, line in enumerate(lines) if _CUE_TIME.search(line)), None)
+        if timing is None:
+            continue
+        match = _CUE_TIME.search(lines[timing])
+        start, end = _vtt_seconds(match.group(1)), _vtt_seconds(match.group(2))
+        cue_lines = [" ".join(html.unescape(_TAG.sub("", line)).split())
+                     for line in lines[timing + 1:]]
+        cue_lines = [line for line in cue_lines if line]
+        new_lines = [line for line in cue_lines if line not in previous_lines]
+        previous_lines = set(cue_lines)
+        if new_lines:
+            segments.append(_segment(len(segments), start, end, " ".join(new_lines)))
+    return {"text": " ".join(s["text"] for s in segments), "segments": segments}
+
+
+def parse_captions(raw: str, ext: str) -> dict:
+    if ext == "json3":
+        return parse_json3(raw)
+    if ext == "vtt":
+        return parse_vtt(raw)
+    raise ValueError(f"Unsupported caption format '{ext}'")
+
+
+def _covered_seconds(segments: List[dict]) -> float:
+    """Time on screen of all cues together, overlaps counted once."""
+    covered, reached = 0.0, 0.0
+    for segment in sorted(segments, key=lambda s: s["start"]):
+        start = max(segment["start"], reached)
+        if segment["end"] > start:
+            covered += segment["end"] - start
+            reached = segment["end"]
+    return covered
+
+
+def is_acceptable(result: dict, duration: Optional[float]) -> bool:
+    """Enough text, with cues on screen for at least CAPTION_MIN_COVERAGE of the video."""
+    segments = result.get("segments") or []
+    if not segments or not result.get("text", "").strip():
+        return False
+    if duration:
+        return _covered_seconds(segments) >= duration * settings.CAPTION_MIN_COVERAGE
+    return True
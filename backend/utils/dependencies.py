@@ -4,6 +4,7 @@ from jose import JWTError, jwt
 from backend.database import SessionLocal
 from backend.models.user import User
 from backend.config import settings
+from backend.utils.auth_cache import Principal, password_version, principal_cache
 import logging
 
 logging.basicConfig(level=logging.INFO)
@@ -13,15 +14,19 @@ SECRET_KEY = settings.SECRET_KEY
 ALGORITHM = "HS256"
 
 
-def get_db():
-    db = SessionLocal()
-    try:
+async def get_db():
+    async with SessionLocal() as db:
         yield db
-    finally:
-        db.close()
 
 
-def get_current_user(request: Request, db: SessionLocal = Depends(get_db)) -> User:
+async def get_current_user(request: Request) -> Principal:
+    """
+    Resolve the session cookie to a Principal. Verified tokens are cached
+    by signature for AUTH_CACHE_TTL_SECONDS, so repeat requests (status
+    polls, page loads) skip the users query entirely. On a miss the user
+    is read in a session of its own that is closed right away, so
+    long-lived responses (event streams) don't hold a connection.
+    """
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -41,8 +46,31 @@ def get_current_user(request: Request, db: SessionLocal = Depends(get_db)) -> Us
     except (JWTError, ValueError) as e:
         logger.info(f"JWT decode error: {str(e)}")
         raise credentials_exception
-    user = db.query(User).filter(User.id == user_id).first()
+
+    # Signature was just verified, so it identifies this exact token
+    cache_key = token.rsplit(".", 1)[-1]
+    principal = principal_cache.get(cache_key)
+    if principal:
+        return principal
+
+    async with SessionLocal() as db:
+        user = await db.get(User, user_id)
     if not user:
         logger.info(f"No user found for ID: {user_id}")
         raise credentials_exception
-    return user
+    token_version = payload.get("pwv")
+    if token_version and token_version != password_version(user.password_hash):
+        logger.info(f"Token for user {user_id} predates a password change")
+        raise credentials_exception
+
+    principal = Principal(id=user.id, email=user.email)
+    principal_cache.set(cache_key, principal, payload.get("exp"))
+    return principal
+
+
+async def get_admin_user(current_user: Principal = Depends(get_current_user)) -> Principal:
+    """The current user, if listed in ADMIN_EMAILS; 403 otherwise."""
+    admins = {email.strip().lower() for email in settings.ADMIN_EMAILS.split(",") if email.strip()}
+    if current_user.email.lower() not in admins:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admins only")
+    return current_user
@@ -0,0 +1,98 @@
+# backend/utils/fts.py
+"""
+Full-text search indexes for /history/search.
+
+Postgres: a stored, generated `search_vector` tsvector column on
+transcription_history and content_generation (title weighted above the
+body) with a GIN index, so matching and ranking never re-parse the text.
+SQLite (tests): external-content FTS5 tables kept in sync by triggers.
+
+Neither fits in the ORM models (create_all can't emit them portably), so
+both init_db and the migration run the DDL below.
+"""
+from sqlalchemy import text
+
+# Text search configuration baked into the generated columns; queries must
+# use the same one. "simple" lowercases without stemming, which suits the
+# mix of Indonesian and English in our transcripts.
+FTS_CONFIG = "simple"
+
+POSTGRES_DDL = [
+    f"""ALTER TABLE transcription_history ADD COLUMN IF NOT EXISTS search_vector tsvector
+        GENERATED ALWAYS AS (
+            setweight(to_tsvector('{FTS_CONFIG}', coalesce(title, '')), 'A') ||
+            to_tsvector('{FTS_CONFIG}', transcript)
+        ) STORED""",
+    """CREATE INDEX IF NOT EXISTS ix_transcription_history_search_vector
+        ON transcription_history USING gin (search_vector)""",
+    f"""ALTER TABLE content_generation ADD COLUMN IF NOT EXISTS search_vector tsvector
+        GENERATED ALWAYS AS (
+            setweight(to_tsvector('{FTS_CONFIG}', coalesce(title, '')), 'A') ||
+            to_tsvector('{FTS_CONFIG}', generated_content)
+        ) STORED""",
+    """CREATE INDEX IF NOT EXISTS ix_content_generation_search_vector
+        ON content_generation USING gin (search_vector)""",
+]
+
+_POSTGRES_DROP_DDL = [
+    "DROP INDEX IF EXISTS ix_content_generation_search_vector",
+    "ALTER TABLE content_generation DROP COLUMN IF EXISTS search_vector",
+    "DROP INDEX IF EXISTS ix_transcription_history_search_vector",
+    "ALTER TABLE transcription_history DROP COLUMN IF EXISTS search_vector",
+]
+
+
+def _sqlite_fts_ddl(table: str, body: str) -> list:
+    fts = f"{table}_fts"
+    return [
+        f"""CREATE VIRTUAL TABLE {fts} USING fts5(
+            title, {body}, content='{table}', content_rowid='id')""",
+        f"""CREATE TRIGGER {fts}_ai AFTER INSERT ON {table} BEGIN
+            INSERT INTO {fts}(rowid, title, {body}) VALUES (new.id, new.title, new.{body});
+        END""",
+        f"""CREATE TRIGGER {fts}_ad AFTER DELETE ON {table} BEGIN
+            INSERT INTO {fts}({fts}, rowid, title, {body})
+            VALUES ('delete', old.id, old.title, old.{body});
+        END""",
+        f"""CREATE TRIGGER {fts}_au AFTER UPDATE ON {table} BEGIN
+            INSERT INTO {fts}({fts}, rowid, title, {body})
+            VALUES ('delete', old.id, old.title, old.{body});
+            INSERT INTO {fts}(rowid, title, {body}) VALUES (new.id, new.title, new.{body});
+        END""",
+        # Index whatever rows already exist
+        f"INSERT INTO {fts}({fts}) VALUES ('rebuild')",
+    ]
+
+
+SQLITE_FTS_TABLES = {
+    "transcription_history": "transcript",
+    "content_generation": "generated_content",
+}
+
+
+def ensure_search_index(conn):
+    """Create the search index for this database if it is missing (sync connection)."""
+    dialect = conn.dialect.name
+    if dialect == "postgresql":
+        for statement in POSTGRES_DDL:
+            conn.execute(text(statement))
+    elif dialect == "sqlite":
+        for table, body in SQLITE_FTS_TABLES.items():
+            exists = conn.execute(text(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"
+            ), {"name": f"{table}_fts"}).first()
+            if not exists:
+                for statement in _sqlite_fts_ddl(table, body):
+                    conn.execute(text(statement))
+
+
+def drop_search_index(conn):
+    dialect = conn.dialect.name
+    if dialect == "postgresql":
+        for statement in _POSTGRES_DROP_DDL:
+            conn.execute(text(statement))
+    elif dialect == "sqlite":
+        for table in SQLITE_FTS_TABLES:
+            for suffix in ("ai", "ad", "au"):
+                conn.execute(text(f"DROP TRIGGER IF EXISTS {table}_fts_{suffix}"))
+            conn.execute(text(f"DROP TABLE IF EXISTS {table}_fts"))
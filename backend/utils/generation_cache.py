@@ -0,0 +1,58 @@
+# backend/utils/generation_cache.py
+"""
+Keys and counters for the article generation cache. Entries themselves are
+ContentGeneration rows carrying a cache_key (see crud/cache_crud.py).
+"""
+import hashlib
+import json
+import threading
+
+# Bump when the article prompt changes so old entries stop matching
+PROMPT_VERSION = 1
+
+STYLE_FIELDS = (
+    "gaya_bahasa",
+    "kepadatan_informasi",
+    "sentimen",
+    "gaya_penyampaian",
+    "format_output",
+    "gaya_kutipan",
+    "bahasa",
+    "penyuntingan",
+)
+
+
+def generation_cache_key(transcript: str, style: dict, catatan_tambahan: str, model: str) -> str:
+    """sha256 over the transcript's hash, every style field, the notes and the model."""
+    material = {
+        "transcript": hashlib.sha256(transcript.encode("utf-8")).hexdigest(),
+        "style": {field: style[field] for field in STYLE_FIELDS},
+        "catatan_tambahan": catatan_tambahan.strip(),
+        "model": model,
+        "prompt_version": PROMPT_VERSION,
+    }
+    canonical = json.dumps(material, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class CacheStats:
+    """Per-process hit/miss counters, exposed by GET /generate/cache/stats."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts = {"hits": 0, "misses": 0, "attached": 0, "forced": 0}
+
+    def record(self, outcome: str):
+        with self._lock:
+            self._counts[outcome] += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            counts = dict(self._counts)
+        lookups = counts["hits"] + counts["attached"] + counts["misses"]
+        counts["hit_ratio"] = (
+            (counts["hits"] + counts["attached"]) / lookups if lookups else None)
+        return counts
+
+
+generation_cache_stats = CacheStats()
@@ -0,0 +1,210 @@
+# backend/utils/http_client.py
+"""
+Shared client layer for every call to the OpenAI API (Whisper uploads from
+worker threads, chat completions from the event loop):
+
+- keep-alive connection pools (requests.Session / httpx.AsyncClient)
+- connect/read timeouts plus an overall deadline per call
+- exponential backoff with full jitter on 429/5xx and connection errors,
+  honouring Retry-After
+- one process-wide token bucket sized to our OpenAI request rate limit,
+  shared by threads and coroutines
+
+OPENAI_BASE_URL can point everything at a local fake server.
+"""
+import asyncio
+import email.utils
+import random
+import threading
+import time
+from typing import Awaitable, Callable, Optional
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+from openai import (AsyncOpenAI, APIConnectionError, APIStatusError,
+                    APITimeoutError, RateLimitError)
+from backend.config import settings
+import logging
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+RETRYABLE_STATUSES = {408, 409, 429, 500, 502, 503, 504}
+
+
+class UpstreamError(Exception):
+    """An upstream call failed for good (non-retryable, out of attempts or past its deadline)."""
+
+    def __init__(self, message: str, status_code: Optional[int] = None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class TokenBucket:
+    """
+    `rate` requests per second with bursts up to `capacity`. Callers reserve
+    a token under a lock and sleep outside it, so threads (acquire) and
+    coroutines (acquire_async) can share one bucket.
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        if rate <= 0 or capacity < 1:
+            raise ValueError(f"TokenBucket needs rate > 0 and capacity >= 1, got {rate} and {capacity}")
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _reserve(self) -> float:
+        """Take a token (possibly one not refilled yet); returns seconds to wait for it."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+    def acquire(self):
+        wait = self._reserve()
+        if wait:
+            time.sleep(wait)
+
+    async def acquire_async(self):
+        wait = self._reserve()
+        if wait:
+            await asyncio.sleep(wait)
+
+
+openai_rate_limiter = TokenBucket(
+    rate=settings.OPENAI_REQUESTS_PER_MINUTE / 60.0,
+    capacity=settings.OPENAI_BURST)
+
+
+def retry_after_seconds(value: Optional[str]) -> Optional[float]:
+    """Parse Retry-After, given either as seconds or as an HTTP date."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, when.timestamp() - time.time())
+
+
+def backoff_delay(attempt: int, retry_after: Optional[float] = None) -> float:
+    """Full-jitter exponential backoff; a server-provided Retry-After wins if longer."""
+    ceiling = min(settings.HTTP_BACKOFF_MAX_SECONDS,
+                  settings.HTTP_BACKOFF_BASE_SECONDS * (2 ** attempt))
+    delay = random.uniform(0, ceiling)
+    if retry_after is not None:
+        delay = max(delay, retry_after)
+    return delay
+
+
+def _next_delay(attempt: int, deadline: float, retry_after: Optional[float], reason: str) -> float:
+    """Delay before the next attempt, or raise UpstreamError if there shouldn't be one."""
+    if attempt + 1 >= settings.HTTP_MAX_ATTEMPTS:
+        raise UpstreamError(f"{reason} (gave up after {attempt + 1} attempts)")
+    delay = backoff_delay(attempt, retry_after)
+    if time.monotonic() + delay >= deadline:
+        raise UpstreamError(f"{reason} (deadline exceeded)")
+    logger.warning(f"{reason}; retrying in {delay:.1f}s")
+    return delay
+
+
+# --- Sync (worker threads) -------------------------------------------------------
+
+_session_lock = threading.Lock()
+_session: Optional[requests.Session] = None
+
+
+def http_session() -> requests.Session:
+    """Process-wide keep-alive session, with a pool as large as our Whisper concurrency."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=4,
+                                  pool_maxsize=settings.TRANSCRIBE_MAX_CONCURRENCY)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _session = session
+        return _session
+
+
+def request_with_retries(method: str, url: str, deadline_seconds: float, **kwargs) -> requests.Response:
+    """
+    requests call with pooling, timeouts, rate limiting and retries. Bodies
+    must be replayable (bytes, not open files). Raises UpstreamError.
+    """
+    deadline = time.monotonic() + deadline_seconds
+    attempt = 0
+    while True:
+        openai_rate_limiter.acquire()
+        remaining = deadline - time.monotonic()
+        try:
+            response = http_session().request(
+                method, url,
+                timeout=(settings.HTTP_CONNECT_TIMEOUT_SECONDS,
+                         min(settings.HTTP_READ_TIMEOUT_SECONDS, max(remaining, 1.0))),
+                **kwargs)
+        except (requests.ConnectionError, requests.Timeout) as e:
+            time.sleep(_next_delay(attempt, deadline, None, f"{method} {url} failed: {e}"))
+            attempt += 1
+            continue
+        if response.status_code < 400:
+            return response
+        reason = f"{method} {url} returned {response.status_code}: {response.text[:200]}"
+        if response.status_code not in RETRYABLE_STATUSES:
+            raise UpstreamError(reason, response.status_code)
+        try:
+            time.sleep(_next_delay(attempt, deadline, retry_after_seconds(
+                response.headers.get("Retry-After")), reason))
+        except UpstreamError as e:
+            e.status_code = response.status_code
+            raise
+        attempt += 1
+
+
+# --- Async (OpenAI SDK) ----------------------------------------------------------
+
+def async_openai_client() -> AsyncOpenAI:
+    """AsyncOpenAI on a pooled httpx client; retries are ours, so the SDK's are off."""
+    return AsyncOpenAI(
+        api_key=settings.OPENAI_API_KEY,
+        base_url=settings.OPENAI_BASE_URL,
+        max_retries=0,
+        timeout=httpx.Timeout(settings.HTTP_READ_TIMEOUT_SECONDS,
+                              connect=settings.HTTP_CONNECT_TIMEOUT_SECONDS),
+        http_client=httpx.AsyncClient(limits=httpx.Limits(
+            max_connections=settings.GENERATION_MAP_CONCURRENCY * 2 + 4,
+            max_keepalive_connections=settings.GENERATION_MAP_CONCURRENCY * 2)),
+    )
+
+
+async def call_with_retries(fn: Callable[..., Awaitable], *args, deadline_seconds: float, **kwargs):
+    """
+    Await an OpenAI SDK call with rate limiting, backoff and a deadline.
+    For stream=True calls only opening the stream is retried.
+    """
+    deadline = time.monotonic() + deadline_seconds
+    attempt = 0
+    while True:
+        await openai_rate_limiter.acquire_async()
+        try:
+            return await asyncio.wait_for(
+                fn(*args, **kwargs), timeout=max(deadline - time.monotonic(), 1.0))
+        except (APIConnectionError, APITimeoutError, asyncio.TimeoutError) as e:
+            delay = _next_delay(attempt, deadline, None, f"OpenAI call failed: {e!r}")
+        except (RateLimitError, APIStatusError) as e:
+            if e.status_code not in RETRYABLE_STATUSES:
+                raise
+            delay = _next_delay(attempt, deadline, retry_after_seconds(
+                e.response.headers.get("retry-after")), f"OpenAI returned {e.status_code}")
+        await asyncio.sleep(delay)
+        attempt += 1
@@ -0,0 +1,177 @@
+# backend/utils/job_events.py
+"""
+Job status events for the /jobs/stream endpoint.
+
+update_job/create_job publish an event whenever a job changes, and
+streaming article generation publishes "delta" events carrying the newly
+generated text (relayed by /generate/{job_id}/stream). With a
+single process the event goes straight onto the in-process bus. When the
+database is Postgres, jobs are updated by separate worker processes, so the
+event is sent with NOTIFY instead and every web process runs a LISTEN
+thread that feeds its own bus.
+
+The in-process bus does not cross processes. On SQLite (or with
+JOB_EVENTS_BACKEND=memory) events published by `python -m backend.worker`
+never reach the web process: /jobs/stream and /generate/{job_id}/stream
+stay silent for queued jobs, and clients have to poll /jobs/{job_id}/status.
+Live events need Postgres.
+"""
+import asyncio
+import json
+import select
+import threading
+import time
+from typing import Dict, Set, Tuple
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+from backend.config import settings
+from backend.database import engine
+import logging
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+CHANNEL = "job_events"
+SUBSCRIBER_QUEUE_SIZE = 100
+# NOTIFY payloads are capped at 8000 bytes; 1500 chars stays under it in UTF-8
+MAX_DELTA_CHARS = 1500
+
+
+def _use_postgres() -> bool:
+    backend = settings.JOB_EVENTS_BACKEND
+    if backend == "auto":
+        return settings.DATABASE_URL.startswith("postgresql")
+    return backend == "postgres"
+
+
+class JobEventBus:
+    """Fan-out of job events to the SSE connections of each user."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers: Dict[int, Set[Tuple[asyncio.AbstractEventLoop, asyncio.Queue]]] = {}
+
+    def subscribe(self, user_id: int) -> asyncio.Queue:
+        queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        with self._lock:
+            self._subscribers.setdefault(user_id, set()).add(
+                (asyncio.get_running_loop(), queue))
+        return queue
+
+    def unsubscribe(self, user_id: int, queue: asyncio.Queue):
+        with self._lock:
+            subscribers = self._subscribers.get(user_id, set())
+            subscribers.difference_update(
+                {entry for entry in subscribers if entry[1] is queue})
+            if not subscribers:
+                self._subscribers.pop(user_id, None)
+
+    def publish(self, job_event: dict):
+        """Safe to call from any thread."""
+        with self._lock:
+            targets = list(self._subscribers.get(job_event["user_id"], ()))
+        for loop, queue in targets:
+            loop.call_soon_threadsafe(_offer, queue, job_event)
+
+
+def _offer(queue: asyncio.Queue, job_event: dict):
+    try:
+        queue.put_nowait(job_event)
+    except asyncio.QueueFull:
+        # A stalled client only misses intermediate transitions
+        pass
+
+
+bus = JobEventBus()
+
+
+def job_event(job) -> dict:
+    return {
+        "job_id": job.id,
+        "user_id": job.user_id,
+        "status": job.status,
+        "title": job.title,
+        "progress": job.progress,
+        "duration_seconds": job.duration_seconds,
+        "created_at": job.created_at.isoformat() if job.created_at else None,
+        "completed_at": job.completed_at.isoformat() if job.completed_at else None,
+    }
+
+
+def delta_event(job_id: str, user_id: int, offset: int, text: str) -> dict:
+    return {"type": "delta", "job_id": job_id, "user_id": user_id,
+            "offset": offset, "text": text}
+
+
+async def publish_job_event(job, db: AsyncSession):
+    """Announce a job change. Call after the change is committed and refreshed."""
+    await _publish(job_event(job), db)
+
+
+def delta_flush_seconds() -> float:
+    """How often a generating job should publish its new text."""
+    if _use_postgres():
+        # Every flush is a NOTIFY round-trip; coalesce more
+        return max(settings.GENERATION_FLUSH_SECONDS, settings.GENERATION_NOTIFY_FLUSH_SECONDS)
+    return settings.GENERATION_FLUSH_SECONDS
+
+
+async def publish_delta(job_id: str, user_id: int, offset: int, text: str):
+    """
+    Announce text appended to a job's output at character `offset`. Long
+    deltas are split so each fits in one NOTIFY payload; the pieces go out
+    together, outside the generating job's session and transaction.
+    """
+    payloads = [delta_event(job_id, user_id, offset + start, text[start:start + MAX_DELTA_CHARS])
+                for start in range(0, len(text), MAX_DELTA_CHARS)]
+    if not _use_postgres():
+        for payload in payloads:
+            bus.publish(payload)
+        return
+    async with engine.begin() as conn:
+        for payload in payloads:
+            await _notify(conn, payload)
+
+
+async def _notify(conn, payload: dict):
+    await conn.execute(text("SELECT pg_notify(:channel, :payload)"),
+                       {"channel": CHANNEL, "payload": json.dumps(payload)})
+
+
+async def _publish(payload: dict, db: AsyncSession):
+    if _use_postgres():
+        await _notify(db, payload)
+        await db.commit()
+    else:
+        bus.publish(payload)
+
+
+def _listen_forever():
+    import psycopg2
+
+    while True:
+        try:
+            conn = psycopg2.connect(settings.DATABASE_URL)
+            conn.set_isolation_level(
+                psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+            with conn.cursor() as cursor:
+                cursor.execute(f"LISTEN {CHANNEL};")
+            logger.info(f"Listening for {CHANNEL} notifications")
+            while True:
+                if select.select([conn], [], [], 30) == ([], [], []):
+                    continue
+                conn.poll()
+                while conn.notifies:
+                    notification = conn.notifies.pop(0)
+                    bus.publish(json.loads(notification.payload))
+        except Exception as e:
+            logger.error(f"{CHANNEL} listener failed, reconnecting: {e}")
+            time.sleep(5)
+
+
+def start_job_event_listener():
+    """Start the LISTEN thread when events travel through Postgres."""
+    if not _use_postgres():
+        return
+    threading.Thread(target=_listen_forever, name="job-events-listener",
+                     daemon=True).start()
@@ -0,0 +1,154 @@
+# backend/utils/job_queue.py
+from datetime import datetime, timedelta
+from typing import Optional
+from sqlalchemy import or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from backend.models.job import Job
+from backend.utils.job_events import publish_job_event
+import logging
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def _queued_jobs():
+    return (
+        select(Job)
+        .where(Job.status == "pending", Job.kind.isnot(None),
+               or_(Job.available_at.is_(None), Job.available_at <= datetime.utcnow()))
+        .order_by(Job.created_at)
+    )
+
+
+def _lease_values(worker_id: str, lease_seconds: int) -> dict:
+    now = datetime.utcnow()
+    return {
+        "status": "processing",
+        "lease_owner": worker_id,
+        "lease_expires_at": now + timedelta(seconds=lease_seconds),
+        "heartbeat_at": now,
+        "attempts": Job.attempts + 1,
+    }
+
+
+async def _fetch_job(db: AsyncSession, job_id: str) -> Job:
+    return await db.scalar(
+        select(Job).where(Job.id == job_id).execution_options(populate_existing=True))
+
+
+async def claim_next_job(db: AsyncSession, worker_id: str, lease_seconds: int) -> Optional[Job]:
+    """
+    Atomically take the oldest queued job and lease it to `worker_id`.
+    Postgres uses SELECT ... FOR UPDATE SKIP LOCKED so pollers never block
+    on each other; SQLite has no row locks, so a conditional UPDATE on
+    status acts as compare-and-swap instead.
+    """
+    if db.get_bind().dialect.name == "postgresql":
+        job = await db.scalar(
+            _queued_jobs().limit(1).with_for_update(skip_locked=True))
+        if job is None:
+            await db.rollback()
+            return None
+        job_id = job.id
+        await db.execute(update(Job).where(Job.id == job_id).values(
+            **_lease_values(worker_id, lease_seconds)))
+        await db.commit()
+        return await _fetch_job(db, job_id)
+
+    result = await db.execute(_queued_jobs().with_only_columns(Job.id).limit(10))
+    for job_id in result.scalars().all():
+        claimed = await db.execute(update(Job).where(
+            Job.id == job_id, Job.status == "pending"
+        ).values(**_lease_values(worker_id, lease_seconds)))
+        await db.commit()
+        if claimed.rowcount:
+            return await _fetch_job(db, job_id)
+    return None
+
+
+async def heartbeat(db: AsyncSession, job_id: str, worker_id: str, lease_seconds: int) -> bool:
+    """Extend the lease; returns False when the worker no longer owns the job."""
+    now = datetime.utcnow()
+    renewed = await db.execute(update(Job).where(
+        Job.id == job_id,
+        Job.lease_owner == worker_id,
+        Job.status == "processing"
+    ).values(
+        lease_expires_at=now + timedelta(seconds=lease_seconds),
+        heartbeat_at=now,
+    ))
+    await db.commit()
+    return bool(renewed.rowcount)
+
+
+async def release_job(db: AsyncSession, job_id: str, worker_id: str, error: str = None):
+    """Drop the lease once the task has returned (its status is already final)."""
+    values = {"lease_owner": None, "lease_expires_at": None}
+    if error:
+        values["last_error"] = error
+    await db.execute(update(Job).where(
+        Job.id == job_id, Job.lease_owner == worker_id
+    ).values(**values))
+    await db.commit()
+
+
+async def retry_or_fail_job(
+    db: AsyncSession,
+    job_id: str,
+    worker_id: str,
+    error: str,
+    max_attempts: int,
+    backoff_seconds: float
+) -> Optional[str]:
+    """
+    After a task raised: put the job back on the queue, not to run before
+    `backoff_seconds` doubled per attempt, or mark it failed once it has
+    used up `max_attempts`. Does nothing if the worker no longer holds
+    the lease. Returns the new status.
+    """
+    job = await db.scalar(select(Job).where(
+        Job.id == job_id, Job.lease_owner == worker_id
+    ).execution_options(populate_existing=True))
+    if job is None:
+        return None
+    now = datetime.utcnow()
+    job.last_error = error
+    job.lease_owner = None
+    job.lease_expires_at = None
+    if job.attempts < max_attempts:
+        job.status = "pending"
+        job.progress = None
+        job.available_at = now + timedelta(seconds=backoff_seconds * 2 ** max(0, job.attempts - 1))
+        logger.warning(
+            f"Job {job_id} failed (attempt {job.attempts} of {max_attempts}), "
+            f"retrying after {job.available_at.isoformat()}")
+    else:
+        job.status = "failed"
+    await db.commit()
+    await publish_job_event(job, db)
+    return job.status
+
+
+async def requeue_expired_jobs(db: AsyncSession, max_attempts: int) -> int:
+    """
+    Put jobs whose worker stopped heartbeating back on the queue, or mark
+    them failed once they have used up `max_attempts`.
+    """
+    now = datetime.utcnow()
+    result = await db.execute(select(Job).where(
+        Job.status == "processing",
+        Job.kind.isnot(None),
+        Job.lease_expires_at.isnot(None),
+        Job.lease_expires_at < now
+    ))
+    expired = result.scalars().all()
+    for job in expired:
+        logger.warning(
+            f"Lease on job {job.id} held by {job.lease_owner} expired (attempt {job.attempts})")
+        job.status = "pending" if job.attempts < max_attempts else "failed"
+        job.last_error = f"Lease expired on {job.lease_owner}"
+        job.lease_owner = None
+        job.lease_expires_at = None
+    if expired:
+        await db.commit()
+    return len(expired)
@@ -1,37 +1,128 @@
 # backend/utils/job_status.py
-from sqlalchemy.orm import Session
-from sqlalchemy import func
+import asyncio
+from typing import Callable, List, Optional
+from sqlalchemy import func, literal, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from backend.database import SessionLocal
 from backend.models.job import Job
+from backend.utils.job_events import publish_job_event
 
+# Columns needed to report status; never includes the transcript
+STATUS_COLUMNS = (Job.id, Job.status, Job.title, Job.progress,
+                  Job.duration_seconds, Job.created_at, Job.completed_at)
+ACTIVE_STATUSES = ("pending", "processing")
+# Inlined as literals: with bound parameters the planner can't tell that a
+# query implies the partial indexes' WHERE status IN (...), and scans
+IS_ACTIVE = Job.status.in_([literal(status, literal_execute=True) for status in ACTIVE_STATUSES])
 
-def create_job(job_id: str, user_id: str, title: str, db: Session):  # Add title parameter
-    """Initialize a new job with 'pending' status in the database."""
-    job = Job(id=job_id, user_id=user_id, status="pending", title=title)
+
+async def create_job(
+    job_id: str,
+    user_id: str,
+    title: str,
+    db: AsyncSession,
+    kind: str = None,
+    payload: dict = None,
+    dedupe_key: str = None
+):
+    """
+    Initialize a new job with 'pending' status in the database. Jobs created
+    with a `kind` are queued and picked up by `python -m backend.worker`.
+    """
+    job = Job(id=job_id, user_id=user_id, status="pending", title=title,
+              kind=kind, payload=payload, attempts=0, dedupe_key=dedupe_key)
     db.add(job)
-    db.commit()
-    db.refresh(job)
+    await db.commit()
+    await db.refresh(job)
+    await publish_job_event(job, db)
     return job
 
 
-def update_job(job_id: str, status: str, transcript: str = None, db: Session = None):
-    """Update job status and optionally transcript in the database."""
+async def _load_job(job_id: str, db: AsyncSession):
+    # populate_existing: the session may already hold an older copy
+    return await db.scalar(
+        select(Job).where(Job.id == job_id).execution_options(populate_existing=True))
+
+
+async def update_job(job_id: str, status: str, transcript: str = None, db: AsyncSession = None, progress: float = None):
+    """Update job status and optionally transcript/progress in the database."""
     if db is None:
         raise ValueError("Database session is required")
-    job = db.query(Job).filter(Job.id == job_id).first()
+    job = await _load_job(job_id, db)
     if job:
         job.status = status
         if transcript:
             job.transcript = transcript
+        if progress is not None:
+            job.progress = progress
+        if status == "completed":
+            job.progress = 1.0
         if status == "completed" and not job.completed_at:
             job.completed_at = func.now()
-        db.commit()
-        db.refresh(job)
+        await db.commit()
+        await db.refresh(job)
+        await publish_job_event(job, db)
     return job
 
 
-def get_job(job_id: str, db: Session):
-    """Retrieve job status from the database."""
-    job = db.query(Job).filter(Job.id == job_id).first()
+async def checkpoint_job_output(job_id: str, partial: str, db: AsyncSession):
+    """
+    Save partial output (e.g. a half-generated article) into job.transcript
+    without touching status, so a reconnecting client can catch up.
+    """
+    await db.execute(update(Job).where(
+        Job.id == job_id, Job.status == "processing"
+    ).values(transcript=partial))
+    await db.commit()
+
+
+async def find_active_job(db: AsyncSession, user_id: int, dedupe_key: str):
+    """ID of the user's pending/processing job doing the same work, if any."""
+    return await db.scalar(select(Job.id).where(
+        Job.user_id == user_id,
+        Job.dedupe_key == dedupe_key,
+        IS_ACTIVE
+    ).limit(1))
+
+
+async def claim_flight(db: AsyncSession, job_id: str, flight_key: str) -> Optional[str]:
+    """
+    Try to make the job the one doing `flight_key`'s work. Returns the ID of
+    the active job holding the key (job_id when the claim won), or None when
+    the holder finished in the meantime and the claim should be retried.
+    """
+    try:
+        await db.execute(update(Job).where(Job.id == job_id).values(flight_key=flight_key))
+        await db.commit()
+        return job_id
+    except IntegrityError:
+        # Another active job holds the key (unique partial index)
+        await db.rollback()
+    return await db.scalar(select(Job.id).where(Job.flight_key == flight_key, IS_ACTIVE))
+
+
+async def follow_job(leader_id: str, job_id: str, poll_seconds: float) -> Optional[str]:
+    """
+    Wait for another job to finish, copying its progress onto job_id so the
+    follower's own watchers see it move. Returns the leader's final status.
+    """
+    progress = None
+    while True:
+        async with SessionLocal() as db:
+            leader = (await db.execute(
+                select(Job.status, Job.progress).where(Job.id == leader_id))).first()
+        if leader is None or leader.status not in ACTIVE_STATUSES:
+            return leader.status if leader else None
+        if leader.progress is not None and leader.progress != progress:
+            progress = leader.progress
+            await set_job_progress(job_id, progress)
+        await asyncio.sleep(poll_seconds)
+
+
+async def get_job(job_id: str, user_id: int, db: AsyncSession):
+    """Retrieve one of the user's jobs from the database."""
+    job = await db.scalar(select(Job).where(Job.id == job_id, Job.user_id == user_id))
     if job:
         return {
             "status": job.status,
@@ -39,5 +130,79 @@ def get_job(job_id: str, db: Session):
             "created_at": job.created_at.isoformat() if job.created_at else None,
             "completed_at": job.completed_at.isoformat() if job.completed_at else None,
             "title": job.title,  # Include title
+            "progress": job.progress,
+            "duration_seconds": job.duration_seconds,
         }
     return None
+
+
+def _status_row(row) -> dict:
+    return {
+        "job_id": row.id,
+        "status": row.status,
+        "title": row.title,
+        "progress": row.progress,
+        "duration_seconds": row.duration_seconds,
+        "created_at": row.created_at.isoformat() if row.created_at else None,
+        "completed_at": row.completed_at.isoformat() if row.completed_at else None,
+    }
+
+
+async def get_job_statuses(job_ids: List[str], user_id: int, db: AsyncSession) -> List[dict]:
+    """Status of many of the user's jobs in one primary-key query, without transcripts."""
+    if not job_ids:
+        return []
+    result = await db.execute(select(*STATUS_COLUMNS).where(
+        Job.id.in_(job_ids), Job.user_id == user_id
+    ))
+    return [_status_row(row) for row in result.all()]
+
+
+async def get_ongoing_job_statuses(user_id: int, db: AsyncSession) -> List[dict]:
+    result = await db.execute(select(*STATUS_COLUMNS).where(
+        Job.user_id == user_id, IS_ACTIVE
+    ))
+    return [_status_row(row) for row in result.all()]
+
+
+async def set_job_progress(job_id: str, progress: float):
+    """
+    Record progress (0..1) from inside a pipeline. Uses its own short session
+    so the pipeline's session (and its pending work) is left alone.
+    """
+    async with SessionLocal() as db:
+        job = await _load_job(job_id, db)
+        if job and job.status == "processing":
+            job.progress = progress
+            await db.commit()
+            await db.refresh(job)
+            await publish_job_event(job, db)
+
+
+def job_progress_reporter(job_id: str) -> Callable[[float], None]:
+    """
+    Progress callback for blocking pipeline code running in a thread: it
+    schedules set_job_progress on the event loop that created it.
+    """
+    loop = asyncio.get_running_loop()
+    return lambda progress: asyncio.run_coroutine_threadsafe(
+        set_job_progress(job_id, progress), loop)
+
+
+async def set_job_audio_info(job_id: str, duration_seconds: float, bitrate: int):
+    """Store the probed duration/bitrate of a job's input, in its own session like set_job_progress."""
+    async with SessionLocal() as db:
+        job = await _load_job(job_id, db)
+        if job:
+            job.duration_seconds = duration_seconds
+            job.bitrate = bitrate
+            await db.commit()
+            await db.refresh(job)
+            await publish_job_event(job, db)
+
+
+def job_audio_reporter(job_id: str) -> Callable[[float, int], None]:
+    """Like job_progress_reporter, for the ffprobe results of the job's audio."""
+    loop = asyncio.get_running_loop()
+    return lambda duration_seconds, bitrate: asyncio.run_coroutine_threadsafe(
+        set_job_audio_info(job_id, duration_seconds, bitrate), loop)
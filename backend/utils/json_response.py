@@ -0,0 +1,15 @@
+# backend/utils/json_response.py
+import orjson
+from starlette.responses import JSONResponse
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSONResponse rendered with orjson, for the large history listings:
+    several times faster than json.dumps, and datetimes serialize as ISO
+    8601 without conversion. Used instead of FastAPI's deprecated
+    ORJSONResponse.
+    """
+
+    def render(self, content) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
@@ -0,0 +1,42 @@
+# backend/utils/pagination.py
+import base64
+from datetime import datetime
+from typing import Optional, Tuple
+from sqlalchemy import tuple_
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+def encode_cursor(created_at: datetime, row_id: int) -> str:
+    raw = f"{created_at.isoformat()}|{row_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """Raises ValueError for anything that isn't a cursor we produced."""
+    padded = cursor + "=" * (-len(cursor) % 4)
+    created_at, row_id = base64.urlsafe_b64decode(
+        padded.encode()).decode().split("|")
+    return datetime.fromisoformat(created_at), int(row_id)
+
+
+async def keyset_page(db, stmt, created_col, id_col, cursor: Optional[str], limit: int, scalars: bool = False):
+    """
+    Newest-first page of the select `stmt` keyed on (created_at, id).
+    Returns (rows, next_cursor); next_cursor is None on the last page. Each
+    page is an index range scan, so cost does not grow with how deep the
+    client is. Set `scalars` when `stmt` selects a single ORM entity.
+    """
+    if cursor:
+        created_at, row_id = decode_cursor(cursor)
+        stmt = stmt.where(
+            tuple_(created_col, id_col) < tuple_(created_at, row_id))
+    result = await db.execute(
+        stmt.order_by(created_col.desc(), id_col.desc()).limit(limit + 1))
+    rows = result.scalars().all() if scalars else result.all()
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    last = rows[-1]
+    return rows, encode_cursor(last.created_at, last.id)
@@ -0,0 +1,65 @@
+# backend/utils/sections.py
+"""Token-bounded sections of a transcript, for map-reduce generation."""
+import re
+from typing import List, Optional
+from backend.utils.tokens import count_tokens
+
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+
+
+def _timestamp(seconds: float) -> str:
+    seconds = int(seconds)
+    return f"{seconds // 3600:02d}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}"
+
+
+def _pack(units: List[str], max_tokens: int, model: str) -> List[str]:
+    """Greedily join units (lines/sentences) into sections of at most max_tokens."""
+    sections, current, current_tokens = [], [], 0
+    for unit in units:
+        tokens = count_tokens(unit, model) + 1  # + the joining newline
+        if current and current_tokens + tokens > max_tokens:
+            sections.append("\n".join(current))
+            current, current_tokens = [], 0
+        if tokens > max_tokens:
+            # A single unit that doesn't fit on its own is cut by words
+            sections.extend(_split_words(unit, max_tokens, model))
+            continue
+        current.append(unit)
+        current_tokens += tokens
+    if current:
+        sections.append("\n".join(current))
+    return sections
+
+
+def _split_words(text: str, max_tokens: int, model: str) -> List[str]:
+    words = text.split()
+    # Start from the average density and shrink until each piece fits
+    per_piece = max(1, len(words) * max_tokens // max(1, count_tokens(text, model)))
+    pieces = []
+    start = 0
+    while start < len(words):
+        size = per_piece
+        while size > 1 and count_tokens(" ".join(words[start:start + size]), model) > max_tokens:
+            size = size * 3 // 4
+        pieces.append(" ".join(words[start:start + size]))
+        start += size
+    return pieces
+
+
+def split_transcript(
+    transcript: str,
+    segments: Optional[List[dict]],
+    max_tokens: int,
+    model: str = "gpt-4o"
+) -> List[str]:
+    """
+    Split a transcript into sections of at most `max_tokens`. With segments,
+    cuts only fall between Whisper segments and each line keeps its
+    [hh:mm:ss] start time; without them, between sentences.
+    """
+    if segments:
+        units = [f"[{_timestamp(segment['start'])}] {segment['text']}"
+                 for segment in segments if segment["text"]]
+    else:
+        units = [sentence for sentence in _SENTENCE_END.split(transcript) if sentence.strip()]
+    return _pack(units, max_tokens, model)
@@ -0,0 +1,60 @@
+# backend/utils/segments.py
+"""
+Compact transcript segments.
+
+Whisper's verbose_json segments carry tokens, logprobs, temperature and so
+on; we only ever use start, end and text. Segments are kept as a list of
+{"start", "end", "text"} dicts (seconds) inside the pipeline, stored as
+TranscriptSegment rows in milliseconds, and sent to clients column-wise:
+{"start": [...], "end": [...], "text": [...]}.
+"""
+import json
+from typing import Iterable, List, Optional
+
+
+def to_ms(seconds) -> int:
+    return int(round(float(seconds or 0.0) * 1000))
+
+
+def compact_segments(segments: Optional[Iterable[dict]]) -> List[dict]:
+    """Strip Whisper segments down to start/end/text, rounded to milliseconds."""
+    return [
+        {
+            "start": to_ms(segment.get("start")) / 1000,
+            "end": to_ms(segment.get("end")) / 1000,
+            "text": (segment.get("text") or "").strip(),
+        }
+        for segment in segments or ()
+    ]
+
+
+def to_columns(segments: Iterable[dict]) -> dict:
+    columns = {"start": [], "end": [], "text": []}
+    for segment in segments:
+        for key in columns:
+            columns[key].append(segment[key])
+    return columns
+
+
+def from_columns(columns: dict) -> List[dict]:
+    return [
+        {"start": start, "end": end, "text": text}
+        for start, end, text in zip(columns["start"], columns["end"], columns["text"])
+    ]
+
+
+def dumps_segments(segments: List[dict]) -> Optional[str]:
+    """Column-wise JSON, used where segments are kept as text (transcript cache)."""
+    if not segments:
+        return None
+    return json.dumps(to_columns(segments), separators=(",", ":"), ensure_ascii=False)
+
+
+def loads_segments(raw: Optional[str]) -> List[dict]:
+    """Parse stored segments, either column-wise or a legacy verbose_json list."""
+    if not raw:
+        return []
+    data = json.loads(raw)
+    if isinstance(data, dict):
+        return from_columns(data)
+    return compact_segments(data)
@@ -1,84 +1,305 @@
 # backend/utils/transcribe_utils.py
 import os
-import requests
+import re
 import subprocess
-from typing import List
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, List, NamedTuple, Optional, Tuple
 from backend.config import settings
-import shutil
+from backend.utils.audio_utils import (AudioInfo, SPEECH_EXTENSION, choose_split_points,
+                                      detect_silences, needs_conditioning,
+                                      precondition_audio, probe_audio)
+from backend.utils.transcription_backends import get_transcription_backend
+from backend.utils.workspace import Workspace, job_workspace
 import logging
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-MAX_SIZE = 25 * 1024 * 1024  # 25 MB
+# Process-wide cap on transcription requests in flight, shared by every job
+_whisper_slots = threading.BoundedSemaphore(settings.TRANSCRIBE_MAX_CONCURRENCY)
+
+# Stitching only compares words timed inside the chunks' overlap, give or
+# take this much (segment timestamps are coarse)
+STITCH_MARGIN_SECONDS = 1.5
+_WORD = re.compile(r"\w+", re.UNICODE)
+
+
+class ChunkSpan(NamedTuple):
+    start: float     # where the chunk's audio starts, overlap included
+    end: float
+    boundary: float  # where the previous chunk ends; start..boundary is overlap
 
 
 def transcribe_single_file(audio_file_path: str) -> dict:
-    api_key = settings.OPENAI_API_KEY
-    url = "https://api.openai.com/v1/audio/transcriptions"
-    headers = {"Authorization": f"Bearer {api_key}"}
-    data = {"model": "whisper-1", "response_format": "verbose_json"}
-    with open(audio_file_path, "rb") as f:
-        files = {"file": (os.path.basename(audio_file_path), f, "audio/mpeg")}
-        logger.info(
-            f"Sending {audio_file_path} to Whisper API with verbose_json")
-        response = requests.post(url, headers=headers, data=data, files=files)
-    if response.status_code != 200:
-        logger.error(
-            f"Whisper API error for {audio_file_path}: {response.status_code} - {response.text}")
-        raise ValueError(
-            f"Whisper API error {response.status_code}: {response.text}")
-    result = response.json()
-    # result now includes "text" and "segments"
+    """One file (or chunk) through the configured backend; returns {"text", "segments"}."""
+    return get_transcription_backend().transcribe(audio_file_path)
+
+
+def _normalize(word: str) -> str:
+    return "".join(_WORD.findall(word.lower()))
+
+
+def _word_refs(segments: List[dict]) -> List[Tuple[int, int, str, float]]:
+    """
+    (segment index, word index, normalized word, time) for every word, in
+    order. Segments only have start/end, so words are assumed to be spread
+    evenly over their segment.
+    """
+    refs = []
+    for s, segment in enumerate(segments):
+        words = segment.get("text", "").split()
+        start, end = segment.get("start", 0.0), segment.get("end", 0.0)
+        for w, word in enumerate(words):
+            refs.append((s, w, _normalize(word), start + (end - start) * (w + 0.5) / len(words)))
+    return refs
+
+
+def _longest_common_run(a: List[str], b: List[str]) -> Tuple[int, int, int]:
+    """(start in a, start in b, length) of the longest run of words found in both."""
+    best = (0, 0, 0)
+    lengths = [0] * (len(b) + 1)
+    for i in range(1, len(a) + 1):
+        previous = 0
+        for j in range(1, len(b) + 1):
+            current = lengths[j]
+            lengths[j] = previous + 1 if a[i - 1] and a[i - 1] == b[j - 1] else 0
+            if lengths[j] > best[2]:
+                best = (i - lengths[j], j - lengths[j], lengths[j])
+            previous = current
+    return best
+
+
+def _drop_words(segments: List[dict], drop: set) -> List[dict]:
+    """Remove (segment, word) positions; segments left without words disappear."""
+    kept = []
+    for s, segment in enumerate(segments):
+        words = segment.get("text", "").split()
+        remaining = [word for w, word in enumerate(words) if (s, w) not in drop]
+        if len(remaining) == len(words):
+            kept.append(segment)
+        elif remaining:
+            kept.append(dict(segment, text=" " + " ".join(remaining)))
+    return kept
+
+
+def stitch_segments(
+    previous: List[dict],
+    following: List[dict],
+    start: float,
+    boundary: float
+) -> Tuple[List[dict], List[dict]]:
+    """
+    Remove the words both chunks transcribed from their overlap, `start`
+    to `boundary` on the file's timeline. Only words timed inside it (plus
+    STITCH_MARGIN_SECONDS) are compared, so the match sits at the end of
+    `previous` and the start of `following`, never on a common phrase
+    further away. The longest shared run of at least two words is kept
+    once: anything after it in `previous` (often a word cut off by the
+    chunk end) and up to its end in `following` is dropped. With no shared
+    run, `following` loses the segments that end inside the overlap.
+    """
+    tail = [ref for ref in _word_refs(previous) if ref[3] >= start - STITCH_MARGIN_SECONDS]
+    head = [ref for ref in _word_refs(following) if ref[3] <= boundary + STITCH_MARGIN_SECONDS]
+    i, j, length = _longest_common_run([ref[2] for ref in tail], [ref[2] for ref in head])
+    if length >= 2:
+        previous = _drop_words(previous, {ref[:2] for ref in tail[i + length:]})
+        following = _drop_words(following, {ref[:2] for ref in head[:j + length]})
+        return previous, following
+    return previous, [s for s in following if s.get("end", 0.0) > boundary]
+
+
+def merge_chunk_results(results: List[dict], spans: List[ChunkSpan]) -> dict:
+    """
+    Merge per-chunk Whisper results in chunk order. Each chunk's segments
+    restart at 0, so start/end are shifted onto the file's timeline,
+    overlapping words are stitched away, and ids are renumbered to stay
+    unique across the whole file.
+    """
+    chunks = []
+    for result, span in zip(results, spans):
+        segments = [dict(segment,
+                         start=segment.get("start", 0.0) + span.start,
+                         end=segment.get("end", 0.0) + span.start)
+                    for segment in result.get("segments") or []]
+        if chunks and span.boundary > span.start:
+            chunks[-1], segments = stitch_segments(
+                chunks[-1], segments, span.start, span.boundary)
+        chunks.append(segments)
+
+    segments_all = []
+    transcripts = []
+    for result, segments in zip(results, chunks):
+        if result.get("segments"):
+            transcripts.append("".join(s.get("text", "") for s in segments).strip())
+        else:
+            transcripts.append(result.get("text", "").strip())
+        for segment in segments:
+            segments_all.append(dict(segment, id=len(segments_all)))
+    return {"text": " ".join(t for t in transcripts if t), "segments": segments_all}
+
+
+def _shift_segments(result: dict, offset: float) -> dict:
+    """Move timestamps back onto the original file's timeline after trimming."""
+    if offset:
+        for segment in result.get("segments") or []:
+            segment["start"] = segment.get("start", 0.0) + offset
+            segment["end"] = segment.get("end", 0.0) + offset
     return result
 
 
-def transcribe_audio_with_whisper(audio_file_path: str) -> dict:
+def _report_audio_info(callback, info: AudioInfo):
+    if callback:
+        try:
+            callback(info.duration, info.bitrate)
+        except Exception as e:
+            logger.warning(f"Audio info callback failed: {e}")
+
+
+def transcribe_audio_with_whisper(
+    audio_file_path: str,
+    progress_callback: Optional[Callable[[float], None]] = None,
+    audio_info_callback: Optional[Callable[[float, int], None]] = None,
+    workspace: Optional[Workspace] = None
+) -> dict:
+    """
+    Transcribe a file of any size. The input is probed and, with
+    AUDIO_PRECONDITION, re-encoded to compact mono speech audio first, so
+    most files fit in a single request. `progress_callback`, if given, is
+    called with the fraction of chunks finished each time a chunk
+    completes; `audio_info_callback` with (duration, bitrate) from ffprobe.
+    Intermediate files go to `workspace` (a temporary one if not given).
+    """
+    if workspace is None:
+        with job_workspace(input_bytes=os.path.getsize(audio_file_path)) as workspace:
+            return transcribe_audio_with_whisper(
+                audio_file_path, progress_callback, audio_info_callback, workspace)
+
+    info = probe_audio(audio_file_path)
+    _report_audio_info(audio_info_callback, info)
+
+    offset = 0.0
+    source_path = audio_file_path
+    max_file_bytes = get_transcription_backend().max_file_bytes
+    if settings.AUDIO_PRECONDITION and needs_conditioning(info, max_file_bytes):
+        source_path, offset = precondition_audio(audio_file_path, workspace.path, info)
+        workspace.check()
+    return _shift_segments(_transcribe_file(source_path, workspace, progress_callback), offset)
+
+
+def _transcribe_file(
+    audio_file_path: str,
+    workspace: Workspace,
+    progress_callback: Optional[Callable[[float], None]] = None
+) -> dict:
+    """One request if the backend takes the whole file, otherwise parallel chunks."""
+    backend = get_transcription_backend()
     file_size = os.path.getsize(audio_file_path)
-    if file_size <= MAX_SIZE:
-        return transcribe_single_file(audio_file_path)
-    else:
-        chunk_paths = split_audio_file(audio_file_path, segment_duration=300)
-        transcripts = []
-        segments_all = []
-        for chunk in chunk_paths:
-            result = transcribe_single_file(chunk)
-            transcripts.append(result.get("text", ""))
-            if "segments" in result:
-                segments_all.extend(result["segments"])
-        chunk_dir = os.path.dirname(chunk_paths[0])
-        shutil.rmtree(chunk_dir, ignore_errors=True)
-        return {"text": "\n".join(transcripts), "segments": segments_all}
-
-
-def split_audio_file(audio_file_path: str, segment_duration: int) -> List[str]:
-    output_dir = os.path.join(os.path.dirname(audio_file_path), "chunks")
-    os.makedirs(output_dir, exist_ok=True)
-    base_name = os.path.splitext(os.path.basename(audio_file_path))[0]
-    output_pattern = os.path.join(output_dir, f"{base_name}_chunk_%03d.mp3")
+    if backend.max_file_bytes is None or file_size <= backend.max_file_bytes:
+        with _whisper_slots:
+            return backend.transcribe(audio_file_path, progress_callback)
+
+    duration = probe_audio(audio_file_path).duration
+    if not duration:
+        raise RuntimeError(f"Could not read the duration of {audio_file_path}")
+    # Longest chunk that still fits the backend's limit, with room for
+    # the tolerance window and the overlap
+    fits = backend.max_file_bytes * 0.9 / (file_size / duration)
+    target = min(settings.CHUNK_TARGET_SECONDS,
+                 fits - settings.CHUNK_SPLIT_TOLERANCE_SECONDS - settings.CHUNK_OVERLAP_SECONDS)
+    spans = silence_aware_chunks(audio_file_path, duration, target)
+    return transcribe_chunks(audio_file_path, spans, workspace, progress_callback)
+
+
+def plan_chunks(duration: float, split_points: List[float], overlap: float) -> List[ChunkSpan]:
+    """Chunks between consecutive split points, each reaching `overlap` seconds into the one before."""
+    edges = [0.0] + list(split_points) + [duration]
+    return [ChunkSpan(start=max(0.0, edges[i] - overlap) if i else 0.0,
+                      end=edges[i + 1], boundary=edges[i])
+            for i in range(len(edges) - 1)]
+
 
+def fixed_chunks(duration: float, segment_duration: float) -> List[ChunkSpan]:
+    """Back-to-back chunks every `segment_duration` seconds, no overlap (the old split)."""
+    points = [t * segment_duration for t in range(1, int(duration // segment_duration) + 1)
+              if t * segment_duration < duration]
+    return plan_chunks(duration, points, overlap=0.0)
+
+
+def silence_aware_chunks(audio_file_path: str, duration: float, target_seconds: float) -> List[ChunkSpan]:
+    """Balanced chunks cut at pauses (see choose_split_points), overlapping by CHUNK_OVERLAP_SECONDS."""
+    silences = detect_silences(audio_file_path)
+    points = choose_split_points(duration, silences, target_seconds,
+                                 settings.CHUNK_SPLIT_TOLERANCE_SECONDS)
+    logger.info(
+        f"Splitting {audio_file_path} ({duration:.0f}s) at {len(points)} points "
+        f"from {len(silences)} pauses")
+    return plan_chunks(duration, points, settings.CHUNK_OVERLAP_SECONDS)
+
+
+def cut_chunk(audio_file_path: str, output_dir: str, index: int, span: ChunkSpan) -> str:
+    """
+    Write span.start..span.end to its own file: conditioned speech audio is
+    copied without re-encoding, anything else is encoded to mp3.
+    """
+    base_name = os.path.splitext(os.path.basename(audio_file_path))[0]
+    if audio_file_path.endswith(SPEECH_EXTENSION):
+        extension, codec = SPEECH_EXTENSION, ["-c:a", "copy"]
+    else:
+        extension, codec = ".mp3", ["-acodec", "mp3"]
+    output_path = os.path.join(output_dir, f"{base_name}_chunk_{index:03d}{extension}")
     command = [
-        "ffmpeg",
+        "ffmpeg", "-y", "-hide_banner",
+        "-ss", f"{span.start:.3f}",
         "-i", audio_file_path,
+        "-t", f"{span.end - span.start:.3f}",
         "-vn",
-        "-acodec", "mp3",
-        "-f", "segment",
-        "-segment_time", str(segment_duration),
-        output_pattern
+        *codec,
+        output_path
     ]
-    logger.info(f"Splitting {audio_file_path} into chunks")
     try:
         subprocess.run(command, check=True, stderr=subprocess.PIPE, text=True)
     except subprocess.CalledProcessError as e:
-        logger.error(f"FFmpeg error splitting {audio_file_path}: {e.stderr}")
+        logger.error(f"FFmpeg error cutting chunk {index} of {audio_file_path}: {e.stderr}")
         raise RuntimeError(f"FFmpeg failed: {e.stderr}")
+    return output_path
+
+
+def _transcribe_chunk(audio_file_path: str, workspace: Workspace, index: int, span: ChunkSpan) -> dict:
+    """Cut one chunk, then transcribe it while holding a global transcription slot."""
+    chunk_path = cut_chunk(audio_file_path, workspace.subdir("chunks"), index, span)
+    try:
+        workspace.check()
+        with _whisper_slots:
+            return transcribe_single_file(chunk_path)
+    finally:
+        os.remove(chunk_path)
+
 
-    chunk_files = sorted(
-        [os.path.join(output_dir, f) for f in os.listdir(output_dir)
-         if f.startswith(f"{base_name}_chunk_") and f.endswith(".mp3")]
-    )
-    if not chunk_files:
-        logger.error(f"No chunks generated for {audio_file_path}")
-        raise RuntimeError("No chunks generated by FFmpeg")
-    logger.info(f"Generated {len(chunk_files)} chunks for {audio_file_path}")
-    return chunk_files
+def transcribe_chunks(
+    audio_file_path: str,
+    spans: List[ChunkSpan],
+    workspace: Workspace,
+    progress_callback: Optional[Callable[[float], None]] = None
+) -> dict:
+    """
+    Transcribe `spans` of the file in parallel and stitch the results.
+    Chunks are cut inside the worker threads, so the first uploads start
+    while later chunks are still being cut; each is deleted once sent.
+    """
+    workers = max(1, min(settings.TRANSCRIBE_MAX_WORKERS, len(spans)))
+    logger.info(
+        f"Transcribing {len(spans)} chunks of {audio_file_path} with {workers} workers")
+    results = [None] * len(spans)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(_transcribe_chunk, audio_file_path, workspace, index, span): index
+                   for index, span in enumerate(spans)}
+        for done, future in enumerate(as_completed(futures), start=1):
+            # Slot by index so results line up with spans
+            results[futures[future]] = future.result()
+            if progress_callback:
+                try:
+                    progress_callback(done / len(spans))
+                except Exception as e:
+                    logger.warning(f"Progress callback failed: {e}")
+    return merge_chunk_results(results, spans)
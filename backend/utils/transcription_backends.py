@@ -0,0 +1,178 @@
+# backend/utils/transcription_backends.py
+"""
+Speech-to-text engines behind one interface, picked by TRANSCRIPTION_BACKEND:
+
+- "openai": the Whisper API (default)
+- "local":  faster-whisper on the CPU with an int8 model from
+            LOCAL_WHISPER_MODEL_PATH, loaded once per process
+- "fake":   deterministic output without network or model, for load tests
+
+Every backend returns {"text": str, "segments": [{"id", "start", "end", "text"}]}.
+"""
+import hashlib
+import mimetypes
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Callable, List, Optional
+from backend.config import settings
+from backend.utils.audio_utils import probe_audio
+from backend.utils.http_client import UpstreamError, request_with_retries
+import logging
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+ProgressCallback = Optional[Callable[[float], None]]
+
+
+def _segment(index: int, start: float, end: float, text: str) -> dict:
+    return {"id": index, "start": float(start), "end": float(end), "text": text}
+
+
+class TranscriptionBackend(ABC):
+    name: str = ""
+    # Largest file transcribe() accepts; bigger files are split into chunks
+    # first. None means any length is fine.
+    max_file_bytes: Optional[int] = None
+
+    @abstractmethod
+    def transcribe(self, audio_file_path: str, progress_callback: ProgressCallback = None) -> dict:
+        """Blocking; returns {"text", "segments"}."""
+
+
+class OpenAIWhisperBackend(TranscriptionBackend):
+    name = "openai"
+    max_file_bytes = 25 * 1024 * 1024  # API upload limit
+
+    def transcribe(self, audio_file_path: str, progress_callback: ProgressCallback = None) -> dict:
+        url = f"{settings.OPENAI_BASE_URL}/audio/transcriptions"
+        headers = {"Authorization": f"Bearer {settings.OPENAI_API_KEY}"}
+        data = {"model": "whisper-1", "response_format": "verbose_json"}
+        # Read once (<= max_file_bytes) so a retry can resend the same body
+        with open(audio_file_path, "rb") as f:
+            audio = f.read()
+        mime_type = mimetypes.guess_type(audio_file_path)[0] or "application/octet-stream"
+        files = {"file": (os.path.basename(audio_file_path), audio, mime_type)}
+        logger.info(
+            f"Sending {audio_file_path} to Whisper API with verbose_json")
+        try:
+            response = request_with_retries(
+                "POST", url, settings.WHISPER_DEADLINE_SECONDS,
+                headers=headers, data=data, files=files)
+        except UpstreamError as e:
+            logger.error(f"Whisper API error for {audio_file_path}: {e}")
+            raise ValueError(f"Whisper API error: {e}")
+        result = response.json()
+        return {
+            "text": result.get("text", ""),
+            "segments": [
+                _segment(i, segment.get("start", 0.0), segment.get("end", 0.0),
+                         segment.get("text", ""))
+                for i, segment in enumerate(result.get("segments") or [])
+            ],
+        }
+
+
+class LocalWhisperBackend(TranscriptionBackend):
+    """faster-whisper (CTranslate2) with int8 weights; no network, no per-minute cost."""
+    name = "local"
+
+    def __init__(self):
+        self._model = None
+        self._load_lock = threading.Lock()
+
+    def load(self):
+        """Load the model once; later calls return the same instance."""
+        with self._load_lock:
+            if self._model is None:
+                try:
+                    from faster_whisper import WhisperModel
+                except ImportError:
+                    raise RuntimeError(
+                        "TRANSCRIPTION_BACKEND=local needs the faster-whisper package")
+                if not settings.LOCAL_WHISPER_MODEL_PATH:
+                    raise RuntimeError("LOCAL_WHISPER_MODEL_PATH is not set")
+                logger.info(
+                    f"Loading local Whisper model from {settings.LOCAL_WHISPER_MODEL_PATH}")
+                self._model = WhisperModel(
+                    settings.LOCAL_WHISPER_MODEL_PATH,
+                    device="cpu",
+                    compute_type="int8",
+                    cpu_threads=settings.LOCAL_WHISPER_CPU_THREADS,
+                    num_workers=settings.LOCAL_WHISPER_WORKERS,
+                    local_files_only=True,
+                )
+            return self._model
+
+    def transcribe(self, audio_file_path: str, progress_callback: ProgressCallback = None) -> dict:
+        model = self.load()
+        segments_iter, info = model.transcribe(audio_file_path, vad_filter=True)
+        segments: List[dict] = []
+        # Segments are decoded lazily, so progress can follow the audio position
+        for i, segment in enumerate(segments_iter):
+            segments.append(_segment(i, segment.start, segment.end, segment.text))
+            if progress_callback and info.duration:
+                try:
+                    progress_callback(min(segment.end / info.duration, 1.0))
+                except Exception as e:
+                    logger.warning(f"Progress callback failed: {e}")
+        return {"text": "".join(s["text"] for s in segments).strip(), "segments": segments}
+
+
+class FakeBackend(TranscriptionBackend):
+    """
+    Same input, same output: segments every FAKE_SEGMENT_SECONDS over the
+    probed duration (estimated from the file size without ffprobe). Keeps the API's size limit so
+    the chunking path is exercised too.
+    """
+    name = "fake"
+    max_file_bytes = OpenAIWhisperBackend.max_file_bytes
+    # 128 kbit/s, the bitrate of our mp3 chunks
+    BYTES_PER_SECOND = 16000
+    FAKE_SEGMENT_SECONDS = 5.0
+
+    def transcribe(self, audio_file_path: str, progress_callback: ProgressCallback = None) -> dict:
+        try:
+            duration = max(probe_audio(audio_file_path).duration or 0.0, 1.0)
+        except (OSError, RuntimeError):
+            # No ffprobe: estimate from the size
+            duration = max(os.path.getsize(audio_file_path) / self.BYTES_PER_SECOND, 1.0)
+        latency = (settings.FAKE_TRANSCRIBE_LATENCY_SECONDS
+                   + duration * settings.FAKE_TRANSCRIBE_REALTIME_FACTOR)
+        if latency:
+            time.sleep(latency)
+        with open(audio_file_path, "rb") as f:
+            tag = hashlib.sha256(f.read(65536)).hexdigest()[:8]
+        segments = []
+        start = 0.0
+        while start < duration:
+            end = min(start + self.FAKE_SEGMENT_SECONDS, duration)
+            segments.append(_segment(
+                len(segments), start, end, f" Segment {len(segments) + 1} of {tag}."))
+            start = end
+        return {"text": "".join(s["text"] for s in segments).strip(), "segments": segments}
+
+
+BACKENDS = {
+    "openai": OpenAIWhisperBackend,
+    "local": LocalWhisperBackend,
+    "fake": FakeBackend,
+}
+
+_backend: Optional[TranscriptionBackend] = None
+_backend_lock = threading.Lock()
+
+
+def get_transcription_backend() -> TranscriptionBackend:
+    """The process-wide backend chosen by TRANSCRIPTION_BACKEND."""
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            name = settings.TRANSCRIPTION_BACKEND
+            if name not in BACKENDS:
+                raise ValueError(
+                    f"Unknown TRANSCRIPTION_BACKEND '{name}' (expected one of {', '.join(BACKENDS)})")
+            _backend = BACKENDS[name]()
+        return _backend
@@ -0,0 +1,236 @@
+# backend/utils/upload_utils.py
+import os
+import json
+import time
+import uuid
+import fcntl
+import hashlib
+import tempfile
+from contextlib import contextmanager
+from typing import Awaitable, BinaryIO, Callable, Iterator, Optional, Tuple
+from starlette.concurrency import run_in_threadpool
+
+CHUNK_SIZE = 1024 * 1024  # 1 MB
+
+
+class UploadTooLarge(Exception):
+    """Raised as soon as an upload goes past the allowed number of bytes."""
+
+
+class UploadConflict(Exception):
+    """A resumable upload is busy or at another offset; `offset` is its current size."""
+
+    def __init__(self, message: str, offset: int):
+        super().__init__(message)
+        self.offset = offset
+
+
+def content_addressed_path(upload_dir: str, digest: str, ext: str) -> str:
+    """uploads/ab/abcdef....mp3 -- the two-char fan-out keeps directories small."""
+    return os.path.join(upload_dir, digest[:2], f"{digest}{ext.lower()}")
+
+
+def _move_to_content_path(tmp_path: str, digest: str, ext: str, upload_dir: str) -> str:
+    final_path = content_addressed_path(upload_dir, digest, ext)
+    os.makedirs(os.path.dirname(final_path), exist_ok=True)
+    if os.path.exists(final_path):
+        os.remove(tmp_path)
+    else:
+        os.replace(tmp_path, final_path)
+    return final_path
+
+
+async def store_upload(
+    read_chunk: Callable[[int], Awaitable[bytes]],
+    ext: str,
+    upload_dir: str,
+    max_bytes: int
+) -> Tuple[str, str]:
+    """
+    Stream an upload to disk in CHUNK_SIZE pieces, hashing and counting
+    bytes as they arrive, and move it to its content-addressed path.
+    Disk writes run in the threadpool so the event loop is never blocked.
+    Raises UploadTooLarge (and discards the partial file) once `max_bytes`
+    is exceeded. Returns (file_path, sha256_hex).
+    """
+    os.makedirs(upload_dir, exist_ok=True)
+    hasher = hashlib.sha256()
+    received = 0
+    fd, tmp_path = tempfile.mkstemp(dir=upload_dir, suffix=".part")
+    buffer = os.fdopen(fd, "wb")
+    try:
+        while True:
+            chunk = await read_chunk(CHUNK_SIZE)
+            if not chunk:
+                break
+            received += len(chunk)
+            if received > max_bytes:
+                raise UploadTooLarge(
+                    f"Upload exceeds the {max_bytes} byte limit")
+            hasher.update(chunk)
+            await run_in_threadpool(buffer.write, chunk)
+        await run_in_threadpool(buffer.close)
+    except BaseException:
+        buffer.close()
+        os.remove(tmp_path)
+        raise
+
+    digest = hasher.hexdigest()
+    final_path = await run_in_threadpool(
+        _move_to_content_path, tmp_path, digest, ext, upload_dir)
+    return final_path, digest
+
+
+# --- Resumable uploads -------------------------------------------------------
+# Offset-based protocol in the spirit of tus: a session is created with the
+# total length, bytes are appended with PATCH at the current offset, and the
+# offset is simply the size of the partial file, so it survives restarts.
+# Sessions live in their own directory, outside the publicly served uploads.
+
+def _partial_paths(session_dir: str, upload_id: str) -> Tuple[str, str]:
+    return (os.path.join(session_dir, f"{upload_id}.part"),
+            os.path.join(session_dir, f"{upload_id}.json"))
+
+
+def create_upload_session(session_dir: str, user_id: int, filename: str, length: int) -> str:
+    upload_id = uuid.uuid4().hex
+    data_path, meta_path = _partial_paths(session_dir, upload_id)
+    os.makedirs(session_dir, exist_ok=True)
+    open(data_path, "wb").close()
+    with open(meta_path, "w") as f:
+        json.dump({"user_id": user_id, "filename": filename,
+                  "length": length}, f)
+    return upload_id
+
+
+def load_upload_session(session_dir: str, upload_id: str) -> Optional[dict]:
+    """Returns the session metadata plus its current `offset`, or None."""
+    if not all(c in "0123456789abcdef" for c in upload_id):
+        return None
+    data_path, meta_path = _partial_paths(session_dir, upload_id)
+    if not os.path.exists(meta_path) or not os.path.exists(data_path):
+        return None
+    with open(meta_path) as f:
+        session = json.load(f)
+    session["offset"] = os.path.getsize(data_path)
+    return session
+
+
+def reserved_upload_bytes(session_dir: str, user_id: int, ttl_seconds: float) -> int:
+    """
+    Declared length of the user's open sessions. Sessions untouched for
+    `ttl_seconds` are abandoned: they are discarded instead of counted.
+    """
+    if not os.path.isdir(session_dir):
+        return 0
+    reserved = 0
+    now = time.time()
+    for name in os.listdir(session_dir):
+        upload_id, ext = os.path.splitext(name)
+        if ext != ".json":
+            continue
+        data_path, meta_path = _partial_paths(session_dir, upload_id)
+        try:
+            touched = max(os.path.getmtime(data_path), os.path.getmtime(meta_path))
+            if now - touched > ttl_seconds:
+                discard_upload_session(session_dir, upload_id)
+                continue
+            with open(meta_path) as f:
+                session = json.load(f)
+        except (OSError, ValueError):
+            # Finished or discarded while we looked
+            continue
+        if session.get("user_id") == user_id:
+            reserved += session.get("length", 0)
+    return reserved
+
+
+@contextmanager
+def locked_upload_session(session_dir: str, upload_id: str, offset: Optional[int] = None) -> Iterator[BinaryIO]:
+    """
+    The session's partial file, opened for appending under an exclusive
+    flock held until the block exits, so one request at a time appends
+    (and finishes, or discards) a session, across processes too. The size
+    is checked against `offset`, if given, once the lock is held. Raises UploadConflict if
+    another request holds the lock or the offset is stale, and
+    FileNotFoundError if the session is gone.
+    """
+    data_path, meta_path = _partial_paths(session_dir, upload_id)
+    # No O_CREAT: a session finished or discarded meanwhile stays gone
+    buffer = os.fdopen(os.open(data_path, os.O_WRONLY | os.O_APPEND), "ab")
+    try:
+        try:
+            fcntl.flock(buffer.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            raise UploadConflict("Another request is appending to this upload",
+                                 os.fstat(buffer.fileno()).st_size)
+        size = os.fstat(buffer.fileno()).st_size
+        if not os.path.exists(meta_path):
+            raise FileNotFoundError(meta_path)
+        if offset is not None and size != offset:
+            raise UploadConflict("Upload-Offset mismatch", size)
+        yield buffer
+    finally:
+        buffer.close()
+
+
+async def append_to_upload_session(
+    buffer: BinaryIO,
+    offset: int,
+    length: int,
+    body
+) -> int:
+    """
+    Append the request body stream at `offset` to a session opened with
+    locked_upload_session. Bytes that made it to disk before a dropped
+    connection are kept, so the client can resume from the returned
+    offset. Raises UploadTooLarge if the body runs past the declared length.
+    """
+    written = offset
+    try:
+        async for chunk in body:
+            if not chunk:
+                continue
+            if written + len(chunk) > length:
+                raise UploadTooLarge("Upload body exceeds the declared length")
+            await run_in_threadpool(buffer.write, chunk)
+            written += len(chunk)
+    except UploadTooLarge:
+        await run_in_threadpool(buffer.flush)
+        await run_in_threadpool(os.ftruncate, buffer.fileno(), offset)
+        raise
+    finally:
+        await run_in_threadpool(buffer.flush)
+    return written
+
+
+def _hash_file(path: str) -> str:
+    hasher = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+async def finish_upload_session(
+    session_dir: str,
+    upload_id: str,
+    ext: str,
+    upload_dir: str
+) -> Tuple[str, str]:
+    """
+    Hash the completed file, move it to its content-addressed path under
+    `upload_dir` and drop the session. Call it inside locked_upload_session.
+    """
+    data_path, meta_path = _partial_paths(session_dir, upload_id)
+    digest = await run_in_threadpool(_hash_file, data_path)
+    final_path = await run_in_threadpool(
+        _move_to_content_path, data_path, digest, ext, upload_dir)
+    await run_in_threadpool(os.remove, meta_path)
+    return final_path, digest
+
+
+def discard_upload_session(session_dir: str, upload_id: str):
+    for path in _partial_paths(session_dir, upload_id):
+        if os.path.exists(path):
+            os.remove(path)
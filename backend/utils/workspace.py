@@ -0,0 +1,212 @@
+# backend/utils/workspace.py
+"""
+Per-job scratch directories for intermediate files (YouTube downloads,
+conditioned audio, chunks). Each job gets its own directory under
+SCRATCH_DIR -- /dev/shm by default, so intermediates never touch the disk
+-- which is removed when the job ends, whether it succeeded or not. A job
+whose input won't fit in what that filesystem has free gets a directory
+under the system temp dir instead.
+
+A workspace holds an flock on its `.lock` file while in use. A directory
+whose lock can be taken belongs to a process that died, and
+cleanup_orphan_workspaces() removes it; this is safe with several web and
+worker processes sharing the same SCRATCH_DIR.
+"""
+import fcntl
+import os
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Optional
+from backend.config import settings
+import logging
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+LOCK_NAME = ".lock"
+# Directories without `.lock` younger than this may still be getting it
+_CREATE_GRACE_SECONDS = 60
+# A job needs about this many times its input in scratch space: the
+# input or download, its conditioned copy and the chunks in flight
+_SPACE_FACTOR = 3
+# The global quota check re-walks the scratch root at most this often
+_ROOT_USAGE_TTL_SECONDS = 5.0
+
+_root_usage_cache = {}  # root -> (measured at, bytes)
+_root_usage_lock = threading.Lock()
+
+
+class WorkspaceQuotaExceeded(Exception):
+    """A job's intermediates went past WORKSPACE_MAX_BYTES or SCRATCH_MAX_BYTES."""
+
+
+def _disk_root() -> str:
+    return os.path.join(tempfile.gettempdir(), "stt-scratch")
+
+
+def scratch_root(needed_bytes: int = 0) -> str:
+    """
+    SCRATCH_DIR, else /dev/shm/stt-scratch when available; the disk-backed
+    temp dir instead when that filesystem has less than `needed_bytes` free.
+    """
+    if settings.SCRATCH_DIR:
+        root = settings.SCRATCH_DIR
+    elif os.path.isdir("/dev/shm"):
+        root = os.path.join("/dev/shm", "stt-scratch")
+    else:
+        root = _disk_root()
+    if needed_bytes and root != _disk_root():
+        existing = root if os.path.isdir(root) else os.path.dirname(root)
+        free = shutil.disk_usage(existing).free
+        if free < needed_bytes:
+            logger.warning(f"Only {free} bytes free in {root}, {needed_bytes} needed; "
+                           f"using {_disk_root()}")
+            return _disk_root()
+    return root
+
+
+def _tree_bytes(path: str) -> int:
+    total = 0
+    for directory, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.lstat(os.path.join(directory, name)).st_size
+            except FileNotFoundError:
+                pass  # removed while we walked
+    return total
+
+
+def _root_usage(root: str) -> int:
+    """_tree_bytes(root), measured at most every _ROOT_USAGE_TTL_SECONDS across all jobs."""
+    now = time.monotonic()
+    with _root_usage_lock:
+        cached = _root_usage_cache.get(root)
+        if cached and now - cached[0] < _ROOT_USAGE_TTL_SECONDS:
+            return cached[1]
+    total = _tree_bytes(root)
+    with _root_usage_lock:
+        _root_usage_cache[root] = (now, total)
+    return total
+
+
+class Workspace:
+    def __init__(self, path: str, max_bytes: int):
+        self.path = path
+        self.root = os.path.dirname(path)
+        self.max_bytes = max_bytes
+
+    def file(self, name: str) -> str:
+        return os.path.join(self.path, name)
+
+    def subdir(self, name: str) -> str:
+        path = os.path.join(self.path, name)
+        os.makedirs(path, exist_ok=True)
+        return path
+
+    def usage(self) -> int:
+        return _tree_bytes(self.path)
+
+    def remaining(self) -> int:
+        """Bytes this job may still write: both quotas and the filesystem's free space."""
+        return min(self.max_bytes - self.usage(),
+                   settings.SCRATCH_MAX_BYTES - _root_usage(self.root),
+                   shutil.disk_usage(self.path).free)
+
+    def check(self):
+        """
+        Raise WorkspaceQuotaExceeded if a write has taken us over either
+        quota. The global total may be up to _ROOT_USAGE_TTL_SECONDS old.
+        """
+        used = self.usage()
+        if used > self.max_bytes:
+            raise WorkspaceQuotaExceeded(
+                f"Job scratch space exceeded: {used} of {self.max_bytes} bytes")
+        total = _root_usage(self.root)
+        if total > settings.SCRATCH_MAX_BYTES:
+            raise WorkspaceQuotaExceeded(
+                f"Scratch space exceeded: {total} of {settings.SCRATCH_MAX_BYTES} bytes")
+
+
+@contextmanager
+def job_workspace(job_id: Optional[str] = None, input_bytes: int = 0):
+    """
+    Yields a fresh Workspace for one job and always removes it afterwards.
+    `input_bytes` sizes the free-space check; unknown (0) assumes the job
+    may use its whole quota.
+    """
+    needed = settings.WORKSPACE_MAX_BYTES
+    if input_bytes:
+        needed = min(needed, input_bytes * _SPACE_FACTOR)
+    root = scratch_root(needed)
+    os.makedirs(root, exist_ok=True)
+    # Unique even when the same job is retried by another worker
+    path = os.path.join(root, f"{job_id or 'job'}-{uuid.uuid4().hex[:8]}")
+    os.makedirs(path)
+    # Locked under a private name first: once `.lock` appears it is already
+    # held, so cleanup in another process can't take it in between
+    pending = os.path.join(path, f"{LOCK_NAME}-{uuid.uuid4().hex[:8]}")
+    lock = open(pending, "x")
+    try:
+        fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        os.rename(pending, os.path.join(path, LOCK_NAME))
+        yield Workspace(path, settings.WORKSPACE_MAX_BYTES)
+    finally:
+        lock.close()
+        shutil.rmtree(path, ignore_errors=True)
+
+
+def _is_orphan(path: str) -> bool:
+    try:
+        lock = open(os.path.join(path, LOCK_NAME))
+    except FileNotFoundError:
+        return time.time() - os.path.getmtime(path) > _CREATE_GRACE_SECONDS
+    with lock:
+        try:
+            fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            return False  # a live process holds it
+        return True
+
+
+def cleanup_orphan_workspaces() -> int:
+    """Remove workspaces left behind by crashed processes; returns how many."""
+    removed = 0
+    # The disk-backed fallback too
+    for root in {scratch_root(), _disk_root()}:
+        if not os.path.isdir(root):
+            continue
+        for name in os.listdir(root):
+            path = os.path.join(root, name)
+            try:
+                if os.path.isdir(path) and _is_orphan(path):
+                    shutil.rmtree(path, ignore_errors=True)
+                    removed += 1
+            except OSError as e:
+                logger.warning(f"Could not check workspace {path}: {e}")
+    if removed:
+        logger.info(f"Removed {removed} orphaned workspaces")
+    return removed
+
+
+def workspace_stats() -> dict:
+    """Scratch usage for monitoring: live workspaces, bytes used, quotas and free space."""
+    root = scratch_root()
+    workspaces = 0
+    if os.path.isdir(root):
+        workspaces = sum(1 for entry in os.scandir(root) if entry.is_dir())
+    stats = {
+        "root": root,
+        "workspaces": workspaces,
+        "bytes_used": _tree_bytes(root) if workspaces else 0,
+        "max_bytes": settings.SCRATCH_MAX_BYTES,
+        "job_max_bytes": settings.WORKSPACE_MAX_BYTES,
+    }
+    if os.path.isdir(root):
+        usage = shutil.disk_usage(root)
+        stats.update({"filesystem_total_bytes": usage.total,
+                      "filesystem_free_bytes": usage.free})
+    return stats
@@ -2,8 +2,15 @@
 import os
 import re
 import yt_dlp
+from typing import Optional, Tuple
+from urllib.parse import urlparse, parse_qs
 from backend.config import settings
 
+_VIDEO_ID_RE = re.compile(r'^[A-Za-z0-9_-]{11}$')
+_YOUTUBE_HOSTS = {"youtube.com", "www.youtube.com", "m.youtube.com",
+                  "music.youtube.com", "youtube-nocookie.com",
+                  "www.youtube-nocookie.com"}
+
 
 def sanitize_filename(filename: str) -> str:
     """
@@ -13,60 +20,86 @@ def sanitize_filename(filename: str) -> str:
     return re.sub(r'[^a-zA-Z0-9_-]', '_', filename).strip('_')
 
 
-def download_youtube_audio(youtube_url: str, output_path: str = "downloads") -> str:
+def extract_youtube_id(youtube_url: str) -> Optional[str]:
+    """
+    Returns the canonical 11-character video ID for the common YouTube URL
+    shapes (watch?v=, youtu.be/, /shorts/, /embed/, /live/, /v/), or None
+    when the URL is not a recognisable YouTube video link.
+    """
+    url = youtube_url.strip()
+    if _VIDEO_ID_RE.match(url):
+        return url
+    if "://" not in url:
+        url = f"https://{url}"
+    parsed = urlparse(url)
+    host = (parsed.hostname or "").lower()
+    path_parts = [p for p in parsed.path.split("/") if p]
+
+    candidate = None
+    if host in ("youtu.be", "www.youtu.be"):
+        candidate = path_parts[0] if path_parts else None
+    elif host in _YOUTUBE_HOSTS:
+        if parsed.path == "/watch":
+            candidate = parse_qs(parsed.query).get("v", [None])[0]
+        elif len(path_parts) >= 2 and path_parts[0] in ("shorts", "embed", "live", "v"):
+            candidate = path_parts[1]
+
+    if candidate and _VIDEO_ID_RE.match(candidate):
+        return candidate
+    return None
+
+
+def canonical_youtube_url(video_id: str) -> str:
+    return f"https://www.youtube.com/watch?v={video_id}"
+
+
+def fetch_youtube_info(youtube_url: str) -> dict:
+    """yt-dlp metadata (title, duration, language, subtitle tracks) without downloading."""
+    with yt_dlp.YoutubeDL({"quiet": True, "noplaylist": True}) as ydl:
+        return ydl.extract_info(youtube_url, download=False)
+
+
+def download_caption_track(track: dict) -> str:
+    """Text of a subtitle track picked by pick_caption_track, fetched through yt-dlp's opener."""
+    with yt_dlp.YoutubeDL({"quiet": True}) as ydl:
+        return ydl.urlopen(track["url"]).read().decode("utf-8")
+
+
+def download_youtube_audio(youtube_url: str, output_path: str = "downloads", max_filesize: int = None) -> Tuple[str, str]:
     """
-    Downloads the YouTube audio as an MP3 using yt-dlp, ensuring the final file
-    has a proper `.mp3` extension (rather than `_mp3`). Returns the full path to the
-    downloaded .mp3 file.
+    Downloads the smallest audio-only format of at least
+    YOUTUBE_MIN_AUDIO_KBPS (Opus preferred, then AAC), kept in its native
+    container -- no mp3 transcode, the transcription stage reads it as is.
+    Returns (file_path, video_title).
 
     Args:
         youtube_url (str): The URL of the YouTube video to download.
         output_path (str): The directory to save the downloaded file. Defaults to "downloads".
+        max_filesize (int): Skip formats larger than this many bytes (e.g. a job's scratch quota).
     """
-    # Base yt_dlp options with a realistic user agent
+    min_kbps = settings.YOUTUBE_MIN_AUDIO_KBPS
     ydl_opts = {
-        'format': 'bestaudio/best',
-        'outtmpl': f"{output_path}/%(title)s.%(ext)s",
-        'postprocessors': [{
-            'key': 'FFmpegExtractAudio',
-            'preferredcodec': 'mp3',
-            'preferredquality': '192',
-        }],
+        # Audio-only above the quality floor, else any audio-only, else the
+        # smallest muxed format (its video is dropped when conditioning)
+        'format': f'bestaudio[abr>={min_kbps}]/bestaudio/worst',
+        # "Best" here means: Opus over AAC, then the lowest bitrate
+        'format_sort': ['acodec:opus', '+abr', '+size'],
+        # Video ID as the name: safe characters, no renaming afterwards
+        'outtmpl': f"{output_path}/%(id)s.%(ext)s",
+        'noplaylist': True,
+        'quiet': True,
         'cookies-from-browser': 'chrome',
     }
+    if max_filesize:
+        ydl_opts['max_filesize'] = max_filesize
 
     os.makedirs(output_path, exist_ok=True)
 
     with yt_dlp.YoutubeDL(ydl_opts) as ydl:
         info = ydl.extract_info(youtube_url, download=True)
-        raw_filename = ydl.prepare_filename(info)
-
-    # Split the raw filename into (base, extension)
-    base, ext = os.path.splitext(raw_filename)
-
-    # If the postprocessor left .webm or .m4a, force ".mp3"
-    if ext.lower() in (".webm", ".m4a"):
-        ext = ".mp3"
-
-    # Extract just the base name (no directories), then sanitize it
-    base_name_only = os.path.basename(base)
-    sanitized_base = sanitize_filename(base_name_only)
-
-    # Rebuild the final filename with sanitized base + ".mp3"
-    final_filename = f"{sanitized_base}{ext}"
-    final_path = os.path.join(output_path, final_filename)
-
-    # Attempt to rename the file from its raw name to the new sanitized name
-    if os.path.exists(raw_filename):
-        os.rename(raw_filename, final_path)
-    else:
-        # The file may have been directly converted to .mp3
-        mp3_version = f"{base}.mp3"
-        if os.path.exists(mp3_version):
-            os.rename(mp3_version, final_path)
-        else:
-            raise FileNotFoundError(
-                f"Downloaded file not found: {raw_filename} or {mp3_version}"
-            )
-
-    return final_path
+        file_path = ydl.prepare_filename(info)
+
+    if not os.path.exists(file_path):
+        raise FileNotFoundError(
+            f"Downloaded file not found: {file_path} (larger than {max_filesize} bytes?)")
+    return file_path, info.get("title") or youtube_url
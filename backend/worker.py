@@ -0,0 +1,158 @@
+# backend/worker.py
+"""
+Job worker: runs queued transcription and generation jobs outside the web
+process. Start one or more with
+
+    python -m backend.worker --concurrency 4
+
+Each poller is an asyncio task sharing one event loop and one connection
+pool; blocking work (Whisper uploads, ffmpeg, yt-dlp) is pushed to threads
+by the tasks themselves.
+"""
+import argparse
+import asyncio
+import os
+import signal
+import socket
+import time
+import traceback
+from backend.config import settings
+from backend.database import SessionLocal, engine
+from backend.utils.job_queue import (claim_next_job, heartbeat, release_job,
+                                     requeue_expired_jobs, retry_or_fail_job)
+from backend.utils.transcription_backends import LocalWhisperBackend, get_transcription_backend
+from backend.utils.workspace import cleanup_orphan_workspaces
+from backend.routers.upload import process_transcription
+from backend.routers.youtube import process_youtube_transcription
+from backend.routers.generate import generate_article_background
+import logging
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# job.kind -> coroutine function(job, db); the payload holds the task's own arguments
+TASKS = {
+    "transcribe_upload": lambda job, db: process_transcription(
+        user_id=job.user_id, db_session=db, job_id=job.id, **job.payload),
+    "transcribe_youtube": lambda job, db: process_youtube_transcription(
+        user_id=job.user_id, db=db, job_id=job.id, **job.payload),
+    "generate_article": lambda job, db: generate_article_background(
+        job_id=job.id, user_id=job.user_id, db=db, **job.payload),
+}
+
+
+async def _keep_lease_alive(job_id: str, worker_id: str, work: asyncio.Task, lost: asyncio.Event):
+    """
+    Renew the lease every JOB_HEARTBEAT_SECONDS until cancelled. If the
+    lease is taken over, or can't be renewed before it runs out, `work` is
+    cancelled and `lost` set: another worker may be running the job now.
+    """
+    renewed = time.monotonic()
+    while True:
+        await asyncio.sleep(settings.JOB_HEARTBEAT_SECONDS)
+        try:
+            async with SessionLocal() as db:
+                owned = await heartbeat(db, job_id, worker_id, settings.JOB_LEASE_SECONDS)
+        except Exception as e:
+            logger.error(f"Heartbeat failed for job {job_id}: {e}")
+            if time.monotonic() - renewed < settings.JOB_LEASE_SECONDS:
+                continue
+            owned = False
+        if not owned:
+            logger.warning(f"{worker_id} lost the lease on job {job_id}, cancelling it")
+            lost.set()
+            work.cancel()
+            return
+        renewed = time.monotonic()
+
+
+async def run_job(job, worker_id: str):
+    task = TASKS.get(job.kind)
+    async with SessionLocal() as db:
+        if task is None:
+            await _after_failure(db, job, worker_id, ValueError(f"Unknown job kind '{job.kind}'"))
+            return
+        logger.info(f"{worker_id} running {job.kind} job {job.id}")
+        work = asyncio.create_task(task(job, db))
+        lost = asyncio.Event()
+        beat = asyncio.create_task(_keep_lease_alive(job.id, worker_id, work, lost))
+        try:
+            await work
+        except asyncio.CancelledError:
+            if not lost.is_set():
+                work.cancel()
+                raise
+            # The job is someone else's now; leave its row alone
+            await db.rollback()
+            return
+        except Exception as e:
+            await _after_failure(db, job, worker_id, e)
+            return
+        finally:
+            beat.cancel()
+        await release_job(db, job.id, worker_id)
+
+
+async def _after_failure(db, job, worker_id: str, e: Exception):
+    """Record the error; the job is retried after a backoff until JOB_MAX_ATTEMPTS."""
+    logger.error(f"Job {job.id} raised: {e}")
+    error = "".join(traceback.format_exception(e))
+    await db.rollback()
+    await retry_or_fail_job(db, job.id, worker_id, error, settings.JOB_MAX_ATTEMPTS,
+                            settings.JOB_RETRY_BACKOFF_SECONDS)
+
+
+async def poll(worker_id: str, stop: asyncio.Event):
+    while not stop.is_set():
+        try:
+            async with SessionLocal() as db:
+                await requeue_expired_jobs(db, settings.JOB_MAX_ATTEMPTS)
+                job = await claim_next_job(db, worker_id, settings.JOB_LEASE_SECONDS)
+        except Exception as e:
+            logger.error(f"{worker_id} could not poll the queue: {e}")
+            job = None
+
+        if job is None:
+            try:
+                await asyncio.wait_for(stop.wait(), settings.WORKER_POLL_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+            continue
+        await run_job(job, worker_id)
+
+
+async def main(concurrency: int):
+    stop = asyncio.Event()
+
+    def shutdown():
+        logger.info("Shutting down after running jobs finish...")
+        stop.set()
+
+    loop = asyncio.get_running_loop()
+    loop.add_signal_handler(signal.SIGINT, shutdown)
+    loop.add_signal_handler(signal.SIGTERM, shutdown)
+
+    # Scratch directories of workers that crashed mid-job
+    await asyncio.to_thread(cleanup_orphan_workspaces)
+
+    backend = get_transcription_backend()
+    if isinstance(backend, LocalWhisperBackend):
+        # Load the model once, before the first job needs it
+        await asyncio.to_thread(backend.load)
+
+    prefix = f"{socket.gethostname()}:{os.getpid()}"
+    pollers = [asyncio.create_task(poll(f"{prefix}:{n}", stop))
+               for n in range(concurrency)]
+    logger.info(f"Worker {prefix} started with {concurrency} pollers")
+    try:
+        await asyncio.gather(*pollers)
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run queued jobs.")
+    parser.add_argument("--concurrency", type=int, default=settings.WORKER_CONCURRENCY,
+                        help="number of jobs this process runs at once")
+    args = parser.parse_args()
+    asyncio.run(main(args.concurrency))
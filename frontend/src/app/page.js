@@ -13,7 +13,15 @@ import ProcessingQueue from "../components/ProcessingQueue";
 
 export default function Home() {
   const user = useAuth();
-  const { transcriptionHistory, contentHistory, refreshHistory } = useHistory(user);
+  const {
+    transcriptionHistory,
+    contentHistory,
+    refreshHistory,
+    hasMoreTranscriptions,
+    loadMoreTranscriptions,
+    hasMoreContent,
+    loadMoreContent,
+  } = useHistory(user);
   const { processingQueue, isLoading } = useJobs();  // Add isLoading from useJobs
   const router = useRouter();
 
@@ -83,6 +91,8 @@ export default function Home() {
           <TranscriptionHistory
             transcriptionHistory={transcriptionHistory}
             onDone={refreshHistory}
+            hasMore={hasMoreTranscriptions}
+            onLoadMore={loadMoreTranscriptions}
           />
         </div>
 
@@ -93,7 +103,11 @@ export default function Home() {
 
       <div className="mt-6 grid grid-cols-1 lg:grid-cols-10 gap-6">
         <div className="col-span-1 lg:col-span-6 bg-white p-6 rounded-lg shadow h-[28rem] overflow-y-auto">
-          <ContentHistory contentHistory={contentHistory} />
+          <ContentHistory
+            contentHistory={contentHistory}
+            hasMore={hasMoreContent}
+            onLoadMore={loadMoreContent}
+          />
         </div>
 
         <div className="col-span-1 lg:col-span-4 bg-white p-6 rounded-lg shadow h-[28rem] overflow-y-auto">
@@ -49,7 +49,6 @@ export default function ContentGeneration({ transcriptionHistory, onJobUpdate, o
         try {
             const requestBody = {
                 transcription_id: parseInt(selectedTranscription),
-                transcription: selectedObj ? selectedObj.transcript : "",
                 gaya_bahasa: configDefaults["Gaya Bahasa"],
                 kepadatan_informasi: configDefaults["Kepadatan Informasi"],
                 sentimen: configDefaults["Sentimen Terhadap Objek Berita"],
@@ -4,8 +4,9 @@
 
 import { useState } from "react";
 import ContentModal from "./ContentModal";
+import { fetchContent } from "../utils/api";
 
-export default function ContentHistory({ contentHistory }) {
+export default function ContentHistory({ contentHistory, hasMore = false, onLoadMore = () => { } }) {
     const [selectedContent, setSelectedContent] = useState(null);
     const [isModalOpen, setIsModalOpen] = useState(false);
 
@@ -21,9 +22,15 @@ export default function ContentHistory({ contentHistory }) {
                         <div
                             key={entry.id}
                             className="border-b py-2 cursor-pointer hover:bg-gray-100 transition"
-                            onClick={() => {
-                                setSelectedContent(entry);
-                                setIsModalOpen(true);
+                            onClick={async () => {
+                                // The list leaves out article bodies; load this one on demand
+                                try {
+                                    const res = await fetchContent(entry.id);
+                                    setSelectedContent(res.data);
+                                    setIsModalOpen(true);
+                                } catch (error) {
+                                    console.error("Error loading content:", error);
+                                }
                             }}
                         >
                             <p className="font-semibold">
@@ -35,6 +42,14 @@ export default function ContentHistory({ contentHistory }) {
                         </div>
                     ))
             )}
+            {hasMore && (
+                <button
+                    onClick={onLoadMore}
+                    className="w-full text-sm text-blue-600 hover:text-blue-800 py-2"
+                >
+                    Load more
+                </button>
+            )}
 
             {isModalOpen && (
                 <ContentModal
@@ -8,6 +8,7 @@ import { useJobs } from "../hooks/useJobs";
 export default function TranscribeSection() {
     const { addJob } = useJobs();
     const [youtubeUrl, setYoutubeUrl] = useState("");
+    const [preferWhisper, setPreferWhisper] = useState(false);
     const [file, setFile] = useState(null);
     const [loading, setLoading] = useState(false);
 
@@ -19,7 +20,7 @@ export default function TranscribeSection() {
         try {
             const response = await axios.post(
                 `${API_BASE_URL}/youtube/process-youtube/`,
-                { youtube_url: youtubeUrl },
+                { youtube_url: youtubeUrl, prefer_whisper: preferWhisper },
                 { withCredentials: true } // Use cookies instead of token
             );
 
@@ -91,6 +92,14 @@ export default function TranscribeSection() {
                     onChange={(e) => setYoutubeUrl(e.target.value)}
                     className="w-full p-2 border border-gray-300 rounded focus:outline-none focus:ring-1 focus:ring-blue-500"
                 />
+                <label className="flex items-center gap-2 text-sm text-gray-700">
+                    <input
+                        type="checkbox"
+                        checked={preferWhisper}
+                        onChange={(e) => setPreferWhisper(e.target.checked)}
+                    />
+                    Use Whisper even if the video has subtitles (slower, more accurate)
+                </label>
                 <button
                     onClick={handleYouTubeTranscribe}
                     className="w-full bg-blue-500 hover:bg-blue-600 text-white py-2 rounded-md transition-colors"
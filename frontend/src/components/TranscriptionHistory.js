@@ -4,8 +4,15 @@
 
 import { useState } from "react";
 import TranscriptionModal from "./TranscriptionModal";
+import { fetchTranscription } from "../utils/api";
 
-export default function TranscriptionHistory({ transcriptionHistory, onDone = () => { }, onJobUpdate = () => { }, }) {
+export default function TranscriptionHistory({
+    transcriptionHistory,
+    onDone = () => { },
+    onJobUpdate = () => { },
+    hasMore = false,
+    onLoadMore = () => { },
+}) {
     const [selectedTranscription, setSelectedTranscription] = useState(null);
     const [isModalOpen, setIsModalOpen] = useState(false);
 
@@ -27,9 +34,15 @@ export default function TranscriptionHistory({ transcriptionHistory, onDone = ()
                             <div
                                 key={transcription.id}
                                 className="bg-gray-50 p-4 rounded-lg shadow cursor-pointer overflow-hidden hover:bg-gray-100 transition"
-                                onClick={() => {
-                                    setSelectedTranscription(transcription);
-                                    setIsModalOpen(true);
+                                onClick={async () => {
+                                    // The list only carries summaries; load the full record on demand
+                                    try {
+                                        const res = await fetchTranscription(transcription.id);
+                                        setSelectedTranscription(res.data);
+                                        setIsModalOpen(true);
+                                    } catch (error) {
+                                        console.error("Error loading transcription:", error);
+                                    }
                                 }}
                             >
                                 <p className="font-semibold truncate text-gray-900">
@@ -42,6 +55,14 @@ export default function TranscriptionHistory({ transcriptionHistory, onDone = ()
                             </div>
                         ))
                 )}
+                {hasMore && (
+                    <button
+                        onClick={onLoadMore}
+                        className="w-full text-sm text-blue-600 hover:text-blue-800 py-2"
+                    >
+                        Load more
+                    </button>
+                )}
             </div>
 
             {isModalOpen && selectedTranscription && (
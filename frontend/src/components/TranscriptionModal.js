@@ -80,18 +80,14 @@ export default function TranscriptionModal({
             type: "content-generation",
             title: `Content: ${transcription.title || "Untitled"}`,
         };
-        setJob(newJob); // Set the job state
-        addJob(newJob);
 
         try {
-            updateJobStatus({ ...newJob, status: "processing" });
             const API_BASE_URL = process.env.NEXT_PUBLIC_API_BASE_URL || "http://127.0.0.1:3000";
-            await axios.post(
+            const { data } = await axios.post(
                 `${API_BASE_URL}/generate/`,
                 {
                     job_id: jobId,
                     transcription_id: transcription.id,
-                    transcription: transcription.transcript,
                     gaya_bahasa: selectedOptions["Gaya Bahasa"],
                     kepadatan_informasi: selectedOptions["Kepadatan Informasi"],
                     sentimen: selectedOptions["Sentimen Terhadap Objek Berita"],
@@ -105,44 +101,58 @@ export default function TranscriptionModal({
                 },
                 { withCredentials: true }
             );
-            // Since this is a background task, polling will handle the completion
+            if (data.cached) {
+                // Same transcript and options were generated before
+                addJob({ ...newJob, status: "completed" });
+                setGeneratedContent(data.content);
+                setLoading(false);
+                if (onDone) onDone();
+                return;
+            }
+            // An identical request may already be running; follow that job
+            const startedJob = { ...newJob, job_id: data.job_id };
+            addJob(startedJob);
+            // The job row exists now, so the stream below can open
+            setJob(startedJob);
         } catch (error) {
             console.error("Error starting content generation:", error);
-            updateJobStatus({ ...newJob, status: "failed" });
+            setGeneratedContent("Failed to generate content.");
             setLoading(false);
             if (onDone) onDone();
         }
     };
 
-    // Polling for job status
+    // Stream the article as it is generated
     useEffect(() => {
         if (step !== 3 || !loading || !job) return;
 
-        const pollJobStatus = async () => {
-            try {
-                const response = await axios.get(
-                    `${apiBaseUrl}/jobs/${job.job_id}/status`,
-                    { withCredentials: true }
-                );
-                const { status, transcript } = response.data;
-                updateJobStatus({ job_id: job.job_id, status });
-
-                if (status === "completed" && transcript) {
-                    setGeneratedContent(transcript);
-                    setLoading(false);
-                    if (onDone) onDone();
-                } else if (status === "failed") {
-                    setGeneratedContent("Failed to generate content.");
-                    setLoading(false);
-                    if (onDone) onDone();
-                }
-            } catch (error) {
-                console.error("Error polling job status:", error);
-            }
+        const source = new EventSource(`${apiBaseUrl}/generate/${job.job_id}/stream`, {
+            withCredentials: true,
+        });
+        let text = "";
+        source.addEventListener("snapshot", (e) => {
+            text = JSON.parse(e.data).text || "";
+            setGeneratedContent(text);
+        });
+        source.addEventListener("delta", (e) => {
+            text += JSON.parse(e.data).text;
+            setGeneratedContent(text);
+        });
+        source.addEventListener("done", (e) => {
+            const { status, text: finalText } = JSON.parse(e.data);
+            source.close();
+            updateJobStatus({ job_id: job.job_id, status });
+            setGeneratedContent(
+                status === "completed" ? finalText : "Failed to generate content."
+            );
+            setLoading(false);
+            if (onDone) onDone();
+        });
+        source.onerror = (error) => {
+            // EventSource reconnects on its own; the next snapshot catches up
+            console.error("Generation stream error:", error);
         };
-
-        const intervalId = setInterval(pollJobStatus, 2000);
-        return () => clearInterval(intervalId);
+        return () => source.close();
     }, [step, loading, job, updateJobStatus, onDone, apiBaseUrl]);
 
     const fallbackCopyTextToClipboard = (text) => {
@@ -176,19 +186,15 @@ export default function TranscriptionModal({
         }
     };
 
-    let segments = [];
-    if (transcription.segments) {
-        try {
-            segments = JSON.parse(transcription.segments);
-            if (!Array.isArray(segments)) {
-                console.warn("Segments is not an array:", segments);
-                segments = [];
-            }
-        } catch (err) {
-            console.error("Error parsing transcription.segments:", err, "Raw data:", transcription.segments);
-            segments = [];
-        }
-    }
+    // Segments arrive column-wise: { start: [...], end: [...], text: [...] }
+    const columns = transcription.segments;
+    const segments = columns && Array.isArray(columns.start)
+        ? columns.start.map((start, i) => ({
+            start,
+            end: columns.end[i],
+            text: columns.text[i],
+        }))
+        : [];
 
     return (
         <div className="fixed inset-0 bg-black bg-opacity-50 flex justify-center items-center p-4">
@@ -1,10 +1,12 @@
 // src/hooks/useHistory.js
 import { useState, useEffect } from "react";
-import { fetchHistory } from "../utils/api";
+import { fetchHistory, fetchTranscriptionPage, fetchContentPage } from "../utils/api";
 
 export default function useHistory(user) {
     const [transcriptionHistory, setTranscriptionHistory] = useState([]);
     const [contentHistory, setContentHistory] = useState([]);
+    const [transcriptionCursor, setTranscriptionCursor] = useState(null);
+    const [contentCursor, setContentCursor] = useState(null);
 
     const refreshHistory = async () => {
         if (!user) return;
@@ -14,18 +16,50 @@ export default function useHistory(user) {
             setTranscriptionHistory(
                 Array.isArray(transcriptions.data) ? transcriptions.data : []
             );
+            setTranscriptionCursor(transcriptions.nextCursor || null);
             setContentHistory(
                 Array.isArray(contents.data) ? contents.data : []
             );
+            setContentCursor(contents.nextCursor || null);
         } catch (error) {
             console.error("Error refreshing history:", error);
         }
     };
 
+    const loadMoreTranscriptions = async () => {
+        if (!user || !transcriptionCursor) return;
+        try {
+            const page = await fetchTranscriptionPage(transcriptionCursor);
+            setTranscriptionHistory((prev) => [...prev, ...page.data]);
+            setTranscriptionCursor(page.nextCursor || null);
+        } catch (error) {
+            console.error("Error loading more transcriptions:", error);
+        }
+    };
+
+    const loadMoreContent = async () => {
+        if (!user || !contentCursor) return;
+        try {
+            const page = await fetchContentPage(contentCursor);
+            setContentHistory((prev) => [...prev, ...page.data]);
+            setContentCursor(page.nextCursor || null);
+        } catch (error) {
+            console.error("Error loading more content:", error);
+        }
+    };
+
     // Fetch history once on mount (or when user changes)
     useEffect(() => {
         refreshHistory();
     }, [user]);
 
-    return { transcriptionHistory, contentHistory, refreshHistory };
+    return {
+        transcriptionHistory,
+        contentHistory,
+        refreshHistory,
+        hasMoreTranscriptions: Boolean(transcriptionCursor),
+        loadMoreTranscriptions,
+        hasMoreContent: Boolean(contentCursor),
+        loadMoreContent,
+    };
 }
\ No newline at end of file
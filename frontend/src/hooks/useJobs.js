@@ -111,7 +111,9 @@ export function JobsProvider({ children }) {
                     return {
                         ...job,
                         status: updatedJob.status,
-                        completed_at: isCompleting ? new Date().toISOString() : job.completed_at,
+                        completed_at: isCompleting
+                            ? updatedJob.completed_at || new Date().toISOString()
+                            : job.completed_at,
                     };
                 }
                 return job;
@@ -121,43 +123,27 @@ export function JobsProvider({ children }) {
     }, []);
 
     useEffect(() => {
-        const fetchJobStatuses = async () => {
-            const currentQueue = queueRef.current;
-            if (currentQueue.length === 0) {
-                console.log("⚠️ No jobs to fetch!");
-                return;
-            }
-            if (typeof window === "undefined") {
-                return;
-            }
-            console.log("🔄 Fetching job statuses for jobs:", currentQueue.map((job) => job.job_id));
-
+        if (typeof window === "undefined") {
+            return;
+        }
+        // The server pushes every status change of this user's jobs;
+        // EventSource reconnects on its own if the connection drops.
+        const source = new EventSource(`${API_BASE_URL}/jobs/stream`, {
+            withCredentials: true,
+        });
+        source.onmessage = (event) => {
             try {
-                const jobsStatus = await Promise.all(
-                    currentQueue.map(async (job) => {
-                        try {
-                            const res = await axios.get(
-                                `${API_BASE_URL}/jobs/${job.job_id}/status`,
-                                { withCredentials: true }
-                            );
-                            console.log(`✅ Fetched status for job ${job.job_id}:`, res.data.status);
-                            return { job_id: job.job_id, status: res.data.status };
-                        } catch (error) {
-                            console.error(`❌ Error fetching job ${job.job_id} status:`, error.response?.status, error.message);
-                            return { job_id: job.job_id, status: "failed" };
-                        }
-                    })
-                );
-                jobsStatus.forEach((jobStatus) => {
-                    updateJobStatus(jobStatus);
-                });
+                const jobEvent = JSON.parse(event.data);
+                console.log(`📨 Job ${jobEvent.job_id} is now ${jobEvent.status}`);
+                updateJobStatus(jobEvent);
             } catch (error) {
-                console.error("❌ Error polling job statuses:", error);
+                console.error("❌ Error reading job event:", error);
             }
         };
-
-        const intervalId = setInterval(fetchJobStatuses, 5000);
-        return () => clearInterval(intervalId);
+        source.onerror = (error) => {
+            console.error("❌ Job stream error, reconnecting:", error);
+        };
+        return () => source.close();
     }, [updateJobStatus]);
 
     return (
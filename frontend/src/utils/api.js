@@ -25,13 +25,48 @@ export const getUser = async () => {
 export const fetchHistory = async () => {
     const [transcriptionsRes, contentsRes] = await Promise.all([
         apiClient.get(`/history/`),
-        apiClient.get(`/content-history/`),
+        // Article bodies are fetched per item when one is opened
+        apiClient.get(`/content-history/`, { params: { include_content: false } }),
     ]);
 
     return [
-        { data: transcriptionsRes.data },
-        { data: contentsRes.data },
+        { data: transcriptionsRes.data.items, nextCursor: transcriptionsRes.data.next_cursor },
+        { data: contentsRes.data.items, nextCursor: contentsRes.data.next_cursor },
     ];
 };
 
+// Next page of transcription summaries, keyed by the cursor of the last page
+export const fetchTranscriptionPage = async (cursor) => {
+    const res = await apiClient.get(`/history/`, { params: { cursor } });
+    return { data: res.data.items, nextCursor: res.data.next_cursor };
+};
+
+// Next page of generated content summaries
+export const fetchContentPage = async (cursor) => {
+    const res = await apiClient.get(`/content-history/`, {
+        params: { cursor, include_content: false },
+    });
+    return { data: res.data.items, nextCursor: res.data.next_cursor };
+};
+
+// One generated article including its HTML body
+export const fetchContent = async (id) => {
+    return apiClient.get(`/content-history/${id}`);
+};
+
+// Full transcript and segments of one transcription
+export const fetchTranscription = async (id) => {
+    return apiClient.get(`/history/${id}`);
+};
+
+// Segments overlapping [t0, t1) seconds, column-wise; omit t1 to read to the end
+export const fetchSegments = async (id, t0 = 0, t1) => {
+    return apiClient.get(`/history/${id}/segments`, { params: { t0, t1 } });
+};
+
+// Ranked full-text search; pass next_offset back as offset for more results
+export const searchHistory = async (q, { scope = "all", offset = 0, limit = 20 } = {}) => {
+    return apiClient.get("/history/search", { params: { q, scope, offset, limit } });
+};
+
 export default apiClient;
\ No newline at end of file
@@ -0,0 +1,47 @@
+# tests/conftest.py
+"""
+backend.config reads its settings on import, so the required ones get
+test values here first. The database is a throwaway SQLite file and
+scratch space a temp dir, whatever .env says.
+"""
+import asyncio
+import os
+import tempfile
+
+import pytest
+
+_TEST_DIR = tempfile.mkdtemp(prefix="stt-tests-")
+
+for name, value in {
+    "OPENAI_API_KEY": "test-key",
+    "APP_HOST": "127.0.0.1",
+    "APP_PORT": "3000",
+    "SECRET_KEY": "test-secret",
+    "CLIENT_HOST": "http://localhost:3001",
+}.items():
+    os.environ.setdefault(name, value)
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_TEST_DIR, 'test.db')}"
+os.environ["SCRATCH_DIR"] = os.path.join(_TEST_DIR, "scratch")
+
+
+@pytest.fixture
+def sessions(tmp_path):
+    """
+    Session factory on a fresh SQLite database with the full schema.
+    NullPool: each test drives it from its own asyncio.run loop.
+    """
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+    from sqlalchemy.pool import NullPool
+    from backend.database import Base
+    from backend.models import (user, transcription, content_generation, job,  # noqa: F401
+                                transcript_cache, transcript_segment)
+
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'app.db'}", poolclass=NullPool)
+
+    async def create_schema():
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+
+    asyncio.run(create_schema())
+    yield async_sessionmaker(engine, autoflush=False, expire_on_commit=False)
+    asyncio.run(engine.dispose())
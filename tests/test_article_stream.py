@@ -0,0 +1,84 @@
+# tests/test_article_stream.py
+import asyncio
+import json
+
+from sqlalchemy import update
+
+from backend.config import settings
+from backend.models.job import Job
+from backend.routers import generate
+from backend.utils.auth_cache import Principal
+from backend.utils.job_events import bus, delta_event, delta_flush_seconds, job_event
+
+
+class ConnectedRequest:
+    async def is_disconnected(self):
+        return False
+
+
+def _parse(sse: str):
+    event, data = sse.strip().split("\n")
+    return event[len("event: "):], json.loads(data[len("data: "):])
+
+
+def test_stream_orders_snapshots_and_deltas(sessions, monkeypatch):
+    monkeypatch.setattr(generate, "SessionLocal", sessions)
+
+    async def save(**values):
+        async with sessions() as db:
+            await db.execute(update(Job).where(Job.id == "j").values(**values))
+            await db.commit()
+
+    async def scenario():
+        async with sessions() as db:
+            db.add(Job(id="j", user_id=1, status="processing", transcript="Hello "))
+            await db.commit()
+        response = await generate.stream_article("j", ConnectedRequest(), Principal(id=1, email="u@example.com"))
+        events = response.body_iterator
+        seen = [_parse(await events.__anext__())]
+
+        async def next_event():
+            return _parse(await asyncio.wait_for(events.__anext__(), 1))
+
+        # Overlaps the snapshot: only the new part is sent
+        bus.publish(delta_event("j", 1, 0, "Hello wor"))
+        seen.append(await next_event())
+        bus.publish(delta_event("j", 2, 9, "other user"))
+        bus.publish(delta_event("other-job", 1, 9, "other job"))
+        bus.publish(delta_event("j", 1, 9, "ld"))
+        seen.append(await next_event())
+
+        # A gap past the checkpoint is held until a checkpoint covers it
+        pending = asyncio.ensure_future(events.__anext__())
+        bus.publish(delta_event("j", 1, 20, "late"))
+        await asyncio.sleep(0.2)
+        assert not pending.done()
+        await save(transcript="Hello world. Again: ")
+        bus.publish(delta_event("j", 1, 24, "!"))
+        seen.append(_parse(await asyncio.wait_for(pending, 1)))
+        seen.extend([await next_event(), await next_event()])
+
+        await save(status="completed", transcript="Hello world. Again: late!")
+        bus.publish(job_event(Job(id="j", user_id=1, status="completed")))
+        seen.append(await next_event())
+        await events.aclose()
+        return seen
+
+    assert asyncio.run(scenario()) == [
+        ("snapshot", {"status": "processing", "text": "Hello "}),
+        ("delta", {"text": "wor"}),
+        ("delta", {"text": "ld"}),
+        ("snapshot", {"status": "processing", "text": "Hello world. Again: "}),
+        ("delta", {"text": "late"}),
+        ("delta", {"text": "!"}),
+        ("done", {"status": "completed", "text": "Hello world. Again: late!"}),
+    ]
+
+
+def test_deltas_are_coalesced_when_they_go_through_notify(monkeypatch):
+    monkeypatch.setattr(settings, "GENERATION_FLUSH_SECONDS", 0.1)
+    monkeypatch.setattr(settings, "GENERATION_NOTIFY_FLUSH_SECONDS", 0.5)
+    monkeypatch.setattr(settings, "JOB_EVENTS_BACKEND", "memory")
+    assert delta_flush_seconds() == 0.1
+    monkeypatch.setattr(settings, "JOB_EVENTS_BACKEND", "postgres")
+    assert delta_flush_seconds() == 0.5
@@ -0,0 +1,73 @@
+# tests/test_audio_utils.py
+import pytest
+
+from backend.config import settings
+from backend.utils import audio_utils
+from backend.utils.audio_utils import AudioInfo, choose_split_points, needs_conditioning
+
+
+def _info(**overrides) -> AudioInfo:
+    values = dict(duration=600.0, codec="mp3", channels=2, sample_rate=44100,
+                  bitrate=128000, size=9_600_000)
+    values.update(overrides)
+    return AudioInfo(**values)
+
+
+def test_split_points_are_equal_without_pauses():
+    assert choose_split_points(900.0, [], 300.0, 20.0) == [300.0, 600.0]
+
+
+def test_short_audio_is_not_split():
+    assert choose_split_points(120.0, [(10.0, 11.0)], 300.0, 20.0) == []
+
+
+def test_split_points_move_to_the_nearest_pause_within_tolerance():
+    silences = [(280.0, 282.0), (305.0, 306.0), (650.0, 660.0)]
+    # 305.5 is closer to 300 than 281; 655 is 55s away from 600, out of reach
+    assert choose_split_points(900.0, silences, 300.0, 20.0) == [305.5, 600.0]
+
+
+def test_tolerance_is_capped_to_a_third_of_the_chunk():
+    # Chunks of 50s: a pause 20s from the ideal cut is too far
+    assert choose_split_points(100.0, [(69.0, 71.0)], 60.0, 30.0) == [50.0]
+    assert choose_split_points(100.0, [(59.0, 61.0)], 60.0, 30.0) == [60.0]
+
+
+def test_open_ended_silence_is_not_a_split_point():
+    assert choose_split_points(600.0, [(299.0, None)], 300.0, 20.0) == [300.0]
+
+
+def test_stereo_music_bitrate_needs_conditioning():
+    assert needs_conditioning(_info())
+
+
+def test_speech_shaped_input_is_left_alone():
+    info = _info(channels=1, sample_rate=16000,
+                 bitrate=settings.PRECONDITION_BITRATE_KBPS * 1000)
+    assert not needs_conditioning(info)
+
+
+def test_compact_native_codec_passes_through_when_it_fits():
+    info = _info(codec="opus", bitrate=48000, size=3_600_000)
+    assert not needs_conditioning(info, max_file_bytes=25 * 1024 * 1024)
+    assert needs_conditioning(info, max_file_bytes=1_000_000)
+    assert needs_conditioning(_info(codec="opus", bitrate=160000))
+
+
+def test_passthrough_is_off_when_trimming_silence(monkeypatch):
+    monkeypatch.setattr(settings, "PRECONDITION_TRIM_SILENCE", True)
+    assert needs_conditioning(_info(codec="aac", bitrate=48000))
+
+
+@pytest.mark.parametrize("silences, expected", [
+    ([], (0.0, None)),
+    ([(0.0, 1.5)], (1.5, None)),
+    ([(0.0, 1.5), (50.0, None)], (1.5, 50.0)),
+    ([(0.0, 1.5), (30.0, 31.0), (55.0, 60.0)], (1.5, 55.0)),
+    ([(10.0, 12.0)], (0.0, None)),
+    # Silent throughout: nothing to keep, so nothing is trimmed from the end
+    ([(0.0, None)], (0.0, None)),
+])
+def test_speech_bounds(monkeypatch, silences, expected):
+    monkeypatch.setattr(audio_utils, "detect_silences", lambda path: silences)
+    assert audio_utils._speech_bounds("input.mp3", 60.0) == expected
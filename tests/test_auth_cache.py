@@ -0,0 +1,116 @@
+# tests/test_auth_cache.py
+import asyncio
+import time
+
+import pytest
+from fastapi import HTTPException
+from jose import jwt
+from sqlalchemy import delete, update
+from starlette.requests import Request
+
+from backend.models.user import User
+from backend.routers.auth import create_access_token
+from backend.utils import dependencies
+from backend.utils.auth_cache import Principal, PrincipalCache, password_version
+
+
+def _request(token: str) -> Request:
+    return Request({"type": "http", "headers": [(b"cookie", f"token={token}".encode())]})
+
+
+@pytest.fixture
+def auth(sessions, monkeypatch):
+    """Logs in user 1 and counts the users queries that get_current_user makes."""
+    lookups = []
+
+    def counting_sessions():
+        lookups.append(1)
+        return sessions()
+
+    cache = PrincipalCache(max_size=10, ttl=60)
+    monkeypatch.setattr(dependencies, "SessionLocal", counting_sessions)
+    monkeypatch.setattr(dependencies, "principal_cache", cache)
+
+    async def seed():
+        async with sessions() as db:
+            db.add(User(id=1, email="a@example.com", password_hash="hash-1"))
+            await db.commit()
+
+    asyncio.run(seed())
+    token = create_access_token({"sub": "1", "pwv": password_version("hash-1")})
+    return token, lookups, cache, sessions
+
+
+def _resolve(token):
+    return asyncio.run(dependencies.get_current_user(_request(token)))
+
+
+def test_token_carries_no_email_claim(auth):
+    token, *_ = auth
+    assert "email" not in jwt.get_unverified_claims(token)
+
+
+def test_verified_logins_are_served_from_the_cache(auth):
+    token, lookups, _, _ = auth
+    assert _resolve(token) == Principal(id=1, email="a@example.com")
+    assert _resolve(token) == Principal(id=1, email="a@example.com")
+    assert len(lookups) == 1
+
+
+def test_password_change_revokes_the_token_once_the_entry_expires(auth, monkeypatch):
+    token, lookups, cache, sessions = auth
+    _resolve(token)
+
+    async def change_password():
+        async with sessions() as db:
+            await db.execute(update(User).where(User.id == 1).values(password_hash="hash-2"))
+            await db.commit()
+
+    asyncio.run(change_password())
+    # Still cached in this process: accepted until the TTL runs out
+    assert _resolve(token).id == 1
+    now = time.time()
+    monkeypatch.setattr(time, "time", lambda: now + cache.ttl + 1)
+    with pytest.raises(HTTPException) as error:
+        _resolve(token)
+    assert error.value.status_code == 401
+
+
+def test_deleted_user_is_rejected_once_the_entry_expires(auth, monkeypatch):
+    token, lookups, cache, sessions = auth
+    _resolve(token)
+
+    async def delete_user():
+        async with sessions() as db:
+            await db.execute(delete(User).where(User.id == 1))
+            await db.commit()
+
+    asyncio.run(delete_user())
+    now = time.time()
+    monkeypatch.setattr(time, "time", lambda: now + cache.ttl + 1)
+    with pytest.raises(HTTPException):
+        _resolve(token)
+
+
+def test_bad_tokens_are_rejected_without_a_lookup(auth):
+    token, lookups, _, _ = auth
+    for bad in ("", "not-a-jwt", token[:-2] + "xx"):
+        with pytest.raises(HTTPException):
+            _resolve(bad)
+    assert lookups == []
+
+
+def test_entries_expire_with_the_token_and_the_oldest_is_evicted(monkeypatch):
+    cache = PrincipalCache(max_size=2, ttl=60)
+    now = time.time()
+    cache.set("short", Principal(1, "a@example.com"), token_exp=now + 5)
+    cache.set("b", Principal(2, "b@example.com"))
+    assert cache.get("short") is not None
+    monkeypatch.setattr(time, "time", lambda: now + 10)
+    assert cache.get("short") is None
+
+    cache.set("c", Principal(3, "c@example.com"))
+    cache.get("b")
+    cache.set("d", Principal(4, "d@example.com"))
+    assert cache.get("c") is None
+    assert cache.get("b") is not None
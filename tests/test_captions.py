@@ -0,0 +1,99 @@
+# tests/test_captions.py
+import json
+
+import pytest
+
+from backend.config import settings
+from backend.utils.captions import is_acceptable, parse_captions, parse_json3, parse_vtt, pick_caption_track
+
+
+def _formats(lang: str) -> list:
+    return [{"ext": "srv3", "url": f"https://yt.test/{lang}.srv3"},
+            {"ext": "vtt", "url": f"https://yt.test/{lang}.vtt"},
+            {"ext": "json3", "url": f"https://yt.test/{lang}.json3"}]
+
+
+def test_spoken_language_comes_before_caption_languages():
+    info = {"language": "ms", "duration": 100,
+            "subtitles": {"en": _formats("en"), "id": _formats("id"), "ms": _formats("ms")}}
+    track = pick_caption_track(info)
+    assert (track["lang"], track["ext"], track["automatic"]) == ("ms", "json3", False)
+
+
+def test_other_languages_are_skipped_when_the_spoken_one_is_known():
+    info = {"language": "ms", "subtitles": {"id": _formats("id"), "en": _formats("en")},
+            "automatic_captions": {"id": _formats("id"), "ms-orig": _formats("ms-orig")}}
+    track = pick_caption_track(info)
+    assert (track["lang"], track["automatic"]) == ("ms-orig", True)
+
+
+def test_caption_languages_apply_when_the_spoken_one_is_unknown(monkeypatch):
+    monkeypatch.setattr(settings, "CAPTION_LANGUAGES", "id,en")
+    info = {"subtitles": {"en": _formats("en"), "id-ID": _formats("id-ID"),
+                          "live_chat": _formats("live_chat")}}
+    assert pick_caption_track(info)["lang"] == "id-ID"
+
+
+def test_unknown_language_falls_back_to_original_auto_captions():
+    info = {"automatic_captions": {"de": _formats("de"), "ja-orig": _formats("ja-orig")}}
+    assert pick_caption_track(info)["lang"] == "ja-orig"
+
+
+def test_no_track_without_a_parsable_format():
+    info = {"language": "id", "subtitles": {"id": [{"ext": "srv3", "url": "x"}]}}
+    assert pick_caption_track(info) is None
+
+
+def test_parse_json3_skips_styling_and_clamps_rolling_cues():
+    raw = json.dumps({"events": [
+        {"tStartMs": 0, "dDurationMs": 60000},
+        {"tStartMs": 1000, "dDurationMs": 4000, "segs": [{"utf8": "halo"}, {"utf8": " semua"}]},
+        {"tStartMs": 3000, "dDurationMs": 2000, "aAppend": 1, "segs": [{"utf8": "\n"}]},
+        {"tStartMs": 3500, "dDurationMs": 3000, "segs": [{"utf8": "apa  kabar"}]},
+    ]})
+    result = parse_json3(raw)
+    assert result["text"] == "halo semua apa kabar"
+    assert [(s["start"], s["end"]) for s in result["segments"]] == [(1.0, 3.5), (3.5, 6.5)]
+    assert [s["id"] for s in result["segments"]] == [0, 1]
+
+
+def test_parse_vtt_drops_lines_repeated_by_rolling_cues():
+    raw = (
+        "WEBVTT\nKind: captions\nLanguage: id\n\n"
+        "00:00:01.000 --> 00:00:03.000 align:start position:0%\n"
+        "selamat<00:00:01.500><c> pagi</c>\n \n\n"
+        "00:00:03.000 --> 00:00:05.000 align:start position:0%\n"
+        "selamat pagi\nsemua &amp; teman\n\n"
+        "1:00:05.000 --> 1:00:06.500\n"
+        "sampai jumpa\n"
+    )
+    result = parse_vtt(raw)
+    assert result["text"] == "selamat pagi semua & teman sampai jumpa"
+    assert [(s["start"], s["end"]) for s in result["segments"]] == [
+        (1.0, 3.0), (3.0, 5.0), (3605.0, 3606.5)]
+
+
+def test_parse_captions_rejects_unknown_formats():
+    with pytest.raises(ValueError):
+        parse_captions("", "srv3")
+
+
+def test_coverage_counts_time_on_screen_not_the_last_cue(monkeypatch):
+    monkeypatch.setattr(settings, "CAPTION_MIN_COVERAGE", 0.5)
+    # One intro cue and one cue near the end of a 100s video
+    sparse = {"text": "intro outro", "segments": [
+        {"start": 0.0, "end": 5.0, "text": "intro"},
+        {"start": 95.0, "end": 99.0, "text": "outro"}]}
+    assert not is_acceptable(sparse, 100.0)
+    # Overlapping cues count once: 0-60s covered
+    dense = {"text": "a b c", "segments": [
+        {"start": 0.0, "end": 40.0, "text": "a"},
+        {"start": 30.0, "end": 50.0, "text": "b"},
+        {"start": 50.0, "end": 60.0, "text": "c"}]}
+    assert is_acceptable(dense, 100.0)
+    assert not is_acceptable(dense, 130.0)
+
+
+def test_empty_captions_are_not_acceptable():
+    assert not is_acceptable({"text": " ", "segments": [{"start": 0, "end": 9, "text": " "}]}, None)
+    assert is_acceptable({"text": "a", "segments": [{"start": 0, "end": 1, "text": "a"}]}, None)
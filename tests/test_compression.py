@@ -0,0 +1,78 @@
+# tests/test_compression.py
+import gzip
+
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from fastapi.testclient import TestClient
+
+from backend.utils import compression
+from backend.utils.compression import CompressionMiddleware, choose_encoding
+
+brotli = pytest.importorskip("brotli")  # optional dependency
+
+
+@pytest.mark.parametrize("header, expected", [
+    ("gzip, deflate, br", "br"),
+    ("gzip", "gzip"),
+    ("br;q=0.5, gzip", "gzip"),
+    ("*", "br"),
+    ("br;q=0, *", "gzip"),
+    ("gzip;q=0, br;q=0, *", None),
+    ("*;q=0", None),
+    ("identity", None),
+    ("", None),
+])
+def test_choose_encoding(header, expected):
+    assert choose_encoding(header) == expected
+
+
+def test_choose_encoding_without_brotli(monkeypatch):
+    monkeypatch.setattr(compression, "brotli", None)
+    assert choose_encoding("br, *;q=0.1") == "gzip"
+    assert choose_encoding("br") is None
+
+
+@pytest.fixture
+def client():
+    app = FastAPI()
+
+    @app.get("/jobs/{size}")
+    def body(size: int):
+        return PlainTextResponse("x" * size)
+
+    @app.get("/jobs/events/stream")
+    def events():
+        return StreamingResponse(iter(["data: " + "x" * 4096 + "\n\n"]), media_type="text/event-stream")
+
+    @app.get("/other/{size}")
+    def other(size: int):
+        return PlainTextResponse("x" * size)
+
+    app.add_middleware(CompressionMiddleware, paths=("/jobs",), minimum_size=1024)
+    return TestClient(app)
+
+
+def _raw(client, path, accept_encoding):
+    # stream=True: read the body as sent, before httpx decodes it
+    with client.stream("GET", path, headers={"Accept-Encoding": accept_encoding}) as response:
+        return response, b"".join(response.iter_raw())
+
+
+@pytest.mark.parametrize("size", [4096, compression.THREADPOOL_MIN_BYTES * 2])
+def test_large_bodies_are_compressed(client, size):
+    response, raw = _raw(client, f"/jobs/{size}", "br")
+    assert response.headers["content-encoding"] == "br"
+    assert response.headers["content-length"] == str(len(raw))
+    assert brotli.decompress(raw) == b"x" * size
+
+    response, raw = _raw(client, f"/jobs/{size}", "gzip")
+    assert gzip.decompress(raw) == b"x" * size
+
+
+def test_small_bodies_other_paths_and_streams_pass_through(client):
+    for path in ("/jobs/100", "/other/4096", "/jobs/events/stream"):
+        response, _ = _raw(client, path, "gzip")
+        assert "content-encoding" not in response.headers
+    response, _ = _raw(client, "/jobs/100", "gzip")
+    assert response.headers["vary"] == "Accept-Encoding"
@@ -0,0 +1,124 @@
+# tests/test_generation_cache.py
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import select
+
+from backend.config import settings
+from backend.crud.cache_crud import evict_generation_cache, get_cached_generation
+from backend.models.content_generation import ContentGeneration
+from backend.models.job import Job
+from backend.models.transcription import TranscriptionHistory
+from backend.routers import generate
+from backend.utils.auth_cache import Principal
+from backend.utils.dependencies import get_current_user
+from backend.utils.generation_cache import STYLE_FIELDS, generation_cache_key
+
+TRANSCRIPT = "Menteri mengumumkan anggaran baru untuk sekolah."
+STYLE = {field: f"{field}-a" for field in STYLE_FIELDS}
+
+
+def _key(transcript=TRANSCRIPT, style=STYLE, notes="", model="gpt-4o"):
+    return generation_cache_key(transcript, style, notes, model)
+
+
+def test_key_covers_transcript_every_style_field_notes_and_model():
+    keys = {_key(), _key(transcript=TRANSCRIPT + "!"), _key(notes="fokus anggaran"), _key(model="gpt-4o-mini")}
+    keys.update(_key(style={**STYLE, field: "other"}) for field in STYLE_FIELDS)
+    assert len(keys) == 4 + len(STYLE_FIELDS)
+
+
+def test_key_ignores_field_order_extra_fields_and_surrounding_whitespace():
+    reordered = dict(reversed(list(STYLE.items())))
+    assert _key(style={**reordered, "config": {"x": 1}}) == _key()
+    assert _key(notes="  fokus anggaran\n") == _key(notes="fokus anggaran")
+
+
+@pytest.fixture
+def app(sessions):
+    async def seed():
+        async with sessions() as db:
+            db.add_all([
+                TranscriptionHistory(id=1, user_id=1, transcript=TRANSCRIPT, title="Anggaran"),
+                TranscriptionHistory(id=2, user_id=2, transcript=TRANSCRIPT, title="Anggaran (salinan)"),
+                ContentGeneration(user_id=1, transcription_history_id=1, generated_content="<h1>Artikel</h1>",
+                                  title="Anggaran", cache_key=_key(model=settings.GENERATION_MODEL),
+                                  cache_used_at=datetime.utcnow()),
+            ])
+            await db.commit()
+
+    async def test_db():
+        async with sessions() as db:
+            yield db
+
+    asyncio.run(seed())
+    app = FastAPI()
+    app.include_router(generate.router, prefix="/generate")
+    app.dependency_overrides[generate.get_db] = test_db
+    return app
+
+
+def _generate(app, user_id, transcription_id, job_id, **overrides):
+    app.dependency_overrides[get_current_user] = lambda: Principal(id=user_id, email=f"u{user_id}@example.com")
+    body = {"job_id": job_id, "transcription_id": transcription_id, **STYLE, **overrides}
+    return TestClient(app).post("/generate/", json=body).json()
+
+
+def _rows(sessions, model, *where):
+    async def load():
+        async with sessions() as db:
+            return (await db.scalars(select(model).where(*where))).all()
+    return asyncio.run(load())
+
+
+def test_other_users_get_their_own_copy_of_a_cached_article(app, sessions):
+    response = _generate(app, 2, 2, "job-b")
+    assert response["cached"] is True
+    assert response["content"] == "<h1>Artikel</h1>"
+
+    copy, = _rows(sessions, ContentGeneration, ContentGeneration.user_id == 2)
+    assert (copy.transcription_history_id, copy.title, copy.cache_key) == (2, "Anggaran (salinan)", None)
+    job, = _rows(sessions, Job, Job.id == "job-b")
+    assert (job.user_id, job.status, job.kind) == (2, "completed", None)
+
+
+def test_the_owner_is_served_the_entry_itself(app, sessions):
+    assert _generate(app, 1, 1, "job-a")["cached"] is True
+    assert len(_rows(sessions, ContentGeneration, ContentGeneration.user_id == 1)) == 1
+
+
+def test_other_transcriptions_are_not_served(app):
+    assert _generate(app, 1, 2, "job-c") == {"detail": "Transcription not found"}
+
+
+def test_a_different_style_or_a_forced_run_misses_and_queues_a_job(app, sessions):
+    first = _generate(app, 2, 2, "job-d", sentimen="kritis")
+    assert "cached" not in first
+    # An identical request while it runs attaches to that job
+    assert _generate(app, 2, 2, "job-e", sentimen="kritis") == {
+        "message": "Identical generation already running", "job_id": "job-d", "attached": True}
+    assert "cached" not in _generate(app, 2, 2, "job-f", force_regenerate=True)
+    queued = _rows(sessions, Job, Job.kind == "generate_article")
+    assert sorted(job.id for job in queued) == ["job-d", "job-f"]
+
+
+def test_expired_and_excess_entries_are_evicted(sessions, monkeypatch):
+    monkeypatch.setattr(settings, "GENERATION_CACHE_MAX_ENTRIES", 1)
+    now = datetime.utcnow()
+
+    async def scenario():
+        async with sessions() as db:
+            db.add_all([ContentGeneration(user_id=1, transcription_history_id=1, generated_content=name,
+                                          cache_key=name, cache_used_at=used_at)
+                        for name, used_at in (("expired", now - timedelta(days=settings.GENERATION_CACHE_TTL_DAYS + 1)),
+                                              ("older", now - timedelta(hours=2)),
+                                              ("newer", now - timedelta(hours=1)))])
+            await db.commit()
+            evicted = await evict_generation_cache(db)
+            hits = [await get_cached_generation(db, key) for key in ("expired", "older", "newer")]
+        return evicted, [hit.generated_content if hit else None for hit in hits]
+
+    assert asyncio.run(scenario()) == (2, [None, None, "newer"])
@@ -0,0 +1,176 @@
+# tests/test_http_client.py
+"""request_with_retries against a local fake server; call_with_retries with scripted SDK errors."""
+import asyncio
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+import pytest
+from openai import APIConnectionError, BadRequestError, RateLimitError
+
+from backend.config import settings
+from backend.utils import http_client
+from backend.utils.http_client import TokenBucket, UpstreamError, call_with_retries, request_with_retries
+
+
+class FakeServer:
+    """Answers each request with the next scripted (status, headers), repeating the last one."""
+
+    def __init__(self, script):
+        self.script = list(script)
+        self.hits = []
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def _respond(self):
+                server.hits.append(time.monotonic())
+                status, headers = server.script[min(len(server.hits), len(server.script)) - 1]
+                body = b'{"ok": true}' if status < 400 else b'{"error": "scripted"}'
+                self.send_response(status)
+                for name, value in {**headers, "Content-Length": str(len(body))}.items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(body)
+
+            do_GET = do_POST = _respond
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_port}/v1/audio/transcriptions"
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+@pytest.fixture
+def fake_server():
+    servers = []
+
+    def start(*script):
+        servers.append(FakeServer(script))
+        return servers[-1]
+
+    yield start
+    for server in servers:
+        server.close()
+
+
+@pytest.fixture(autouse=True)
+def fast_retries(monkeypatch):
+    monkeypatch.setattr(settings, "HTTP_MAX_ATTEMPTS", 4)
+    monkeypatch.setattr(settings, "HTTP_BACKOFF_BASE_SECONDS", 0.01)
+    monkeypatch.setattr(settings, "HTTP_BACKOFF_MAX_SECONDS", 0.05)
+    monkeypatch.setattr(http_client, "openai_rate_limiter", TokenBucket(rate=1000, capacity=1000))
+
+
+def test_429_waits_for_retry_after(fake_server):
+    server = fake_server((429, {"Retry-After": "0.3"}), (200, {}))
+    response = request_with_retries("POST", server.url, deadline_seconds=10, data=b"audio")
+    assert response.json() == {"ok": True}
+    assert len(server.hits) == 2
+    assert server.hits[1] - server.hits[0] >= 0.3
+
+
+def test_5xx_is_retried_with_backoff(fake_server):
+    server = fake_server((503, {}), (502, {}), (200, {}))
+    assert request_with_retries("GET", server.url, deadline_seconds=10).status_code == 200
+    assert len(server.hits) == 3
+
+
+def test_gives_up_after_max_attempts(fake_server):
+    server = fake_server((500, {}))
+    with pytest.raises(UpstreamError) as error:
+        request_with_retries("GET", server.url, deadline_seconds=10)
+    assert error.value.status_code == 500
+    assert "gave up after 4 attempts" in str(error.value)
+    assert len(server.hits) == 4
+
+
+def test_gives_up_when_the_next_wait_passes_the_deadline(fake_server):
+    server = fake_server((429, {"Retry-After": "5"}))
+    started = time.monotonic()
+    with pytest.raises(UpstreamError) as error:
+        request_with_retries("GET", server.url, deadline_seconds=1)
+    assert "deadline exceeded" in str(error.value)
+    assert error.value.status_code == 429
+    assert len(server.hits) == 1
+    assert time.monotonic() - started < 1
+
+
+def test_client_errors_are_not_retried(fake_server):
+    server = fake_server((400, {}), (200, {}))
+    with pytest.raises(UpstreamError) as error:
+        request_with_retries("POST", server.url, deadline_seconds=10)
+    assert error.value.status_code == 400
+    assert len(server.hits) == 1
+
+
+def test_connection_errors_are_retried_until_the_limit():
+    with pytest.raises(UpstreamError) as error:
+        request_with_retries("GET", "http://127.0.0.1:9/unreachable", deadline_seconds=10)
+    assert "gave up after 4 attempts" in str(error.value)
+
+
+def _status_error(cls, status: int, headers: dict = None):
+    request = httpx.Request("POST", "http://fake/v1/chat/completions")
+    response = httpx.Response(status, headers=headers or {}, request=request)
+    return cls("scripted", response=response, body=None)
+
+
+def test_sdk_calls_retry_rate_limits_and_connection_errors():
+    errors = [_status_error(RateLimitError, 429, {"retry-after": "0.2"}),
+              APIConnectionError(request=httpx.Request("POST", "http://fake"))]
+    calls = []
+
+    async def completion(prompt):
+        calls.append(time.monotonic())
+        if errors:
+            raise errors.pop(0)
+        return f"article about {prompt}"
+
+    result = asyncio.run(call_with_retries(completion, "banjir", deadline_seconds=10))
+    assert result == "article about banjir"
+    assert len(calls) == 3
+    assert calls[1] - calls[0] >= 0.2
+
+
+def test_sdk_client_errors_propagate():
+    async def completion():
+        raise _status_error(BadRequestError, 400)
+
+    with pytest.raises(BadRequestError):
+        asyncio.run(call_with_retries(completion, deadline_seconds=10))
+
+
+def test_token_bucket_allows_a_burst_then_paces():
+    bucket = TokenBucket(rate=20, capacity=3)
+    started = time.monotonic()
+    for _ in range(3):
+        bucket.acquire()
+    assert time.monotonic() - started < 0.05
+    for _ in range(4):
+        bucket.acquire()
+    # 4 more tokens at 20/s
+    assert 0.18 <= time.monotonic() - started < 0.5
+
+
+def test_token_bucket_paces_coroutines():
+    bucket = TokenBucket(rate=50, capacity=1)
+
+    async def burst():
+        started = time.monotonic()
+        await asyncio.gather(*(bucket.acquire_async() for _ in range(6)))
+        return time.monotonic() - started
+
+    assert 0.09 <= asyncio.run(burst()) < 0.4
+
+
+@pytest.mark.parametrize("rate, capacity", [(0, 10), (-1, 10), (1, 0)])
+def test_token_bucket_rejects_unusable_limits(rate, capacity):
+    with pytest.raises(ValueError):
+        TokenBucket(rate=rate, capacity=capacity)
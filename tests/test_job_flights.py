@@ -0,0 +1,49 @@
+# tests/test_job_flights.py
+import asyncio
+
+from sqlalchemy import select, update
+
+from backend.models.job import Job
+from backend.utils import job_status
+from backend.utils.job_status import claim_flight, follow_job
+
+
+async def _add_jobs(db, *job_ids, status="processing"):
+    db.add_all([Job(id=job_id, user_id=n + 1, status=status, kind="transcribe_youtube", attempts=1)
+                for n, job_id in enumerate(job_ids)])
+    await db.commit()
+
+
+def test_one_active_job_holds_a_flight_key(sessions):
+    async def scenario():
+        async with sessions() as db:
+            await _add_jobs(db, "a", "b")
+            first = await claim_flight(db, "a", "youtube:x")
+            again = await claim_flight(db, "a", "youtube:x")
+            second = await claim_flight(db, "b", "youtube:x")
+            other = await claim_flight(db, "b", "youtube:y")
+            await db.execute(update(Job).where(Job.id == "a").values(status="failed"))
+            await db.commit()
+            takeover = await claim_flight(db, "b", "youtube:x")
+        return first, again, second, other, takeover
+
+    assert asyncio.run(scenario()) == ("a", "a", "a", "b", "b")
+
+
+def test_follower_mirrors_the_leaders_progress(sessions, monkeypatch):
+    monkeypatch.setattr(job_status, "SessionLocal", sessions)
+
+    async def scenario():
+        async with sessions() as db:
+            await _add_jobs(db, "leader", "follower")
+            follower = asyncio.create_task(follow_job("leader", "follower", 0.01))
+            for progress in (0.25, 0.5):
+                await db.execute(update(Job).where(Job.id == "leader").values(progress=progress))
+                await db.commit()
+                await asyncio.sleep(0.1)
+            seen = await db.scalar(select(Job.progress).where(Job.id == "follower"))
+            await db.execute(update(Job).where(Job.id == "leader").values(status="completed"))
+            await db.commit()
+            return seen, await asyncio.wait_for(follower, 1)
+
+    assert asyncio.run(scenario()) == (0.5, "completed")
@@ -0,0 +1,163 @@
+# tests/test_job_queue.py
+import asyncio
+from datetime import datetime, timedelta
+
+from sqlalchemy import select, update
+
+from backend import worker
+from backend.config import settings
+from backend.models.job import Job
+from backend.utils.job_queue import claim_next_job, heartbeat, requeue_expired_jobs, retry_or_fail_job
+
+
+async def _add_jobs(db, *jobs):
+    now = datetime.utcnow()
+    for n, values in enumerate(jobs):
+        db.add(Job(**{"user_id": 1, "status": "pending", "kind": "generate_article",
+                      "payload": {}, "attempts": 0,
+                      "created_at": now - timedelta(minutes=len(jobs) - n), **values}))
+    await db.commit()
+
+
+async def _job(sessions, job_id) -> Job:
+    async with sessions() as db:
+        return await db.scalar(select(Job).where(Job.id == job_id))
+
+
+def test_claim_takes_the_oldest_ready_job_once(sessions):
+    async def scenario():
+        async with sessions() as db:
+            await _add_jobs(db, {"id": "backing-off", "available_at": datetime.utcnow() + timedelta(hours=1)},
+                            {"id": "old"}, {"id": "new"}, {"id": "legacy", "kind": None})
+            first = await claim_next_job(db, "w1", 60)
+            second = await claim_next_job(db, "w2", 60)
+            third = await claim_next_job(db, "w3", 60)
+        return first, second, third
+
+    first, second, third = asyncio.run(scenario())
+    assert (first.id, first.status, first.lease_owner, first.attempts) == ("old", "processing", "w1", 1)
+    assert first.lease_expires_at > datetime.utcnow()
+    assert second.id == "new"
+    assert third is None
+
+
+def test_heartbeat_only_renews_the_owners_lease(sessions):
+    async def scenario():
+        async with sessions() as db:
+            await _add_jobs(db, {"id": "j"})
+            await claim_next_job(db, "w1", 60)
+            return await heartbeat(db, "j", "w1", 60), await heartbeat(db, "j", "w2", 60)
+
+    assert asyncio.run(scenario()) == (True, False)
+
+
+def test_expired_leases_are_requeued_until_max_attempts(sessions):
+    past = datetime.utcnow() - timedelta(minutes=1)
+
+    async def scenario():
+        async with sessions() as db:
+            await _add_jobs(
+                db,
+                {"id": "crashed", "status": "processing", "attempts": 1,
+                 "lease_owner": "w1", "lease_expires_at": past},
+                {"id": "crashed-again", "status": "processing", "attempts": 3,
+                 "lease_owner": "w1", "lease_expires_at": past},
+                {"id": "alive", "status": "processing", "attempts": 1, "lease_owner": "w2",
+                 "lease_expires_at": datetime.utcnow() + timedelta(minutes=1)})
+            return await requeue_expired_jobs(db, max_attempts=3)
+
+    assert asyncio.run(scenario()) == 2
+    crashed = asyncio.run(_job(sessions, "crashed"))
+    assert (crashed.status, crashed.lease_owner) == ("pending", None)
+    assert "Lease expired" in crashed.last_error
+    assert asyncio.run(_job(sessions, "crashed-again")).status == "failed"
+    assert asyncio.run(_job(sessions, "alive")).status == "processing"
+
+
+def test_task_errors_back_off_then_fail(sessions):
+    async def scenario():
+        async with sessions() as db:
+            await _add_jobs(db, {"id": "j"})
+            statuses = []
+            for attempt in range(3):
+                await db.execute(update(Job).where(Job.id == "j").values(available_at=None))
+                await db.commit()
+                await claim_next_job(db, "w1", 60)
+                statuses.append(await retry_or_fail_job(db, "j", "w1", "boom", 3, 10.0))
+            return statuses
+
+    assert asyncio.run(scenario()) == ["pending", "pending", "failed"]
+    job = asyncio.run(_job(sessions, "j"))
+    assert (job.attempts, job.last_error, job.lease_owner) == (3, "boom", None)
+
+
+def test_retry_backoff_doubles_and_hides_the_job(sessions):
+    async def scenario():
+        async with sessions() as db:
+            await _add_jobs(db, {"id": "j", "attempts": 1})
+            await claim_next_job(db, "w1", 60)
+            await retry_or_fail_job(db, "j", "w1", "boom", 5, 10.0)
+            return await claim_next_job(db, "w2", 60)
+
+    before = datetime.utcnow()
+    assert asyncio.run(scenario()) is None
+    job = asyncio.run(_job(sessions, "j"))
+    # Second attempt failed: 10s doubled once
+    assert timedelta(seconds=19) < job.available_at - before < timedelta(seconds=21)
+
+
+def test_retry_is_ignored_without_the_lease(sessions):
+    async def scenario():
+        async with sessions() as db:
+            await _add_jobs(db, {"id": "j"})
+            await claim_next_job(db, "w1", 60)
+            return await retry_or_fail_job(db, "j", "w2", "boom", 3, 10.0)
+
+    assert asyncio.run(scenario()) is None
+    assert asyncio.run(_job(sessions, "j")).status == "processing"
+
+
+def test_run_job_queues_a_retry_when_the_task_raises(sessions, monkeypatch):
+    async def failing(job, db):
+        raise RuntimeError("whisper is down")
+
+    monkeypatch.setattr(worker, "SessionLocal", sessions)
+    monkeypatch.setitem(worker.TASKS, "generate_article", failing)
+
+    async def scenario():
+        async with sessions() as db:
+            await _add_jobs(db, {"id": "j"})
+            job = await claim_next_job(db, "w1", 60)
+        await worker.run_job(job, "w1")
+
+    asyncio.run(scenario())
+    job = asyncio.run(_job(sessions, "j"))
+    assert (job.status, job.lease_owner) == ("pending", None)
+    assert "whisper is down" in job.last_error
+    assert job.available_at > datetime.utcnow()
+
+
+def test_run_job_cancels_the_task_when_the_lease_is_lost(sessions, monkeypatch):
+    finished = []
+
+    async def slow(job, db):
+        await asyncio.sleep(5)
+        finished.append(job.id)
+
+    monkeypatch.setattr(worker, "SessionLocal", sessions)
+    monkeypatch.setitem(worker.TASKS, "generate_article", slow)
+    monkeypatch.setattr(settings, "JOB_HEARTBEAT_SECONDS", 0.05)
+
+    async def scenario():
+        async with sessions() as db:
+            await _add_jobs(db, {"id": "j"})
+            job = await claim_next_job(db, "w1", 60)
+            # Another worker took the job over after a lease expiry
+            await db.execute(update(Job).where(Job.id == "j").values(lease_owner="w2"))
+            await db.commit()
+        await asyncio.wait_for(worker.run_job(job, "w1"), timeout=2)
+
+    asyncio.run(scenario())
+    assert finished == []
+    job = asyncio.run(_job(sessions, "j"))
+    assert (job.status, job.lease_owner) == ("processing", "w2")
@@ -0,0 +1,60 @@
+# tests/test_jobs_api.py
+import asyncio
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from backend.models.job import Job
+from backend.routers import jobs
+from backend.utils.auth_cache import Principal
+from backend.utils.dependencies import get_current_user, get_db
+
+
+@pytest.fixture
+def app(sessions):
+    async def seed():
+        async with sessions() as db:
+            db.add_all([Job(id="mine", user_id=1, status="completed", transcript="rahasia saya"),
+                        Job(id="theirs", user_id=2, status="completed", transcript="rahasia mereka")])
+            await db.commit()
+
+    async def test_db():
+        async with sessions() as db:
+            yield db
+
+    asyncio.run(seed())
+    app = FastAPI()
+    app.include_router(jobs.router, prefix="/jobs")
+    app.dependency_overrides[get_db] = test_db
+    return app
+
+
+def _login(app, user_id: int):
+    app.dependency_overrides[get_current_user] = lambda: Principal(id=user_id, email=f"u{user_id}@example.com")
+
+
+def test_job_status_requires_a_login(app):
+    response = TestClient(app).get("/jobs/mine/status")
+    assert response.status_code == 401
+    assert "rahasia" not in response.text
+
+
+def test_job_status_returns_the_users_own_job(app):
+    _login(app, 1)
+    response = TestClient(app).get("/jobs/mine/status")
+    assert response.status_code == 200
+    assert response.json()["transcript"] == "rahasia saya"
+
+
+def test_job_status_hides_other_users_jobs(app):
+    _login(app, 1)
+    response = TestClient(app).get("/jobs/theirs/status")
+    assert response.status_code == 404
+    assert "rahasia" not in response.text
+
+
+def test_batch_status_omits_other_users_jobs(app):
+    _login(app, 1)
+    response = TestClient(app).get("/jobs/status", params={"ids": "mine,theirs"})
+    assert [job["job_id"] for job in response.json()["jobs"]] == ["mine"]
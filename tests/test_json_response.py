@@ -0,0 +1,13 @@
+# tests/test_json_response.py
+import json
+from datetime import datetime
+
+from backend.utils.json_response import FastJSONResponse
+
+
+def test_renders_datetimes_and_unicode():
+    response = FastJSONResponse({"created_at": datetime(2026, 10, 18, 14, 22, 37), "title": "Wawancara café",
+                                 "ids": {1: "a"}})
+    assert response.media_type == "application/json"
+    assert json.loads(response.body) == {"created_at": "2026-10-18T14:22:37", "title": "Wawancara café",
+                                         "ids": {"1": "a"}}
@@ -0,0 +1,24 @@
+# tests/test_pagination.py
+from datetime import datetime
+
+import pytest
+
+from backend.utils.pagination import decode_cursor, encode_cursor
+
+
+def test_cursor_round_trip():
+    created_at = datetime(2024, 5, 17, 8, 30, 15, 123456)
+    cursor = encode_cursor(created_at, 42)
+    assert "=" not in cursor
+    assert decode_cursor(cursor) == (created_at, 42)
+
+
+def test_cursor_round_trip_without_microseconds():
+    created_at = datetime(2024, 1, 1)
+    assert decode_cursor(encode_cursor(created_at, 1)) == (created_at, 1)
+
+
+@pytest.mark.parametrize("cursor", ["", "not-a-cursor", "MjAyNC0wMS0wMQ", "fDE"])
+def test_decode_rejects_foreign_cursors(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
@@ -0,0 +1,118 @@
+# tests/test_query_plans.py
+"""
+The per-user listings must stay index range scans (see the
+e2b8f4a61c93 migration). Each query is captured as the app emits it on a
+seeded SQLite database and checked with EXPLAIN QUERY PLAN.
+"""
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import event, insert, text
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from backend.crud.content_crud import list_content_generations
+from backend.crud.history_crud import list_history_summaries
+from backend.database import Base
+from backend.models.content_generation import ContentGeneration
+from backend.models.job import Job
+from backend.models.transcription import TranscriptionHistory
+from backend.models.user import User
+from backend.utils.job_status import find_active_job, get_ongoing_job_statuses
+
+USERS = 20
+ROWS_PER_USER = 100
+
+
+async def _seed(db):
+    now = datetime(2026, 1, 1)
+    await db.execute(insert(User), [
+        {"id": u, "email": f"user{u}@example.com", "password_hash": "x"}
+        for u in range(1, USERS + 1)])
+    rows = [(u, n) for u in range(1, USERS + 1) for n in range(ROWS_PER_USER)]
+    await db.execute(insert(TranscriptionHistory), [
+        {"user_id": u, "source": "Upload", "title": f"t{n}", "transcript": "teks",
+         "created_at": now - timedelta(minutes=n)} for u, n in rows])
+    await db.execute(insert(ContentGeneration), [
+        {"user_id": u, "transcription_history_id": 1, "generated_content": "artikel",
+         "created_at": now - timedelta(minutes=n)} for u, n in rows])
+    # Mostly finished jobs, as in production
+    await db.execute(insert(Job), [
+        {"id": f"{u}-{n}", "user_id": u, "status": "processing" if n < 2 else "completed",
+         "created_at": now - timedelta(minutes=n)} for u, n in rows])
+    await db.commit()
+    await db.execute(text("ANALYZE"))
+
+
+async def _plans(tmp_path, query) -> list:
+    """EXPLAIN QUERY PLAN detail lines of every SELECT that `query(db)` runs."""
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'plans.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    session = async_sessionmaker(engine, expire_on_commit=False)
+    async with session() as db:
+        await _seed(db)
+
+    captured = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            captured.append((statement, parameters))
+
+    event.listen(engine.sync_engine, "before_cursor_execute", capture)
+    async with session() as db:
+        await query(db)
+    event.remove(engine.sync_engine, "before_cursor_execute", capture)
+
+    plans = []
+    async with engine.connect() as conn:
+        for statement, parameters in captured:
+            result = await conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters)
+            plans.append([row[-1] for row in result.all()])
+    await engine.dispose()
+    assert plans, "the query ran no SELECT"
+    return plans
+
+
+def _assert_uses_index(plans: list, table: str, *indexes: str):
+    """Every access to `table` goes through one of `indexes`, and nothing is sorted."""
+    for plan in plans:
+        scans = [line for line in plan if f" {table}" in line]
+        assert scans, plan
+        assert all(any(f"INDEX {index} " in f"{line} " for index in indexes)
+                   for line in scans), plan
+        assert not any("TEMP B-TREE" in line for line in plan), plan
+
+
+@pytest.mark.parametrize("second_page", [False, True])
+def test_history_listing_uses_the_user_created_at_index(tmp_path, second_page):
+    async def query(db):
+        rows, cursor = await list_history_summaries(db, 7, limit=20)
+        if second_page:
+            await list_history_summaries(db, 7, limit=20, cursor=cursor)
+
+    plans = asyncio.run(_plans(tmp_path, query))
+    _assert_uses_index(plans[-1:], "transcription_history",
+                       "ix_transcription_history_user_id_created_at")
+
+
+@pytest.mark.parametrize("second_page", [False, True])
+def test_content_history_listing_uses_the_user_created_at_index(tmp_path, second_page):
+    async def query(db):
+        rows, cursor = await list_content_generations(db, 7, limit=20)
+        if second_page:
+            await list_content_generations(db, 7, limit=20, cursor=cursor)
+
+    plans = asyncio.run(_plans(tmp_path, query))
+    _assert_uses_index(plans[-1:], "content_generation",
+                       "ix_content_generation_user_id_created_at")
+
+
+def test_ongoing_jobs_use_the_partial_active_index(tmp_path):
+    plans = asyncio.run(_plans(tmp_path, lambda db: get_ongoing_job_statuses(7, db)))
+    _assert_uses_index(plans, "jobs", "ix_jobs_user_id_active")
+
+
+def test_duplicate_job_lookup_uses_a_partial_active_index(tmp_path):
+    plans = asyncio.run(_plans(tmp_path, lambda db: find_active_job(db, 7, "generate:abc")))
+    _assert_uses_index(plans, "jobs", "ix_jobs_user_id_active", "ix_jobs_dedupe_key_active")
@@ -0,0 +1,71 @@
+# tests/test_sections.py
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from backend.routers import generate
+from backend.utils import tokens
+from backend.utils.sections import split_transcript
+from backend.utils.tokens import count_tokens
+
+
+@pytest.fixture(autouse=True)
+def offline_token_counts(monkeypatch):
+    # tiktoken downloads its encodings on first use; count characters instead
+    monkeypatch.setattr(tokens, "tiktoken", None)
+    tokens._encoding.cache_clear()
+    yield
+    tokens._encoding.cache_clear()
+
+
+def _segments(count: int):
+    return [{"start": i * 7.5, "end": i * 7.5 + 7.5, "text": f"Kalimat nomor {i} tentang anggaran daerah."}
+            for i in range(count)]
+
+
+def test_sections_fit_the_budget_and_cut_between_segments():
+    segments = _segments(200)
+    sections = split_transcript("", segments, max_tokens=120)
+    assert len(sections) > 1
+    assert all(count_tokens(section) <= 120 for section in sections)
+    lines = [line for section in sections for line in section.split("\n")]
+    assert lines == [f"[{int(s['start']) // 3600:02d}:{int(s['start']) % 3600 // 60:02d}:"
+                     f"{int(s['start']) % 60:02d}] {s['text']}" for s in segments]
+    assert lines[-1].startswith("[00:24:52]")
+
+
+def test_without_segments_sections_cut_between_sentences():
+    transcript = " ".join(f"Ini kalimat ke-{i}." for i in range(300))
+    sections = split_transcript(transcript, None, max_tokens=80)
+    assert all(count_tokens(section) <= 80 for section in sections)
+    assert all(section.endswith(".") for section in sections)
+    assert " ".join(section.replace("\n", " ") for section in sections) == transcript
+
+
+def test_a_unit_longer_than_the_budget_is_cut_by_words():
+    long_sentence = " ".join(["kata"] * 500)
+    sections = split_transcript(long_sentence + ". Pendek.", None, max_tokens=50)
+    assert all(count_tokens(section) <= 50 for section in sections)
+    assert sections[-1] == "Pendek."
+    assert " ".join(sections[:-1]) == long_sentence + "."
+
+
+def test_condensed_notes_keep_section_order_and_report_progress(monkeypatch):
+    progress = []
+
+    async def fake_completion(create, deadline_seconds, model, messages):
+        prompt = messages[0]["content"]
+        index = int(prompt.split("bagian ")[1].split(" ")[0])
+        # Later sections finish first
+        await asyncio.sleep(0.01 * (5 - index))
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=f" catatan {index} "))])
+
+    async def record_progress(job_id, value):
+        progress.append(value)
+
+    monkeypatch.setattr(generate, "call_with_retries", fake_completion)
+    monkeypatch.setattr(generate, "set_job_progress", record_progress)
+    notes = asyncio.run(generate._condense_sections("j", [f"isi {i}" for i in range(4)]))
+    assert notes == "\n\n".join(f"Bagian {i}:\ncatatan {i}" for i in range(1, 5))
+    assert progress == [0.2, 0.4, 0.6, 0.8]
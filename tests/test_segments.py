@@ -0,0 +1,51 @@
+# tests/test_segments.py
+import json
+
+from backend.utils.segments import (compact_segments, dumps_segments, from_columns,
+                                    loads_segments, to_columns, to_ms)
+
+WHISPER_SEGMENTS = [
+    {"id": 0, "start": 0.0, "end": 2.4567, "text": " Selamat pagi.", "tokens": [1, 2],
+     "avg_logprob": -0.2, "temperature": 0.0},
+    {"id": 1, "start": 2.4567, "end": 5.1, "text": " Apa kabar? ", "no_speech_prob": 0.01},
+]
+
+
+def test_to_ms_rounds_and_accepts_missing_values():
+    assert to_ms(1.2344) == 1234
+    assert to_ms(1.2346) == 1235
+    assert to_ms(None) == 0
+    assert to_ms("3.5") == 3500
+
+
+def test_compact_segments_keeps_only_start_end_text():
+    assert compact_segments(WHISPER_SEGMENTS) == [
+        {"start": 0.0, "end": 2.457, "text": "Selamat pagi."},
+        {"start": 2.457, "end": 5.1, "text": "Apa kabar?"},
+    ]
+    assert compact_segments(None) == []
+
+
+def test_columns_round_trip():
+    segments = compact_segments(WHISPER_SEGMENTS)
+    columns = to_columns(segments)
+    assert columns == {"start": [0.0, 2.457], "end": [2.457, 5.1],
+                       "text": ["Selamat pagi.", "Apa kabar?"]}
+    assert from_columns(columns) == segments
+
+
+def test_dumps_loads_round_trip():
+    segments = compact_segments(WHISPER_SEGMENTS)
+    raw = dumps_segments(segments)
+    assert raw == '{"start":[0.0,2.457],"end":[2.457,5.1],"text":["Selamat pagi.","Apa kabar?"]}'
+    assert loads_segments(raw) == segments
+
+
+def test_empty_segments_are_stored_as_null():
+    assert dumps_segments([]) is None
+    assert loads_segments(None) == []
+    assert loads_segments("") == []
+
+
+def test_loads_legacy_verbose_json_list():
+    assert loads_segments(json.dumps(WHISPER_SEGMENTS)) == compact_segments(WHISPER_SEGMENTS)
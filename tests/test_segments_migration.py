@@ -0,0 +1,54 @@
+# tests/test_segments_migration.py
+import importlib.util
+import json
+import pathlib
+
+import pytest
+
+from backend.utils import segments
+
+MIGRATION = pathlib.Path(__file__).parent.parent / "alembic" / "versions" / "f4c1a9d27b65_compact_transcript_segments.py"
+
+
+@pytest.fixture(scope="module")
+def migration():
+    pytest.importorskip("alembic.op")
+    spec = importlib.util.spec_from_file_location("compact_transcript_segments", MIGRATION)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.mark.parametrize("stored, expected", [
+    # json.dumps'ed by the old code: unwrapped, escapes included
+    (json.dumps("Halo dunia"), "Halo dunia"),
+    (json.dumps('Dia bilang "ya".\nSelesai, café'), 'Dia bilang "ya".\nSelesai, café'),
+    # Plain text is left alone, even when it starts and ends with a quote
+    ("Halo dunia", "Halo dunia"),
+    ('"Ya," katanya, "besok"', '"Ya," katanya, "besok"'),
+    ('"tidak lengkap', '"tidak lengkap'),
+    ('"', '"'),
+    ("", ""),
+    (None, None),
+])
+def test_decode_transcript_unwraps_only_json_strings(migration, stored, expected):
+    assert migration._decode_transcript(stored) == expected
+
+
+def test_a_fully_quoted_plain_transcript_is_indistinguishable(migration):
+    # Known limit of the heuristic: a valid JSON string is always unwrapped
+    assert migration._decode_transcript('"Merdeka"') == "Merdeka"
+
+
+def test_segment_helpers_match_the_app_at_this_revision(migration):
+    verbose = json.dumps([{"id": 0, "start": 0.0, "end": 1.2345, "text": " Halo ", "tokens": [1, 2]},
+                          {"id": 1, "start": 1.2345, "end": 2.5, "text": "dunia", "avg_logprob": -0.2}])
+    compact = migration._parse_segments(verbose)
+    assert compact == [{"start": 0.0, "end": 1.234, "text": "Halo"},
+                       {"start": 1.234, "end": 2.5, "text": "dunia"}]
+    assert compact == segments.loads_segments(verbose)
+    stored = migration.dumps_segments(compact)
+    assert stored == segments.dumps_segments(compact)
+    assert migration._parse_segments(stored) == compact
+    assert migration._parse_segments("not json") == []
+    assert migration._parse_segments(None) == []
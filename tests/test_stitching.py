@@ -0,0 +1,76 @@
+# tests/test_stitching.py
+from backend.utils.transcribe_utils import ChunkSpan, merge_chunk_results, stitch_segments
+
+
+def _seg(start: float, end: float, text: str) -> dict:
+    return {"start": start, "end": end, "text": " " + text}
+
+
+def _text(segments) -> str:
+    return " ".join(s["text"].strip() for s in segments)
+
+
+def test_repeated_words_in_the_overlap_are_kept_once():
+    previous = [_seg(280.0, 296.0, "setelah itu kami"), _seg(297.0, 300.0, "kami pulang ke ru")]
+    following = [_seg(298.0, 302.0, "pulang ke rumah masing-masing"),
+                 _seg(302.0, 306.0, "lalu tidur")]
+    previous, following = stitch_segments(previous, following, 298.0, 300.0)
+    assert _text(previous) == "setelah itu kami kami pulang ke"
+    assert _text(following) == "rumah masing-masing lalu tidur"
+
+
+def test_common_phrase_away_from_the_overlap_is_not_matched():
+    # "yang di" occurs in both chunks, but far from the 298-300s overlap
+    previous = [
+        _seg(270.0, 285.0, "kami pergi ke pasar yang di janjikan tercapai dan semua orang senang"),
+        _seg(285.0, 300.0, "setelah makan siang bersama keluarga besar akhirnya kami pulang"),
+    ]
+    following = [
+        _seg(298.0, 303.0, "kami pulang ke rumah"),
+        _seg(303.0, 315.0, "lalu ibu bilang harga sayur yang di pasar mahal."),
+        _seg(315.0, 318.0, "semua setuju"),
+    ]
+    stitched_previous, stitched_following = stitch_segments(previous, following, 298.0, 300.0)
+    assert stitched_previous == previous
+    assert _text(stitched_following) == (
+        "ke rumah lalu ibu bilang harga sayur yang di pasar mahal. semua setuju")
+
+
+def test_without_a_shared_run_segments_inside_the_overlap_are_dropped():
+    previous = [_seg(290.0, 300.0, "sampai jumpa")]
+    following = [_seg(298.0, 299.5, "eh"), _seg(299.5, 305.0, "selamat datang kembali")]
+    previous, following = stitch_segments(previous, following, 298.0, 300.0)
+    assert _text(previous) == "sampai jumpa"
+    assert _text(following) == "selamat datang kembali"
+
+
+def test_single_shared_word_is_not_a_match():
+    previous = [_seg(296.0, 300.0, "lalu dia")]
+    following = [_seg(298.0, 301.0, "dia berkata"), _seg(301.0, 304.0, "tidak")]
+    _, following = stitch_segments(previous, following, 298.0, 300.0)
+    assert _text(following) == "dia berkata tidak"
+
+
+def test_merge_shifts_stitches_and_renumbers():
+    results = [
+        {"text": "satu dua tiga empat", "segments": [
+            {"id": 0, "start": 0.0, "end": 5.0, "text": " satu dua"},
+            {"id": 1, "start": 6.0, "end": 10.0, "text": " tiga empat"}]},
+        {"text": "tiga empat lima", "segments": [
+            {"id": 0, "start": 0.0, "end": 2.0, "text": " tiga empat"},
+            {"id": 1, "start": 2.0, "end": 4.0, "text": " lima"}]},
+    ]
+    spans = [ChunkSpan(start=0.0, end=10.0, boundary=0.0),
+             ChunkSpan(start=8.0, end=12.0, boundary=10.0)]
+    merged = merge_chunk_results(results, spans)
+    assert merged["text"] == "satu dua tiga empat lima"
+    assert [s["id"] for s in merged["segments"]] == [0, 1, 2]
+    assert merged["segments"][-1]["start"] == 10.0
+    assert merged["segments"][-1]["end"] == 12.0
+
+
+def test_merge_without_overlap_concatenates():
+    results = [{"text": "a", "segments": [{"start": 0.0, "end": 1.0, "text": " a b"}]},
+               {"text": "a b", "segments": [{"start": 0.0, "end": 1.0, "text": " a b"}]}]
+    spans = [ChunkSpan(0.0, 300.0, 0.0), ChunkSpan(300.0, 600.0, 300.0)]
+    assert merge_chunk_results(results, spans)["text"] == "a b a b"
@@ -0,0 +1,82 @@
+# tests/test_transcription_backends.py
+import sys
+import types
+from types import SimpleNamespace
+
+import pytest
+
+from backend.config import settings
+from backend.utils import transcription_backends
+from backend.utils.transcription_backends import (FakeBackend, LocalWhisperBackend, OpenAIWhisperBackend,
+                                                  get_transcription_backend)
+
+
+@pytest.fixture(autouse=True)
+def fresh_backend(monkeypatch):
+    monkeypatch.setattr(transcription_backends, "_backend", None)
+    monkeypatch.setattr(settings, "FAKE_TRANSCRIBE_LATENCY_SECONDS", 0.0)
+    monkeypatch.setattr(settings, "FAKE_TRANSCRIBE_REALTIME_FACTOR", 0.0)
+
+
+@pytest.mark.parametrize("name, backend_class", [
+    ("openai", OpenAIWhisperBackend),
+    ("local", LocalWhisperBackend),
+    ("fake", FakeBackend),
+])
+def test_backend_is_chosen_by_setting_and_kept_for_the_process(monkeypatch, name, backend_class):
+    monkeypatch.setattr(settings, "TRANSCRIPTION_BACKEND", name)
+    backend = get_transcription_backend()
+    assert type(backend) is backend_class
+    monkeypatch.setattr(settings, "TRANSCRIPTION_BACKEND", "openai" if name != "openai" else "fake")
+    assert get_transcription_backend() is backend
+
+
+def test_unknown_backend_names_the_choices(monkeypatch):
+    monkeypatch.setattr(settings, "TRANSCRIPTION_BACKEND", "whisper.cpp")
+    with pytest.raises(ValueError, match="openai, local, fake"):
+        get_transcription_backend()
+
+
+def test_fake_backend_is_deterministic_and_limited_like_the_api(tmp_path):
+    audio = tmp_path / "a.mp3"
+    audio.write_bytes(b"\x00" * 16000 * 12)
+    backend = FakeBackend()
+    first, second = backend.transcribe(str(audio)), backend.transcribe(str(audio))
+    assert first == second
+    assert first["segments"][0]["start"] == 0.0
+    assert first["text"].startswith("Segment 1 of ")
+    assert backend.max_file_bytes == OpenAIWhisperBackend.max_file_bytes
+
+
+def test_local_backend_needs_a_model_path(monkeypatch):
+    monkeypatch.setitem(sys.modules, "faster_whisper", types.ModuleType("faster_whisper"))
+    sys.modules["faster_whisper"].WhisperModel = object
+    monkeypatch.setattr(settings, "LOCAL_WHISPER_MODEL_PATH", "")
+    with pytest.raises(RuntimeError, match="LOCAL_WHISPER_MODEL_PATH"):
+        LocalWhisperBackend().transcribe("a.wav")
+
+
+def test_local_backend_loads_the_int8_model_once_and_reports_progress(monkeypatch):
+    loaded = []
+
+    class WhisperModel:
+        def __init__(self, path, **options):
+            loaded.append((path, options["device"], options["compute_type"]))
+
+        def transcribe(self, path, vad_filter):
+            segments = (SimpleNamespace(start=i * 5.0, end=i * 5.0 + 5.0, text=f" bagian {i}") for i in range(4))
+            return segments, SimpleNamespace(duration=20.0)
+
+    module = types.ModuleType("faster_whisper")
+    module.WhisperModel = WhisperModel
+    monkeypatch.setitem(sys.modules, "faster_whisper", module)
+    monkeypatch.setattr(settings, "LOCAL_WHISPER_MODEL_PATH", "/models/whisper-small-ct2")
+    backend = LocalWhisperBackend()
+    progress = []
+    result = backend.transcribe("a.wav", progress.append)
+    backend.transcribe("b.wav")
+
+    assert loaded == [("/models/whisper-small-ct2", "cpu", "int8")]
+    assert progress == [0.25, 0.5, 0.75, 1.0]
+    assert result["text"] == "bagian 0 bagian 1 bagian 2 bagian 3"
+    assert [segment["id"] for segment in result["segments"]] == [0, 1, 2, 3]
@@ -0,0 +1,97 @@
+# tests/test_uploads.py
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from backend.config import settings
+from backend.routers import upload
+from backend.utils.auth_cache import Principal
+from backend.utils.dependencies import get_current_user
+from backend.utils.upload_utils import locked_upload_session
+
+
+@pytest.fixture
+def client(sessions, tmp_path, monkeypatch):
+    monkeypatch.setattr(upload, "UPLOAD_DIR", str(tmp_path / "uploads"))
+    monkeypatch.setattr(upload, "UPLOAD_SESSIONS_DIR", str(tmp_path / "sessions"))
+    monkeypatch.setattr(settings, "MAX_UPLOAD_BYTES", 1000)
+    monkeypatch.setattr(settings, "USER_UPLOAD_QUOTA_BYTES", 1500)
+
+    async def test_db():
+        async with sessions() as db:
+            yield db
+
+    app = FastAPI()
+    app.include_router(upload.router, prefix="/upload")
+    app.dependency_overrides[upload.get_db] = test_db
+    app.dependency_overrides[get_current_user] = lambda: Principal(id=1, email="u1@example.com")
+    return TestClient(app)
+
+
+def _start(client, length=10) -> str:
+    response = client.post("/upload/sessions", json={"filename": "talk.mp3", "length": length})
+    assert response.status_code == 201
+    return response.json()["upload_id"]
+
+
+def _patch(client, upload_id, offset, body):
+    return client.patch(f"/upload/sessions/{upload_id}", content=body,
+                        headers={"Upload-Offset": str(offset)})
+
+
+def test_resumable_upload_reports_and_advances_its_offset(client):
+    upload_id = _start(client)
+    response = _patch(client, upload_id, 0, b"01234")
+    assert (response.status_code, response.headers["Upload-Offset"]) == (204, "5")
+    head = client.head(f"/upload/sessions/{upload_id}")
+    assert (head.headers["Upload-Offset"], head.headers["Upload-Length"]) == ("5", "10")
+
+    response = _patch(client, upload_id, 5, b"56789")
+    assert response.status_code == 200
+    assert response.json()["offset"] == 10
+    assert client.head(f"/upload/sessions/{upload_id}").status_code == 404
+
+
+def test_stale_offset_is_a_conflict_with_the_real_offset(client):
+    upload_id = _start(client)
+    _patch(client, upload_id, 0, b"012")
+    response = _patch(client, upload_id, 0, b"012")
+    assert (response.status_code, response.headers["Upload-Offset"]) == (409, "3")
+
+
+def test_locked_session_cannot_be_appended_or_aborted(client):
+    upload_id = _start(client)
+    with locked_upload_session(upload.UPLOAD_SESSIONS_DIR, upload_id, 0):
+        assert _patch(client, upload_id, 0, b"012").status_code == 409
+        assert client.delete(f"/upload/sessions/{upload_id}").status_code == 409
+    assert client.delete(f"/upload/sessions/{upload_id}").status_code == 204
+    assert client.head(f"/upload/sessions/{upload_id}").status_code == 404
+
+
+def test_body_past_the_declared_length_is_rejected_and_dropped(client):
+    upload_id = _start(client, length=4)
+    assert _patch(client, upload_id, 0, b"0123456").status_code == 413
+    assert client.head(f"/upload/sessions/{upload_id}").headers["Upload-Offset"] == "0"
+
+
+def test_sessions_over_the_quota_are_rejected(client):
+    _start(client, length=1000)
+    response = client.post("/upload/sessions", json={"filename": "talk.mp3", "length": 600})
+    assert response.status_code == 413
+
+
+def test_oversized_upload_is_rejected_from_its_content_length(client):
+    body = b"x" * (settings.MAX_UPLOAD_BYTES + upload.MULTIPART_OVERHEAD_BYTES)
+    response = client.post("/upload/upload-audio/", files={"file": ("talk.mp3", body)})
+    assert response.status_code == 413
+
+
+def test_upload_past_the_limit_is_rejected_while_streaming(client):
+    response = client.post("/upload/upload-audio/", files={"file": ("talk.mp3", b"x" * 1001)})
+    assert response.status_code == 413
+
+
+def test_small_upload_is_queued(client):
+    response = client.post("/upload/upload-audio/", files={"file": ("talk.mp3", b"x" * 100)})
+    assert response.status_code == 200
+    assert response.json()["job_id"]
@@ -0,0 +1,81 @@
+# tests/test_workspace.py
+import os
+import shutil
+import tempfile
+import time
+
+import pytest
+
+from backend.config import settings
+from backend.utils import workspace as workspace_module
+from backend.utils.workspace import LOCK_NAME, cleanup_orphan_workspaces, job_workspace
+
+
+@pytest.fixture(autouse=True)
+def scratch(monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, "SCRATCH_DIR", str(tmp_path / "scratch"))
+    # The disk-backed fallback
+    monkeypatch.setattr(tempfile, "tempdir", str(tmp_path / "disk"))
+    (tmp_path / "scratch").mkdir()
+    (tmp_path / "disk").mkdir()
+    return tmp_path / "scratch"
+
+
+def test_workspace_is_locked_and_removed(scratch):
+    with job_workspace("job-1") as workspace:
+        assert os.listdir(workspace.path) == [LOCK_NAME]
+        with open(workspace.file("audio.mp3"), "wb") as f:
+            f.write(b"x" * 10)
+        assert workspace.usage() == 10
+        # Another process starting up must leave a live workspace alone
+        assert cleanup_orphan_workspaces() == 0
+        assert os.path.isdir(workspace.path)
+    assert os.listdir(scratch) == []
+
+
+def test_workspace_is_removed_when_the_job_fails(scratch):
+    with pytest.raises(RuntimeError):
+        with job_workspace("job-2"):
+            raise RuntimeError("ffmpeg failed")
+    assert os.listdir(scratch) == []
+
+
+def test_cleanup_removes_workspaces_of_dead_processes(scratch):
+    dead = scratch / "job-3-deadbeef"
+    dead.mkdir()
+    (dead / LOCK_NAME).write_text("")
+    (dead / "chunk_000.ogg").write_bytes(b"x")
+    assert cleanup_orphan_workspaces() == 1
+    assert not dead.exists()
+
+
+def test_cleanup_waits_for_new_directories_to_get_their_lock(scratch):
+    fresh = scratch / "job-4-cafebabe"
+    fresh.mkdir()
+    assert cleanup_orphan_workspaces() == 0
+    assert fresh.exists()
+    old = time.time() - 3600
+    os.utime(fresh, (old, old))
+    assert cleanup_orphan_workspaces() == 1
+    assert not fresh.exists()
+
+
+def test_short_scratch_space_falls_back_to_disk(scratch, monkeypatch, tmp_path):
+    disk = tmp_path / "disk"
+    free = shutil.disk_usage(scratch).free
+    with job_workspace("small", input_bytes=1024) as workspace:
+        assert workspace.root == str(scratch)
+    monkeypatch.setattr(settings, "WORKSPACE_MAX_BYTES", free * 10)
+    with job_workspace("large", input_bytes=free) as workspace:
+        assert workspace.root == str(disk / "stt-scratch")
+    assert os.listdir(disk / "stt-scratch") == []
+
+
+def test_check_reuses_a_recent_measurement_of_the_scratch_root(scratch, monkeypatch):
+    walks = []
+    tree_bytes = workspace_module._tree_bytes
+    monkeypatch.setattr(workspace_module, "_tree_bytes", lambda path: walks.append(path) or tree_bytes(path))
+    with job_workspace("job-5") as workspace:
+        for _ in range(5):
+            workspace.check()
+    assert walks.count(str(scratch)) == 1